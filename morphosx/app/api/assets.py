@@ -1,38 +1,128 @@
+import asyncio
+import posixpath
+import time
 import uuid
-from mimetypes import guess_extension
+from dataclasses import replace
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_extension, guess_type
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 
 from morphosx.app.core.auth import get_current_user
-from morphosx.app.core.security import generate_signature, verify_signature
+from morphosx.app.core.exceptions import MorphosXError, handle_morphosx_error
+from morphosx.app.core.metrics import CACHE_REQUESTS, RENDERED_BYTES, SOURCE_BYTES
+from morphosx.app.core.profiling import (
+    CaptureBudget,
+    add_profile,
+    capture_profiles,
+    merge_profiles,
+    profiling_requested,
+)
+from morphosx.app.core.queue import RenderJob, RenderQueue
+from morphosx.app.core.ranges import content_range, multipart_byteranges, parse_range
+from morphosx.app.core.security import generate_signature, verify_profile_token, verify_signature
+from morphosx.app.core.singleflight import SingleFlight
+from morphosx.app.core.timing import timed_stage
+from morphosx.app.core.workers import worker_pool
 from morphosx.app.engine.base import initialize_registry
 from morphosx.app.engine.types import ImageFormat, ProcessingOptions
+from morphosx.app.engine.video import SPRITE_FORMATS, StoryboardTooLarge
 from morphosx.app.settings import settings
+from morphosx.app.storage.cache import DerivativeCache
+from morphosx.app.storage.cas import INTERNAL_PREFIXES, ContentStore
+from morphosx.app.storage.hot import HotCache
 from morphosx.app.storage.local import LocalStorage
-from morphosx.app.storage.s3 import S3Storage
+from morphosx.app.storage.models import AssetMetadata
 
 router = APIRouter(prefix="/assets", tags=["Assets"])
 
+# Read size when streaming uploads into storage
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Derivatives never change under a given URL
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 
 # Singleton instances
 def get_storage():
     if settings.storage_type == "s3":
         if not settings.s3_bucket:
             raise ValueError("S3_BUCKET is required for s3 storage_type")
+        # aioboto3 takes a large share of startup; local deployments never import it
+        from morphosx.app.storage.s3 import S3Storage
+
         return S3Storage(
             bucket_name=settings.s3_bucket,
             region_name=settings.s3_region,
             endpoint_url=settings.s3_endpoint,
             access_key_id=settings.s3_access_key,
             secret_access_key=settings.s3_secret_key,
+            max_pool_connections=settings.s3_max_pool_connections,
+            connect_timeout=settings.s3_connect_timeout,
+            read_timeout=settings.s3_read_timeout,
+            max_attempts=settings.s3_max_attempts,
+            keepalive_timeout=settings.s3_keepalive_timeout,
+            multipart_part_size=settings.s3_multipart_part_size,
+            presign_expires=settings.s3_presign_expires,
         )
     return LocalStorage(base_directory=settings.storage_path)
 
 
+def get_derivative_cache(storage) -> Optional[DerivativeCache]:
+    if not settings.cache_index_enabled:
+        return None
+    return DerivativeCache(
+        storage,
+        index_path=settings.cache_index_path or str(Path(settings.storage_path) / "cache-index.db"),
+        max_bytes=settings.cache_max_bytes,
+        policy=settings.cache_eviction_policy,
+        eviction_interval=settings.cache_eviction_interval,
+        eviction_target=settings.cache_eviction_target,
+    )
+
+
+def get_render_queue() -> Optional[RenderQueue]:
+    if not settings.eager_presets:
+        return None
+    return RenderQueue(
+        path=settings.eager_queue_path or str(Path(settings.storage_path) / "render-queue.db"),
+        # Resolved at call time: the handler is defined further down
+        handler=lambda job: _render_preset(job),
+        workers=settings.eager_workers,
+        poll_interval=settings.eager_poll_interval,
+        max_attempts=settings.eager_max_attempts,
+        lease=settings.eager_lease,
+        retention=settings.eager_retention,
+        retry_backoff=settings.eager_retry_backoff,
+    )
+
+
 storage = get_storage()
+derivative_cache = get_derivative_cache(storage)
+render_queue = get_render_queue()
+hot_cache = HotCache(
+    max_bytes=settings.hot_cache_max_bytes,
+    max_item_bytes=settings.hot_cache_max_item_bytes,
+    min_requests=settings.hot_cache_min_requests,
+    ttl=settings.hot_cache_ttl,
+    revalidate_after=settings.hot_cache_revalidate_interval,
+)
 processor_registry = initialize_registry()
+inflight_renders = SingleFlight()
+profile_budget = CaptureBudget(settings.profile_max_per_minute)
+
+
+def get_content_store() -> Optional[ContentStore]:
+    """
+    Content-addressed view of the current storage, or None when the layout is disabled.
+    """
+    if not settings.content_addressed_storage:
+        return None
+    return ContentStore(storage, lock_ttl=settings.cache_lock_ttl, poll_interval=settings.cache_lock_poll_interval)
 
 
 def get_mime_type(fmt: ImageFormat) -> str:
@@ -42,9 +132,16 @@ def get_mime_type(fmt: ImageFormat) -> str:
         return "application/x-yaml"
     elif fmt == ImageFormat.XML:
         return "application/xml"
+    elif fmt == ImageFormat.VTT:
+        return "text/vtt"
     return f"image/{fmt.value.lower()}"
 
 
+async def _iter_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
 @router.post("/upload")
 async def upload_asset(
     file: UploadFile = File(...),
@@ -78,12 +175,22 @@ async def upload_asset(
     asset_id = f"{'/'.join(path_parts)}/{asset_uuid}{ext}"
 
     try:
-        content = await file.read()
-        saved_id = await storage.save_asset(asset_id, content)
+        # Stream the upload into storage chunk by chunk (bounded memory)
+        content_store = get_content_store()
+        deduplicated = False
+        if content_store:
+            # Identical files share one blob (and, through it, their derivatives)
+            saved, deduplicated = await content_store.save_stream(asset_id, _iter_upload(file))
+        else:
+            saved = await storage.save_stream(asset_id, _iter_upload(file))
+        saved_id = saved.path
 
         # Clean ID for the response (for private assets we keep the user prefix)
         clean_id = saved_id if private else Path(saved_id).name
 
+        # Warm the configured presets in the background so first views are cache hits
+        renders = await _schedule_presets(clean_id)
+
         # Determine if it's a video to suggest thumbnail params
         is_video = ext.lower() in {".mp4", ".webm", ".mov", ".avi"}
 
@@ -110,19 +217,25 @@ async def upload_asset(
             "is_private": private,
             "owner": current_user if private else "public",
             "mime_type": file.content_type,
-            "size": len(content),
+            "size": saved.size,
+            "checksum": saved.checksum,
+            "deduplicated": deduplicated,
+            "renders": renders,
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
-def _apply_preset(
+def apply_preset(
     w: Optional[int],
     h: Optional[int],
     fmt: Optional[ImageFormat],
     q: Optional[int],
     preset: Optional[str],
 ):
+    """
+    Resolve the effective width, height, format and quality of a request, preset values filling the gaps.
+    """
     target_w, target_h, target_fmt, target_q = w, h, fmt, q
     if not target_q:
         target_q = settings.default_quality
@@ -143,7 +256,10 @@ def _apply_preset(
     return target_w, target_h, target_fmt, target_q
 
 
-def _verify_asset_access(asset_id: str, current_user: Optional[str]):
+def verify_asset_access(asset_id: str, current_user: Optional[str]):
+    """
+    Reject access to another user's private asset (users/{user_id}/...).
+    """
     if asset_id.startswith("users/"):
         parts = asset_id.split("/")
         if len(parts) < 3:
@@ -154,7 +270,7 @@ def _verify_asset_access(asset_id: str, current_user: Optional[str]):
             raise HTTPException(status_code=403, detail="Not authorized to access this private asset")
 
 
-def _verify_request_signature(
+def verify_request_signature(
     asset_id: str,
     w: Optional[int],
     h: Optional[int],
@@ -164,6 +280,9 @@ def _verify_request_signature(
     preset: Optional[str],
     current_user: Optional[str],
 ):
+    """
+    Reject a transform request whose signature does not match its parameters.
+    """
     is_valid = verify_signature(
         asset_id=asset_id,
         width=w,
@@ -180,6 +299,544 @@ def _verify_request_signature(
         raise HTTPException(status_code=403, detail="Invalid signature")
 
 
+def _original_id(asset_id: str) -> str:
+    # Private uploads live under users/{user_id}/, public ones under originals/
+    return asset_id if asset_id.startswith("users/") else f"originals/{asset_id}"
+
+
+async def resolve_original(asset_id: str) -> Tuple[str, str]:
+    """
+    Locate the original of an asset.
+
+    :return: (original_id, source_key) where original_id is the storage path of the
+             bytes and source_key names its derivative folder under cache/. With
+             content addressing both derive from the SHA-256, so duplicates share derivatives.
+    """
+    original_id = _original_id(asset_id)
+    content_store = get_content_store()
+    if content_store:
+        digest = await content_store.resolve(original_id)
+        if digest:
+            return content_store.blob_id(digest), _content_key(digest, asset_id)
+    return original_id, asset_id
+
+
+def _content_key(digest: str, asset_id: str) -> str:
+    # The extension selects the engine, so it is part of the derivative identity
+    return f"sha256/{digest}{Path(asset_id).suffix.lower()}"
+
+
+async def _delete_prefix(prefix: str):
+    deleted = []
+    for item in await storage.list_assets(prefix):
+        if not item.is_dir:
+            await storage.delete_asset(item.path)
+            deleted.append(item.path)
+    if derivative_cache:
+        await derivative_cache.forget(deleted)
+
+
+async def _store_derivative(derivative_id: str, data: bytes):
+    RENDERED_BYTES.inc(len(data))
+    with timed_stage("store"):
+        await storage.save_asset(derivative_id, data)
+    if derivative_cache:
+        await derivative_cache.record_store(derivative_id, len(data))
+
+
+async def _fetch_original(original_id: str) -> bytes:
+    with timed_stage("fetch"):
+        data = await storage.get_asset(original_id)
+    SOURCE_BYTES.inc(len(data))
+    return data
+
+
+async def _get_processor(asset_id: str):
+    if processor_registry.is_pending(asset_id):
+        # First request for a lazily registered engine: import it off the event loop
+        return await asyncio.to_thread(processor_registry.get_processor, asset_id)
+    return processor_registry.get_processor(asset_id)
+
+
+async def _run_engine(processor, method: str, *args, **kwargs):
+    # Decode, resize and encode happen inside one engine call (often in another process)
+    with timed_stage("render"):
+        if not profiling_requested():
+            return await worker_pool.run(processor, method, *args, **kwargs)
+        result, profile = await worker_pool.run_profiled(processor, method, *args, **kwargs)
+        add_profile(profile)
+        return result
+
+
+def _sprite_sheet_url(
+    asset_id: str,
+    w: Optional[int],
+    h: Optional[int],
+    q: Optional[int],
+    preset: Optional[str],
+    current_user: Optional[str],
+    options: ProcessingOptions,
+) -> str:
+    """
+    Signed URL of the WEBP storyboard sheet that the JSON/VTT indexes point to.
+    """
+    sig = generate_signature(
+        asset_id=asset_id,
+        width=w,
+        height=h,
+        format=ImageFormat.WEBP.value.lower(),
+        quality=q if q else 0,
+        secret_key=settings.secret_key,
+        preset=preset,
+        user_id=current_user,
+    )
+    params = {"width": w, "height": h, "quality": q, "preset": preset}
+    query = {key: value for key, value in params.items() if value is not None}
+    query.update(format=ImageFormat.WEBP.value, sprite=options.sprite_interval, columns=options.sprite_columns)
+    if options.time > 0:
+        query["time"] = options.time
+    query["signature"] = sig
+    return f"{settings.api_prefix}/assets/{asset_id}?{urlencode(query)}"
+
+
+async def _transform_and_store(
+    asset_id: str,
+    original_id: str,
+    derivative_id: str,
+    options: ProcessingOptions,
+    sprite_sheet_url: Optional[str] = None,
+) -> Tuple[bytes, str]:
+    """
+    Fetch the original, run it through its engine and persist the derivative.
+
+    Storyboard requests persist every sibling output (sheet, JSON and VTT
+    indexes) from the same decode pass.
+    """
+    # Transform Pipeline (Using Registry)
+    processor = await _get_processor(asset_id)
+    if not processor:
+        raise HTTPException(status_code=415, detail="Unsupported media type")
+
+    # Engines like ffmpeg read the original in place (local path or presigned URL),
+    # so multi-GB videos are never copied through Python memory
+    source_uri = await storage.get_source_uri(original_id) if processor.supports_source_uri else None
+
+    if options.sprite_interval > 0:
+        if not hasattr(processor, "render_sprite_set"):
+            raise HTTPException(status_code=400, detail="Storyboards are only available for videos")
+        source = source_uri or await _fetch_original(original_id)
+        try:
+            outputs = await _run_engine(processor, "render_sprite_set", source, options, sheet_url=sprite_sheet_url)
+        except StoryboardTooLarge as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        derivative_folder = derivative_id.rsplit("/", 1)[0]
+        for fmt, (data, _) in outputs.items():
+            await _store_derivative(f"{derivative_folder}/{replace(options, format=fmt).get_cache_key()}", data)
+        return outputs[options.format]
+
+    # Engines that keep parsed sources in memory (PDF) are keyed by content identity,
+    # so a cached document skips the storage fetch as well as the parse
+    document_cache = getattr(processor, "document_cache", None)
+
+    # Render off the event loop so concurrent cache HITs are not blocked
+    if source_uri:
+        processed_data, mime_type = await _run_engine(processor, "process_uri", source_uri, options, filename=asset_id)
+    elif document_cache is not None:
+        original_meta = await storage.stat(original_id)
+        document_key = f"{original_id}@{original_meta.checksum or f'{original_meta.size}:{original_meta.modified}'}"
+        source_bytes = None if document_key in document_cache else await _fetch_original(original_id)
+        try:
+            processed_data, mime_type = await _run_engine(
+                processor, "process_cached", document_key, options, source_bytes
+            )
+        except LookupError:
+            # Evicted between the check and the render
+            source_bytes = await _fetch_original(original_id)
+            processed_data, mime_type = await _run_engine(
+                processor, "process_cached", document_key, options, source_bytes
+            )
+    else:
+        source_bytes = await _fetch_original(original_id)
+        processed_data, mime_type = await _run_engine(processor, "process", source_bytes, options, filename=asset_id)
+
+    # Store derivative for future requests
+    await _store_derivative(derivative_id, processed_data)
+    return processed_data, mime_type
+
+
+async def render_derivative(
+    asset_id: str,
+    original_id: str,
+    derivative_id: str,
+    options: ProcessingOptions,
+    sprite_sheet_url: Optional[str] = None,
+) -> Tuple[bytes, str]:
+    """
+    Produce a derivative on cache miss.
+
+    With cache locking enabled, a storage-level lock makes sure only one worker
+    (or node) renders a given derivative; the others poll until it appears.
+    """
+    if not settings.cache_lock_enabled:
+        return await _transform_and_store(asset_id, original_id, derivative_id, options, sprite_sheet_url)
+
+    deadline = time.monotonic() + settings.cache_lock_ttl
+    while time.monotonic() < deadline:
+        if await storage.acquire_lock(derivative_id, settings.cache_lock_ttl):
+            try:
+                # Another worker may have finished between our HIT check and the lock
+                try:
+                    return await storage.get_asset(derivative_id), get_mime_type(options.format)
+                except FileNotFoundError:
+                    return await _transform_and_store(asset_id, original_id, derivative_id, options, sprite_sheet_url)
+            finally:
+                await storage.release_lock(derivative_id)
+
+        await asyncio.sleep(settings.cache_lock_poll_interval)
+        try:
+            return await storage.get_asset(derivative_id), get_mime_type(options.format)
+        except FileNotFoundError:
+            pass
+
+    # The lock holder looks stuck: render locally rather than failing the request
+    return await _transform_and_store(asset_id, original_id, derivative_id, options, sprite_sheet_url)
+
+
+def _preset_priority(preset: str) -> int:
+    # Output area: small presets (thumbnails) are cheapest and usually shown first
+    config = settings.presets[preset]
+    width = config.get("width") or config.get("height") or settings.max_image_dimension
+    height = config.get("height") or config.get("width") or settings.max_image_dimension
+    return width * height
+
+
+async def _schedule_presets(asset_id: str) -> List[str]:
+    """
+    Queue background renders of the eager presets for a new upload.
+
+    :return: The presets scheduled (empty when eager rendering is off or the type is unsupported).
+    """
+    if not render_queue or not await _get_processor(asset_id):
+        return []
+    presets = sorted((p for p in settings.eager_presets if p in settings.presets), key=_preset_priority)
+    if presets:
+        await render_queue.enqueue(asset_id, [(preset, _preset_priority(preset)) for preset in presets])
+    return presets
+
+
+async def _render_preset(job: RenderJob):
+    """
+    Queue handler: render one preset exactly as a GET with ?preset= would, unless it is cached.
+    """
+    target_w, target_h, target_fmt, target_q = apply_preset(None, None, None, None, job.preset)
+    options = ProcessingOptions(width=target_w, height=target_h, format=target_fmt, quality=target_q)
+    original_id, source_key = await resolve_original(job.asset_id)
+    derivative_id = f"cache/{source_key}/{options.get_cache_key()}"
+    try:
+        await storage.stat(derivative_id)
+        return
+    except FileNotFoundError:
+        pass
+    await inflight_renders.do(
+        derivative_id,
+        lambda: render_derivative(job.asset_id, original_id, derivative_id, options),
+    )
+
+
+@router.get("/status/{asset_id:path}")
+async def get_render_status(asset_id: str, current_user: Optional[str] = Depends(get_current_user)):
+    """
+    Progress of the background preset renders scheduled at upload.
+    """
+    verify_asset_access(asset_id, current_user)
+    renders = await render_queue.status(asset_id) if render_queue else []
+    finished = sum(1 for render in renders if render["status"] in ("done", "failed"))
+    return {
+        "asset_id": asset_id,
+        "enabled": render_queue is not None,
+        "total": len(renders),
+        "done": sum(1 for render in renders if render["status"] == "done"),
+        "complete": finished == len(renders),
+        "renders": renders,
+    }
+
+
+@router.get("/list/{path:path}")
+async def list_assets(path: str = "", current_user: Optional[str] = Depends(get_current_user)):
+    """
+    List files and folders in a given path.
+    """
+    path = posixpath.normpath(f"/{path}").lstrip("/")
+    # Content-addressed references mirror asset ids: refs/users/{id}/ is that user's folder
+    if get_content_store() and path.startswith("refs/"):
+        path = path.removeprefix("refs/")
+
+    # Security: If path starts with users/, verify ownership
+    if path.startswith("users/"):
+        parts = path.split("/")
+        if len(parts) >= 2:
+            owner_id = parts[1]
+            if current_user != owner_id:
+                raise HTTPException(status_code=403, detail="Not authorized to browse this folder")
+
+    # If path is empty, default to listing 'originals/' (public root)
+    if not path:
+        path = "originals"
+    # Profiles captured for diagnostics and the content store's internals are not public
+    if _is_hidden_path(path):
+        raise HTTPException(status_code=404, detail="Folder not found")
+
+    try:
+        items = [item for item in await storage.list_assets(path) if not _is_hidden_path(item.path)]
+        if get_content_store():
+            # Content-addressed assets are references under refs/
+            for item in await storage.list_assets(f"refs/{path}"):
+                items.append(item.model_copy(update={"path": item.path.removeprefix("refs/")}))
+        return {"path": path, "items": items}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Listing failed: {str(e)}")
+
+
+def cache_validators(meta: AssetMetadata) -> Dict[str, str]:
+    """
+    ETag and Last-Modified of a stored derivative, from its metadata alone.
+
+    Backends that hash what they store (S3) provide the tag; otherwise the
+    modification time and size identify the file, as static file servers do.
+    """
+    tag = meta.etag or f"{int(meta.modified * 1_000_000):x}-{meta.size:x}"
+    return {"ETag": f'"{tag}"', "Last-Modified": formatdate(meta.modified, usegmt=True)}
+
+
+def _is_not_modified(
+    validators: Dict[str, str], if_none_match: Optional[str], if_modified_since: Optional[str]
+) -> bool:
+    """
+    Evaluate conditional request headers (RFC 9110): If-None-Match wins over If-Modified-Since.
+    """
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or validators["ETag"] in tags
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            modified = parsedate_to_datetime(validators["Last-Modified"])
+            return modified <= since
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _not_modified_response(validators: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers={**validators, "Cache-Control": CACHE_CONTROL})
+
+
+def _if_range_matches(validators: Dict[str, str], if_range: Optional[str]) -> bool:
+    # If-Range holds a strong ETag or the exact Last-Modified date; anything else means "send it all"
+    return not if_range or if_range.strip() in (validators["ETag"], validators["Last-Modified"])
+
+
+def _range_response(
+    read: Callable[[int, Optional[int]], AsyncIterator[bytes]],
+    size: int,
+    media_type: str,
+    headers: Dict[str, str],
+    range_header: Optional[str],
+    if_range: Optional[str],
+) -> Optional[Response]:
+    """
+    Answer a Range request with 206 (one part, or multipart/byteranges) or 416.
+
+    :param read: Called with (offset, length); streams that slice of the body.
+    :param headers: Response headers, including the validators.
+    :return: None when the full body should be sent instead.
+    """
+    if not range_header or not _if_range_matches(headers, if_range):
+        return None
+    ranges = parse_range(range_header, size)
+    if ranges is None:
+        return None
+
+    if not ranges:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        return StreamingResponse(
+            read(start, end - start + 1),
+            status_code=206,
+            media_type=media_type,
+            headers={
+                **headers,
+                "Content-Range": content_range(start, end, size),
+                "Content-Length": str(end - start + 1),
+            },
+        )
+
+    boundary = uuid.uuid4().hex
+    body, length = multipart_byteranges(ranges, size, media_type, boundary, read)
+    return StreamingResponse(
+        body,
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers={**headers, "Content-Length": str(length)},
+    )
+
+
+async def _iter_slice(data: bytes, offset: int, length: Optional[int]) -> AsyncIterator[bytes]:
+    yield data[offset : None if length is None else offset + length]
+
+
+def _bytes_response(
+    data: bytes,
+    media_type: str,
+    headers: Dict[str, str],
+    range_header: Optional[str] = None,
+    if_range: Optional[str] = None,
+) -> Response:
+    """A derivative already in memory, whole or as the requested byte ranges."""
+    ranged = _range_response(
+        lambda offset, length: _iter_slice(data, offset, length),
+        len(data),
+        media_type,
+        headers,
+        range_header,
+        if_range,
+    )
+    return ranged or Response(content=data, media_type=media_type, headers=headers)
+
+
+def _delivery_headers(validators: Dict[str, str], cache_status: Optional[str] = None) -> Dict[str, str]:
+    headers = {**validators, "Accept-Ranges": "bytes", "Cache-Control": CACHE_CONTROL}
+    if cache_status:
+        headers["X-MorphosX-Cache"] = cache_status
+    return headers
+
+
+async def _revalidate_hot_entry(
+    hot_key: str, hot_entry: Tuple[bytes, str, Dict[str, str], str], asset_id: str, options: ProcessingOptions
+) -> Optional[Tuple[bytes, str, Dict[str, str], str]]:
+    """
+    Check a memory-tier entry against storage, dropping it if the asset was deleted or replaced.
+
+    Deletes and re-uploads only clear the hot tier of the worker that handled them, so
+    other workers confirm their entries at most every `hot_cache_revalidate_interval`.
+    """
+    try:
+        _, source_key = await resolve_original(asset_id)
+        derivative_id = f"cache/{source_key}/{options.get_cache_key()}"
+        current = cache_validators(await storage.stat(derivative_id))
+    except FileNotFoundError:
+        current = None
+    if current is None or derivative_id != hot_entry[3] or current["ETag"] != hot_entry[2].get("ETag"):
+        hot_cache.discard(hot_key)
+        return None
+    hot_cache.confirm(hot_key)
+    return hot_entry
+
+
+async def _profiled_render(asset_id: str, options: ProcessingOptions, sprite_sheet_url: Optional[str]) -> Response:
+    """
+    Render a derivative with its engine call under cProfile, bypassing every cache tier.
+
+    The profile (pstats format) and a text summary are stored under the diagnostics
+    prefix; the response names them in X-MorphosX-Profile.
+    """
+    try:
+        original_id, source_key = await resolve_original(asset_id)
+        derivative_id = f"cache/{source_key}/{options.get_cache_key()}"
+        with capture_profiles() as profiles:
+            data, mime_type = await _transform_and_store(
+                asset_id, original_id, derivative_id, options, sprite_sheet_url
+            )
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    except MorphosXError as e:
+        raise handle_morphosx_error(e)
+
+    profile_dir = f"{settings.diagnostics_prefix}/profiles/{asset_id}"
+    profile_id = f"{profile_dir}/{int(time.time() * 1000)}-{options.get_cache_key()}"
+    profile_data, summary = merge_profiles(profiles)
+    await storage.save_asset(f"{profile_id}.prof", profile_data)
+    await storage.save_asset(f"{profile_id}.txt", summary.encode())
+    await _prune_profiles(profile_dir)
+
+    return Response(
+        content=data,
+        media_type=mime_type,
+        headers={
+            "Cache-Control": "no-store",
+            "X-MorphosX-Cache": "BYPASS",
+            "X-MorphosX-Profile": f"{profile_id}.prof",
+        },
+    )
+
+
+async def _prune_profiles(profile_dir: str):
+    # File names start with the capture time in ms: keep the newest `profile_retention` captures
+    files = sorted((item for item in await storage.list_assets(profile_dir) if not item.is_dir), key=lambda i: i.name)
+    # Two files (.prof and .txt) per capture
+    for item in files[: max(len(files) - 2 * settings.profile_retention, 0)]:
+        await storage.delete_asset(item.path)
+
+
+def _is_hidden_path(path: str) -> bool:
+    normalized = posixpath.normpath(f"/{path}").lstrip("/")
+    prefixes = (settings.diagnostics_prefix.strip("/"), *INTERNAL_PREFIXES)
+    return any(normalized == prefix or normalized.startswith(f"{prefix}/") for prefix in prefixes)
+
+
+@router.get("/original/{asset_id:path}")
+async def get_original_asset(
+    asset_id: str,
+    s: str = Query(..., alias="signature", description="HMAC-SHA256 signature with format 'original'"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    current_user: Optional[str] = Depends(get_current_user),
+):
+    """
+    Download an original as uploaded.
+    Byte ranges are read straight from storage, so players can seek in large videos.
+    """
+    verify_asset_access(asset_id, current_user)
+    if not verify_signature(asset_id, None, None, "original", 0, s, settings.secret_key, user_id=current_user):
+        raise HTTPException(status_code=403, detail="Invalid signature")
+
+    try:
+        original_id, _ = await resolve_original(asset_id)
+        meta = await storage.stat(original_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    validators = cache_validators(meta)
+    if _is_not_modified(validators, if_none_match, if_modified_since):
+        return _not_modified_response(validators)
+
+    media_type = guess_type(asset_id)[0] or "application/octet-stream"
+    headers = _delivery_headers(validators)
+
+    def read(offset: int, length: Optional[int]) -> AsyncIterator[bytes]:
+        return storage.open_stream(original_id, offset=offset, length=length)
+
+    try:
+        ranged = _range_response(read, meta.size, media_type, headers, range_header, if_range)
+        return ranged or StreamingResponse(
+            read(0, None),
+            media_type=media_type,
+            headers={**headers, "Content-Length": str(meta.size)},
+        )
+    except FileNotFoundError:
+        # Deleted since the stat
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+
 @router.get("/{asset_id:path}")
 async def get_processed_asset(
     asset_id: str,
@@ -190,17 +847,26 @@ async def get_processed_asset(
     preset: Optional[str] = Query(None, alias="preset"),
     t: float = Query(0.0, alias="time", ge=0.0),
     p: int = Query(1, alias="page", ge=1),
+    sprite: float = Query(0.0, alias="sprite", ge=0.0),
+    columns: int = Query(10, alias="columns", ge=1, le=50),
     s: str = Query(..., alias="signature", description="HMAC-SHA256 signature"),
+    profile: Optional[str] = Query(None, alias="profile", description="Signed token enabling a cProfile capture"),
+    profile_expires: int = Query(0, alias="profile_expires", description="Unix expiry signed into the profile token"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
     current_user: Optional[str] = Depends(get_current_user),
 ):
     """
     Retrieve and process an asset.
     Supports Smart Presets and User-bound protected assets.
+    Conditional requests are answered with 304 from metadata alone.
     """
-    target_w, target_h, target_fmt, target_q = _apply_preset(w, h, fmt, q, preset)
+    target_w, target_h, target_fmt, target_q = apply_preset(w, h, fmt, q, preset)
 
-    _verify_asset_access(asset_id, current_user)
-    _verify_request_signature(asset_id, w, h, fmt, q, s, preset, current_user)
+    verify_asset_access(asset_id, current_user)
+    verify_request_signature(asset_id, w, h, fmt, q, s, preset, current_user)
 
     options = ProcessingOptions(
         width=target_w,
@@ -209,76 +875,145 @@ async def get_processed_asset(
         quality=target_q,
         time=t,
         page=p,
+        sprite_interval=sprite,
+        sprite_columns=columns,
     )
 
-    # 2. Define Cache Paths
-    cache_key = options.get_cache_key()
-    derivative_id = f"cache/{asset_id}/{cache_key}"
+    sprite_sheet_url = None
+    if options.sprite_interval > 0:
+        if options.format not in SPRITE_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Storyboards are not available as {options.format.value}")
+        sprite_sheet_url = _sprite_sheet_url(asset_id, w, h, q, preset, current_user, options)
+    elif options.format == ImageFormat.VTT:
+        raise HTTPException(status_code=400, detail="VTT output requires a storyboard (sprite)")
+
+    if profile is not None:
+        if not verify_profile_token(
+            asset_id,
+            options.get_cache_key(),
+            profile_expires,
+            profile,
+            settings.secret_key,
+            user_id=current_user,
+            max_lifetime=settings.profile_token_max_lifetime,
+        ):
+            raise HTTPException(status_code=403, detail="Invalid or expired profiling token")
+        if not profile_budget.try_acquire():
+            raise HTTPException(
+                status_code=429,
+                detail="Too many profile captures",
+                headers={"Retry-After": str(int(profile_budget.window))},
+            )
+        return await _profiled_render(asset_id, options, sprite_sheet_url)
+
+    # 2. Memory tier: hot derivatives are served without any storage I/O. Keyed by the
+    # requested asset id, so content-addressed lookups are skipped as well.
+    hot_key = f"cache/{asset_id}/{options.get_cache_key()}"
+    hot_entry = hot_cache.get(hot_key)
+    if hot_entry and hot_cache.needs_revalidation(hot_key):
+        hot_entry = await _revalidate_hot_entry(hot_key, hot_entry, asset_id, options)
+    if hot_entry:
+        data, media_type, validators, derivative_id = hot_entry
+        if derivative_cache:
+            derivative_cache.record_hit(derivative_id, len(data))
+        if _is_not_modified(validators, if_none_match, if_modified_since):
+            CACHE_REQUESTS.inc(result="not_modified")
+            return _not_modified_response(validators)
+        CACHE_REQUESTS.inc(result="memory")
+        return _bytes_response(data, media_type, _delivery_headers(validators, "HIT"), range_header, if_range)
 
     try:
-        # 3. Cache Check (HIT)
+        # 3. Define Cache Paths
+        original_id, source_key = await resolve_original(asset_id)
+        derivative_id = f"cache/{source_key}/{options.get_cache_key()}"
+
+        # 4. Cache Check (HIT): stream from storage, never buffering the whole derivative
         try:
-            derivative_bytes = await storage.get_asset(derivative_id)
-            return Response(
-                content=derivative_bytes,
-                media_type=get_mime_type(options.format),
-                headers={
-                    "Cache-Control": "public, max-age=31536000, immutable",
-                    "X-MorphosX-Cache": "HIT",
-                },
+            with timed_stage("lookup"):
+                derivative_meta = await storage.stat(derivative_id)
+            if derivative_cache:
+                derivative_cache.record_hit(derivative_id, derivative_meta.size)
+            validators = cache_validators(derivative_meta)
+            if _is_not_modified(validators, if_none_match, if_modified_since):
+                # Revalidation: the stat already answered it, the body is never read
+                CACHE_REQUESTS.inc(result="not_modified")
+                return _not_modified_response(validators)
+            CACHE_REQUESTS.inc(result="hit")
+            media_type = get_mime_type(options.format)
+            headers = _delivery_headers(validators, "HIT")
+            if hot_cache.should_admit(hot_key, derivative_meta.size):
+                # Small and requested again: read it once, then serve it from memory
+                data = await storage.get_asset(derivative_id)
+                hot_cache.put(hot_key, data, media_type, validators, derivative_id)
+                return _bytes_response(data, media_type, headers, range_header, if_range)
+
+            def read(offset: int, length: Optional[int]) -> AsyncIterator[bytes]:
+                return storage.open_stream(derivative_id, offset=offset, length=length)
+
+            ranged = _range_response(read, derivative_meta.size, media_type, headers, range_header, if_range)
+            return ranged or StreamingResponse(
+                read(0, None),
+                media_type=media_type,
+                headers={**headers, "Content-Length": str(derivative_meta.size)},
             )
         except FileNotFoundError:
-            # 4. Cache Miss (MISS)
+            # 5. Cache Miss (MISS)
             pass
 
-        # 5. Fetch Original (Always from originals/ folder)
-        original_id = f"originals/{asset_id}"
-        source_bytes = await storage.get_asset(original_id)
-
-        # 6. Transform Pipeline (Using Registry)
-        processor = processor_registry.get_processor(asset_id)
-        if not processor:
-            raise HTTPException(status_code=415, detail="Unsupported media type")
-
-        processed_data, mime_type = processor.process(source_bytes, options, filename=asset_id)
-
-        # 7. Store derivative for future requests
-        await storage.save_asset(derivative_id, processed_data)
-
-        return Response(
-            content=processed_data,
-            media_type=mime_type,
-            headers={
-                "Cache-Control": "public, max-age=31536000, immutable",
-                "X-MorphosX-Cache": "MISS",
-            },
+        # 6. Render, coalescing concurrent misses for the same derivative
+        CACHE_REQUESTS.inc(result="miss")
+        (processed_data, mime_type), _ = await inflight_renders.do(
+            derivative_id,
+            lambda: render_derivative(asset_id, original_id, derivative_id, options, sprite_sheet_url),
         )
+        # Same validators the stored copy will report on later HITs
+        validators = cache_validators(await storage.stat(derivative_id))
+        if hot_cache.should_admit(hot_key, len(processed_data)):
+            hot_cache.put(hot_key, processed_data, mime_type, validators, derivative_id)
+
+        return _bytes_response(processed_data, mime_type, _delivery_headers(validators, "MISS"), range_header, if_range)
 
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Asset not found")
+    except MorphosXError as e:
+        raise handle_morphosx_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
 
-@router.get("/list/{path:path}")
-async def list_assets(path: str = "", current_user: Optional[str] = Depends(get_current_user)):
+@router.delete("/{asset_id:path}")
+async def delete_asset(
+    asset_id: str,
+    s: str = Query(..., alias="signature", description="HMAC-SHA256 signature with format 'delete'"),
+    current_user: Optional[str] = Depends(get_current_user),
+):
     """
-    List files and folders in a given path.
+    Delete an original and its derivatives.
+    Content-addressed blobs are only removed when their last reference goes.
     """
-    # Security: If path starts with users/, verify ownership
-    if path.startswith("users/"):
-        parts = path.split("/")
-        if len(parts) >= 2:
-            owner_id = parts[1]
-            if current_user != owner_id:
-                raise HTTPException(status_code=403, detail="Not authorized to browse this folder")
-
-    # If path is empty, default to listing 'originals/' (public root)
-    if not path:
-        path = "originals"
+    verify_asset_access(asset_id, current_user)
+    if not verify_signature(asset_id, None, None, "delete", 0, s, settings.secret_key, user_id=current_user):
+        raise HTTPException(status_code=403, detail="Invalid signature")
 
+    original_id = _original_id(asset_id)
+    hot_cache.discard_prefix(f"cache/{asset_id}/")
+    if render_queue:
+        await render_queue.forget(asset_id)
     try:
-        items = await storage.list_assets(path)
-        return {"path": path, "items": items}
+        content_store = get_content_store()
+        if content_store and await content_store.resolve(original_id):
+            digest, remaining = await content_store.delete(original_id)
+            if remaining == 0:
+                await _delete_prefix(f"cache/{_content_key(digest, asset_id)}")
+            return {"asset_id": asset_id, "deleted": True, "references": remaining}
+
+        await storage.stat(original_id)
+        await storage.delete_asset(original_id)
+        await _delete_prefix(f"cache/{asset_id}")
+        return {"asset_id": asset_id, "deleted": True, "references": 0}
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Asset not found")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Listing failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Delete failed: {str(e)}")
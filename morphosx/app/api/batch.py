@@ -0,0 +1,235 @@
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from morphosx.app.api import assets
+from morphosx.app.core.auth import get_current_user
+from morphosx.app.core.exceptions import MorphosXError, handle_morphosx_error
+from morphosx.app.core.metrics import CACHE_REQUESTS
+from morphosx.app.engine.types import ImageFormat, ProcessingOptions
+from morphosx.app.settings import settings
+from morphosx.app.storage.models import AssetMetadata
+
+router = APIRouter(prefix="/assets", tags=["Assets"])
+
+
+class BatchItem(BaseModel):
+    """
+    One signed transform, with the same parameters (and signature) as a single GET.
+    """
+
+    asset_id: str
+    width: Optional[int] = Field(None, ge=1, le=settings.max_image_dimension)
+    height: Optional[int] = Field(None, ge=1, le=settings.max_image_dimension)
+    format: Optional[ImageFormat] = None
+    quality: Optional[int] = Field(None, ge=1, le=100)
+    preset: Optional[str] = None
+    time: float = Field(0.0, ge=0.0)
+    page: int = Field(1, ge=1)
+    signature: str
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(..., min_length=1, max_length=settings.batch_max_items)
+    # 'json': manifest of signed URLs (misses are rendered first); 'multipart': the bodies themselves
+    output: Literal["json", "multipart"] = "json"
+
+
+@dataclass
+class BatchResult:
+    index: int
+    item: BatchItem
+    status: int = 200
+    error: Optional[str] = None
+    cache: Optional[str] = None
+    derivative_id: Optional[str] = None
+    media_type: Optional[str] = None
+    meta: Optional[AssetMetadata] = None
+    # Set when the body is already in memory (fresh render or hot tier)
+    data: Optional[bytes] = None
+
+
+def _item_url(item: BatchItem) -> str:
+    params = {
+        "width": item.width,
+        "height": item.height,
+        "format": item.format.value if item.format else None,
+        "quality": item.quality,
+        "preset": item.preset,
+        "time": item.time or None,
+        "page": item.page if item.page > 1 else None,
+    }
+    query = {key: value for key, value in params.items() if value is not None}
+    query["signature"] = item.signature
+    return f"{settings.api_prefix}/assets/{item.asset_id}?{urlencode(query)}"
+
+
+def _prepare(item: BatchItem, current_user: Optional[str]) -> ProcessingOptions:
+    """Same checks and option resolution as a single GET."""
+    target_w, target_h, target_fmt, target_q = assets.apply_preset(
+        item.width, item.height, item.format, item.quality, item.preset
+    )
+    assets.verify_asset_access(item.asset_id, current_user)
+    assets.verify_request_signature(
+        item.asset_id, item.width, item.height, item.format, item.quality, item.signature, item.preset, current_user
+    )
+    return ProcessingOptions(
+        width=target_w,
+        height=target_h,
+        format=target_fmt,
+        quality=target_q,
+        time=item.time,
+        page=item.page,
+    )
+
+
+async def _lookup(asset_id: str) -> Tuple[str, str, Dict[str, AssetMetadata]]:
+    """
+    Resolve an asset once for the whole batch: its original and every derivative it already has.
+
+    :return: (original_id, source_key, {cache_key: metadata}), from a single listing of its cache folder.
+    """
+    original_id, source_key = await assets.resolve_original(asset_id)
+    derivatives = await assets.storage.list_assets(f"cache/{source_key}")
+    return original_id, source_key, {meta.name: meta for meta in derivatives if not meta.is_dir}
+
+
+async def _resolve(
+    result: BatchResult,
+    options: ProcessingOptions,
+    lookup: "asyncio.Task[Tuple[str, str, Dict[str, AssetMetadata]]]",
+    render_slots: asyncio.Semaphore,
+) -> BatchResult:
+    cache_key = options.get_cache_key()
+    result.media_type = assets.get_mime_type(options.format)
+    try:
+        hot_key = f"cache/{result.item.asset_id}/{cache_key}"
+        hot_entry = assets.hot_cache.get(hot_key)
+        original_id, source_key, existing = await lookup
+        result.derivative_id = f"cache/{source_key}/{cache_key}"
+
+        if hot_entry:
+            # The batch lookup already listed storage: revalidate the memory tier against it for free
+            meta = existing.get(cache_key)
+            if (
+                meta is None
+                or hot_entry[3] != result.derivative_id
+                or assets.cache_validators(meta)["ETag"] != hot_entry[2].get("ETag")
+            ):
+                assets.hot_cache.discard(hot_key)
+            else:
+                assets.hot_cache.confirm(hot_key)
+                result.data, result.media_type, _, _ = hot_entry
+                result.cache = "HIT"
+                CACHE_REQUESTS.inc(result="memory")
+                result.meta = meta
+                if assets.derivative_cache:
+                    assets.derivative_cache.record_hit(result.derivative_id, meta.size)
+                return result
+
+        if cache_key in existing:
+            result.cache = "HIT"
+            CACHE_REQUESTS.inc(result="hit")
+            result.meta = existing[cache_key]
+            if assets.derivative_cache:
+                assets.derivative_cache.record_hit(result.derivative_id, result.meta.size)
+            return result
+
+        CACHE_REQUESTS.inc(result="miss")
+        # Misses share the worker pool with regular requests; the slots keep one batch from hogging it
+        async with render_slots:
+            (result.data, result.media_type), _ = await assets.inflight_renders.do(
+                result.derivative_id,
+                lambda: assets.render_derivative(result.item.asset_id, original_id, result.derivative_id, options),
+            )
+        result.cache = "MISS"
+        result.meta = await assets.storage.stat(result.derivative_id)
+    except HTTPException as e:
+        result.status, result.error = e.status_code, str(e.detail)
+    except MorphosXError as e:
+        error = handle_morphosx_error(e)
+        result.status, result.error = error.status_code, str(error.detail)
+    except FileNotFoundError:
+        result.status, result.error = 404, "Asset not found"
+    except Exception as e:
+        result.status, result.error = 500, f"Processing error: {str(e)}"
+    return result
+
+
+def _manifest_entry(result: BatchResult) -> Dict[str, object]:
+    entry = {"index": result.index, "asset_id": result.item.asset_id, "status": result.status}
+    if result.status != 200:
+        entry["error"] = result.error
+        return entry
+    entry.update(url=_item_url(result.item), cache=result.cache, content_type=result.media_type)
+    if result.meta:
+        entry.update(size=result.meta.size, etag=assets.cache_validators(result.meta)["ETag"])
+    return entry
+
+
+async def _multipart_body(tasks: List["asyncio.Future[BatchResult]"], boundary: str) -> AsyncIterator[bytes]:
+    # Parts go out in request order; later items keep resolving while earlier ones stream
+    for task in tasks:
+        result = await task
+        headers = {"X-MorphosX-Index": str(result.index), "X-MorphosX-Asset-Id": result.item.asset_id}
+        if result.status != 200:
+            body = json.dumps({"detail": result.error}).encode()
+            headers.update({"Content-Type": "application/json", "X-MorphosX-Status": str(result.status)})
+        else:
+            body = result.data
+            headers.update({"Content-Type": result.media_type, "X-MorphosX-Cache": result.cache})
+            if result.meta:
+                headers.update(assets.cache_validators(result.meta))
+                headers["Content-Length"] = str(result.meta.size)
+
+        yield f"--{boundary}\r\n".encode()
+        yield "".join(f"{name}: {value}\r\n" for name, value in headers.items()).encode() + b"\r\n"
+        if body is not None:
+            yield body
+        else:
+            async for chunk in assets.storage.open_stream(result.derivative_id):
+                yield chunk
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode()
+
+
+@router.post("/batch")
+async def batch_transform(request: BatchRequest, current_user: Optional[str] = Depends(get_current_user)):
+    """
+    Resolve many signed transforms in one request.
+
+    Each distinct asset costs one storage listing for all of its variants.
+    HITs are answered from that listing, misses render concurrently, and
+    failures are reported per item without failing the batch.
+    """
+    lookups: Dict[str, asyncio.Task] = {}
+    render_slots = asyncio.Semaphore(settings.batch_concurrency)
+    tasks: List[asyncio.Future] = []
+
+    for index, item in enumerate(request.items):
+        result = BatchResult(index=index, item=item)
+        try:
+            options = _prepare(item, current_user)
+        except HTTPException as e:
+            result.status, result.error = e.status_code, str(e.detail)
+            rejected = asyncio.get_running_loop().create_future()
+            rejected.set_result(result)
+            tasks.append(rejected)
+            continue
+        if item.asset_id not in lookups:
+            lookups[item.asset_id] = asyncio.ensure_future(_lookup(item.asset_id))
+        tasks.append(asyncio.ensure_future(_resolve(result, options, lookups[item.asset_id], render_slots)))
+
+    if request.output == "multipart":
+        boundary = uuid.uuid4().hex
+        return StreamingResponse(_multipart_body(tasks, boundary), media_type=f"multipart/mixed; boundary={boundary}")
+
+    results = await asyncio.gather(*tasks)
+    return {"items": [_manifest_entry(result) for result in results]}
@@ -0,0 +1,51 @@
+from collections import Counter
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from morphosx.app.api import assets
+from morphosx.app.core.auth import require_ops_token
+from morphosx.app.settings import settings
+
+router = APIRouter(prefix="/cache", tags=["Cache"])
+
+
+def require_stats_enabled():
+    """Hides the stats endpoint unless CACHE_STATS_ENABLED is set."""
+    if not settings.cache_stats_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@router.get("/stats", dependencies=[Depends(require_stats_enabled), Depends(require_ops_token)])
+async def cache_stats():
+    """
+    Derivative cache occupancy (entries, bytes, budget) and hit/store/eviction counters,
+    plus the in-memory tier, the parsed-document cache of this worker and the eager render queue.
+    """
+    memory = assets.hot_cache.stats() if assets.hot_cache.enabled else None
+    documents = _document_cache_stats()
+    queue = await assets.render_queue.stats() if assets.render_queue else None
+    if not assets.derivative_cache:
+        return {"enabled": False, "memory": memory, "documents": documents, "queue": queue}
+    return {
+        "enabled": True,
+        **await assets.derivative_cache.stats(),
+        "memory": memory,
+        "documents": documents,
+        "queue": queue,
+    }
+
+
+def _document_cache_stats() -> Optional[Dict[str, int]]:
+    # Only engines already loaded: a stats request must not build the PDF engine
+    caches = [
+        processor.document_cache
+        for processor in assets.processor_registry.loaded_processors()
+        if getattr(processor, "document_cache", None) is not None
+    ]
+    if not caches:
+        return None
+    totals: Counter = Counter()
+    for cache in caches:
+        totals.update(cache.stats())
+    return dict(totals)
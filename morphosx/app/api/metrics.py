@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from morphosx.app.core.auth import require_ops_token
+from morphosx.app.core.metrics import registry
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_ops_token)])
+async def metrics():
+    """
+    Metrics of this worker process in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,10 +1,19 @@
 import argparse
+import sys
 
 import uvicorn
 
 from morphosx.app.settings import settings
 
 
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(description="MorphosX Media Engine CLI")
     subparsers = parser.add_subparsers(dest="command")
@@ -19,12 +28,130 @@ def main():
         "--reload", action="store_true", help="Enable auto-reload"
     )
 
+    # Command: bench
+    bench_parser = subparsers.add_parser(
+        "bench", help="Benchmark the engines on synthetic fixtures"
+    )
+    bench_parser.add_argument(
+        "--fixtures",
+        default="image,thumb,pdf,video,audio,archive,mesh,text",
+        help="Comma-separated fixture kinds to run",
+    )
+    bench_parser.add_argument(
+        "--cores", default="pil,vips", help="Core image engines to compare"
+    )
+    bench_parser.add_argument(
+        "--quick", action="store_true", help="Only the smallest size of each fixture"
+    )
+    bench_parser.add_argument(
+        "--filter", help="Only run cases whose name contains this text"
+    )
+    bench_parser.add_argument(
+        "--iterations", type=positive_int, default=5, help="Timed runs per case"
+    )
+    bench_parser.add_argument(
+        "--warmup", type=int, default=1, help="Untimed runs per case"
+    )
+    bench_parser.add_argument(
+        "--samples", help="Directory of real files to benchmark too (RAW, IFC, office...)"
+    )
+    bench_parser.add_argument(
+        "--fixtures-dir", help="Where generated fixtures are cached"
+    )
+    bench_parser.add_argument(
+        "--no-isolate",
+        action="store_true",
+        help="Run in this process instead of one process per case",
+    )
+    bench_parser.add_argument("--output", help="Save the results as a JSON baseline")
+    bench_parser.add_argument(
+        "--baseline", help="JSON baseline to compare against"
+    )
+    bench_parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed p50/RSS increase against the baseline before exiting with 1",
+    )
+
+    # Command: loadtest
+    load_parser = subparsers.add_parser(
+        "loadtest", help="Drive the HTTP API with a mix of hits, misses, uploads and listings"
+    )
+    load_parser.add_argument(
+        "--url", help="Running server to target (default: the app in-process over ASGI)"
+    )
+    load_parser.add_argument(
+        "--storage",
+        choices=["local", "s3"],
+        default="local",
+        help="Backend of the in-process app",
+    )
+    load_parser.add_argument(
+        "--s3-endpoint", help="S3-compatible endpoint (default: an in-process moto server)"
+    )
+    load_parser.add_argument("--s3-bucket", help="Bucket on --s3-endpoint")
+    load_parser.add_argument(
+        "--engine",
+        choices=["pil", "vips"],
+        help="Core image engine of the in-process app (default: ENGINE_TYPE)",
+    )
+    load_parser.add_argument(
+        "--mix",
+        default="hit=70,miss=20,upload=5,list=5",
+        help="Relative weights of the request kinds",
+    )
+    load_parser.add_argument(
+        "--concurrency", type=int, default=16, help="Concurrent clients"
+    )
+    load_parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds of load"
+    )
+    load_parser.add_argument(
+        "--requests", type=int, help="Stop after this many requests"
+    )
+    load_parser.add_argument(
+        "--seeds", type=int, default=8, help="Originals uploaded during setup"
+    )
+    load_parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed of the request sequence"
+    )
+    load_parser.add_argument("--output", help="Save the report as JSON")
+
+    # Command: importtime
+    import_parser = subparsers.add_parser(
+        "importtime", help="Report what a worker spends importing at startup"
+    )
+    import_parser.add_argument(
+        "--module", default="morphosx.app.main", help="Module to import"
+    )
+    import_parser.add_argument(
+        "--engines",
+        action="store_true",
+        help="Also load every enabled engine and report its cost",
+    )
+    import_parser.add_argument(
+        "--top", type=int, default=20, help="Entries per section"
+    )
+
     args = parser.parse_args()
 
     if args.command == "start":
         uvicorn.run(
             "morphosx.app.main:app", host=args.host, port=args.port, reload=args.reload
         )
+    elif args.command == "bench":
+        from morphosx.app.core.bench import run_cli
+
+        sys.exit(run_cli(args))
+    elif args.command == "loadtest":
+        from morphosx.app.core.loadtest import run_cli
+
+        sys.exit(run_cli(args))
+    elif args.command == "importtime":
+        from morphosx.app.core.importtime import run_cli
+
+        sys.exit(run_cli(args))
     else:
         parser.print_help()
 
@@ -1,7 +1,8 @@
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
@@ -33,6 +34,22 @@ def get_current_user(token: Optional[str] = Depends(oauth2_scheme)) -> Optional[
         )
 
 
+def require_ops_token(authorization: Optional[str] = Header(None)):
+    """
+    Guards operational endpoints: when OPS_TOKEN is set, requests must send it as a bearer token.
+    """
+    if not settings.ops_token:
+        return
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.ops_token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid operations token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     Helper to generate a JWT for testing or initial setup.
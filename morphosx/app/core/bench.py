@@ -0,0 +1,442 @@
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from morphosx.app.engine.types import ImageFormat, ProcessingOptions
+
+# Core image engines every case is run against (settings.engine_type values)
+CORES = ("pil", "vips")
+
+# Report format version, bumped when fields change meaning
+REPORT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class FixtureSpec:
+    """
+    A kind of synthetic input, generated deterministically at several sizes.
+
+    :param generate: Writes a fixture of the given size to the given path.
+    :param extension: File extension, which selects the engine through the registry.
+    :param sizes: Default sizes; the first is the one used by --quick.
+    :param unit: Suffix of the size in case names (mp, p, s...).
+    :param options: Transform applied on every iteration.
+    """
+
+    generate: Callable[[int, Path], None]
+    extension: str
+    sizes: Tuple[int, ...]
+    unit: str
+    options: ProcessingOptions
+
+
+@dataclass
+class BenchCase:
+    """One fixture run through the engine registered for it, on one core image engine."""
+
+    name: str
+    fixture: str
+    size: int
+    core: str
+    path: str = ""
+    # Set when the fixture could not be generated (e.g. ffmpeg missing)
+    error: Optional[str] = None
+
+
+@dataclass
+class BenchResult:
+    case: str
+    fixture: str
+    size: int
+    core: str
+    engine: Optional[str] = None
+    input_bytes: int = 0
+    iterations: int = 0
+    ops_per_sec: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    mean_ms: Optional[float] = None
+    # Peak RSS of the benchmark process before the first and after the last iteration
+    baseline_rss_mb: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Comparison:
+    case: str
+    baseline_p50_ms: float
+    p50_ms: float
+    baseline_rss_mb: Optional[float]
+    peak_rss_mb: Optional[float]
+    regressed: bool = False
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def p50_change(self) -> float:
+        return self.p50_ms / self.baseline_p50_ms - 1 if self.baseline_p50_ms else 0.0
+
+
+def _image(megapixels: int, path: Path):
+    # Blurred seeded noise tiles: compresses like a photo, identical bytes on every run
+    width = int(math.sqrt(megapixels * 1_000_000 * 3 / 2))
+    height = megapixels * 1_000_000 // width
+    rng = random.Random(megapixels)
+    tile = Image.frombytes("RGB", (256, 256), rng.randbytes(256 * 256 * 3)).filter(ImageFilter.GaussianBlur(2))
+    image = Image.new("RGB", (width, height))
+    for x in range(0, width, 256):
+        for y in range(0, height, 256):
+            image.paste(tile, (x, y))
+    image.save(path, format="JPEG", quality=90)
+
+
+def _pdf(pages: int, path: Path):
+    rendered = []
+    for number in range(1, pages + 1):
+        page = Image.new("RGB", (1240, 1754), "white")
+        draw = ImageDraw.Draw(page)
+        draw.rectangle((100, 100, 1140, 400), outline="black", width=4)
+        for line in range(40):
+            draw.text((100, 450 + line * 30), f"Page {number}, line {line}: " + "lorem ipsum " * 8, fill="black")
+        rendered.append(page)
+    rendered[0].save(path, format="PDF", save_all=True, append_images=rendered[1:], resolution=150)
+
+
+def _ffmpeg(source: str, seconds: int, path: Path):
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi", "-i", source, "-t", str(seconds), str(path)],
+            check=True,
+            capture_output=True,
+        )
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is not installed")
+
+
+def _video(seconds: int, path: Path):
+    _ffmpeg("testsrc2=size=1280x720:rate=30", seconds, path)
+
+
+def _audio(seconds: int, path: Path):
+    _ffmpeg("sine=frequency=440:sample_rate=44100", seconds, path)
+
+
+def _archive(files: int, path: Path):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for index in range(files):
+            archive.writestr(f"folder-{index // 100:04d}/file-{index:06d}.txt", f"entry {index}\n" * 16)
+
+
+def _mesh(faces: int, path: Path):
+    import trimesh
+
+    # An icosphere has 20 * 4^n faces
+    subdivisions = max(0, round(math.log(faces / 20, 4)))
+    trimesh.creation.icosphere(subdivisions=subdivisions).export(str(path), file_type="stl")
+
+
+def _text(kilobytes: int, path: Path):
+    rng = random.Random(kilobytes)
+    records, size = [], 0
+    while size < kilobytes * 1024:
+        record = {"id": len(records), "name": f"item-{rng.randrange(10**6)}", "tags": ["a", "b"], "score": rng.random()}
+        records.append(record)
+        size += len(json.dumps(record)) + 2
+    path.write_text(json.dumps(records, indent=2))
+
+
+FIXTURES: Dict[str, FixtureSpec] = {
+    "image": FixtureSpec(_image, "jpg", (1, 12, 50), "mp", ProcessingOptions(width=1024, format=ImageFormat.WEBP)),
+    # The 'thumb' preset: exercises JPEG draft decoding (pil) and shrink-on-load (vips)
+    "thumb": FixtureSpec(
+        _image, "jpg", (24,), "mp", ProcessingOptions(width=150, height=150, format=ImageFormat.WEBP, quality=70)
+    ),
+    "pdf": FixtureSpec(_pdf, "pdf", (1, 20, 100), "p", ProcessingOptions(width=1024, format=ImageFormat.WEBP)),
+    "video": FixtureSpec(_video, "mp4", (2, 10), "s", ProcessingOptions(width=640, time=1.0)),
+    "audio": FixtureSpec(_audio, "wav", (10, 60), "s", ProcessingOptions(width=800)),
+    "archive": FixtureSpec(_archive, "zip", (100, 10000), "f", ProcessingOptions(width=512)),
+    "mesh": FixtureSpec(_mesh, "stl", (1280, 20480, 327680), "f", ProcessingOptions(width=512)),
+    "text": FixtureSpec(_text, "json", (4, 256), "kb", ProcessingOptions(width=512)),
+}
+
+# Transform applied to user-supplied samples (--samples)
+SAMPLE_OPTIONS = ProcessingOptions(width=1024, format=ImageFormat.WEBP)
+
+
+def default_fixtures_dir() -> Path:
+    return Path(tempfile.gettempdir()) / "morphosx-bench"
+
+
+def prepare_fixture(kind: str, size: int, directory: Path) -> Path:
+    """
+    Generate a fixture, or reuse it from a previous run.
+
+    :return: Path of the fixture file.
+    """
+    spec = FIXTURES[kind]
+    path = directory / f"{kind}-{size}{spec.unit}.{spec.extension}"
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.tmp{path.suffix}")
+        spec.generate(size, partial)
+        partial.replace(path)
+    return path
+
+
+def build_cases(
+    fixtures: Iterable[str] = tuple(FIXTURES),
+    cores: Iterable[str] = CORES,
+    quick: bool = False,
+    fixtures_dir: Optional[Path] = None,
+    samples_dir: Optional[Path] = None,
+) -> List[BenchCase]:
+    """
+    Generate the fixtures and list the cases to run.
+
+    :param fixtures: Fixture kinds to include.
+    :param cores: Core image engines to run every case on.
+    :param quick: Only the smallest size of each fixture.
+    :param fixtures_dir: Where generated fixtures are cached.
+    :param samples_dir: Extra real-world files (RAW, IFC, office...), benchmarked as they are.
+    """
+    directory = fixtures_dir or default_fixtures_dir()
+    inputs: List[Tuple[str, str, int, str, Optional[str]]] = []
+
+    for kind in fixtures:
+        spec = FIXTURES[kind]
+        for size in spec.sizes[:1] if quick else spec.sizes:
+            label = f"{kind}-{size}{spec.unit}"
+            try:
+                inputs.append((label, kind, size, str(prepare_fixture(kind, size, directory)), None))
+            except Exception as e:
+                inputs.append((label, kind, size, "", f"fixture: {type(e).__name__}: {e}"))
+
+    if samples_dir:
+        for path in sorted(Path(samples_dir).iterdir()):
+            if path.is_file():
+                inputs.append((path.name, "sample", 0, str(path), None))
+
+    return [
+        BenchCase(name=f"{label}[{core}]", fixture=kind, size=size, core=core, path=path, error=error)
+        for core in cores
+        for label, kind, size, path, error in inputs
+    ]
+
+
+def run_case(case: BenchCase, iterations: int = 5, warmup: int = 1) -> BenchResult:
+    """
+    Time the engine on one case. Runs in the calling process; see run_benchmarks().
+    """
+    from morphosx.app.engine.base import ProcessorRegistry, initialize_registry
+
+    result = BenchResult(case=case.name, fixture=case.fixture, size=case.size, core=case.core, error=case.error)
+    if case.error:
+        return result
+
+    options = FIXTURES[case.fixture].options if case.fixture in FIXTURES else SAMPLE_OPTIONS
+    filename = Path(case.path).name
+    latencies: List[float] = []
+    try:
+        engine = initialize_registry(ProcessorRegistry(), case.core).get_processor(filename)
+        result.engine = type(engine).__name__
+        data = Path(case.path).read_bytes()
+        result.input_bytes = len(data)
+        result.baseline_rss_mb = _peak_rss_mb()
+
+        for _ in range(warmup):
+            engine.process(data, options, filename)
+        for _ in range(iterations):
+            start = time.perf_counter()
+            engine.process(data, options, filename)
+            latencies.append(time.perf_counter() - start)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    result.iterations = len(latencies)
+    result.peak_rss_mb = _peak_rss_mb()
+    if not latencies:
+        # Nothing was timed (iterations=0): report the run without latency stats
+        return result
+    result.ops_per_sec = round(len(latencies) / sum(latencies), 3)
+    result.p50_ms = round(percentile(latencies, 50) * 1000, 3)
+    result.p99_ms = round(percentile(latencies, 99) * 1000, 3)
+    result.mean_ms = round(sum(latencies) / len(latencies) * 1000, 3)
+    return result
+
+
+def run_benchmarks(
+    cases: Sequence[BenchCase],
+    iterations: int = 5,
+    warmup: int = 1,
+    isolate: bool = True,
+    progress: Optional[Callable[[BenchResult], None]] = None,
+) -> List[BenchResult]:
+    """
+    Run every case, each in a fresh process by default.
+
+    A fresh interpreter per case keeps peak RSS attributable to that case and
+    stops one engine's caches or allocator state from skewing the next.
+
+    :param isolate: False runs in this process (faster; peak RSS is then cumulative).
+    :param progress: Called with each result as it completes.
+    """
+    results = []
+    for case in cases:
+        if isolate and not case.error:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                result = executor.submit(run_case, case, iterations, warmup).result()
+        else:
+            result = run_case(case, iterations, warmup)
+        if progress:
+            progress(result)
+        results.append(result)
+    return results
+
+
+def save_report(results: Sequence[BenchResult], path: Path, iterations: int):
+    """Write results as a JSON baseline, with the environment they were measured in."""
+    from morphosx.app import __version__
+
+    report = {
+        "version": REPORT_VERSION,
+        "morphosx": __version__,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "iterations": iterations,
+        "results": [asdict(result) for result in results],
+    }
+    Path(path).write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load_report(path: Path) -> List[BenchResult]:
+    report = json.loads(Path(path).read_text())
+    if report.get("version") != REPORT_VERSION:
+        raise ValueError(f"Unsupported benchmark report version: {report.get('version')}")
+    return [BenchResult(**result) for result in report["results"]]
+
+
+def compare(
+    results: Sequence[BenchResult], baseline: Sequence[BenchResult], max_regression: float = 0.2
+) -> List[Comparison]:
+    """
+    Diff results against a baseline, case by case.
+
+    :param max_regression: Allowed relative increase of p50 latency and peak RSS (0.2 = 20%).
+    :return: One entry per case measured in both runs.
+    """
+    previous = {result.case: result for result in baseline if result.p50_ms}
+    comparisons = []
+    for result in results:
+        before = previous.get(result.case)
+        if before is None or not result.p50_ms:
+            continue
+        entry = Comparison(
+            case=result.case,
+            baseline_p50_ms=before.p50_ms,
+            p50_ms=result.p50_ms,
+            baseline_rss_mb=before.peak_rss_mb,
+            peak_rss_mb=result.peak_rss_mb,
+        )
+        if entry.p50_change > max_regression:
+            entry.regressed = True
+            entry.notes.append(f"p50 +{entry.p50_change:.0%}")
+        if before.peak_rss_mb and result.peak_rss_mb and result.peak_rss_mb > before.peak_rss_mb * (1 + max_regression):
+            entry.regressed = True
+            entry.notes.append(f"rss +{result.peak_rss_mb / before.peak_rss_mb - 1:.0%}")
+        comparisons.append(entry)
+    return comparisons
+
+
+def format_result(result: BenchResult) -> str:
+    if result.error:
+        return f"{result.case:<28} {'-':<20} skipped: {result.error}"
+    if not result.iterations:
+        return f"{result.case:<28} {result.engine:<20} no timed iterations"
+    return (
+        f"{result.case:<28} {result.engine:<20} {result.ops_per_sec:>9.2f} ops/s"
+        f"  p50 {result.p50_ms:>9.1f} ms  p99 {result.p99_ms:>9.1f} ms  rss {result.peak_rss_mb or 0:>7.1f} MB"
+    )
+
+
+def format_comparison(entry: Comparison) -> str:
+    status = "REGRESSED " + ", ".join(entry.notes) if entry.regressed else "ok"
+    change = f"{entry.baseline_p50_ms:>9.1f} -> {entry.p50_ms:>9.1f} ms ({entry.p50_change:+.0%})"
+    return f"{entry.case:<28} p50 {change}  {status}"
+
+
+def run_cli(args) -> int:
+    """
+    Entry point of `morphosx bench`.
+
+    :return: Exit status: 1 when a case regressed beyond --max-regression against --baseline.
+    """
+    fixtures = [kind for kind in args.fixtures.split(",") if kind]
+    unknown = set(fixtures) - set(FIXTURES)
+    if unknown:
+        print(f"Unknown fixtures: {', '.join(sorted(unknown))}. Available: {', '.join(FIXTURES)}", file=sys.stderr)
+        return 2
+
+    cases = build_cases(
+        fixtures=fixtures,
+        cores=[core for core in args.cores.split(",") if core],
+        quick=args.quick,
+        fixtures_dir=Path(args.fixtures_dir) if args.fixtures_dir else None,
+        samples_dir=Path(args.samples) if args.samples else None,
+    )
+    if args.filter:
+        cases = [case for case in cases if args.filter in case.name]
+
+    results = run_benchmarks(
+        cases,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        isolate=not args.no_isolate,
+        progress=lambda result: print(format_result(result), flush=True),
+    )
+
+    if args.output:
+        save_report(results, Path(args.output), args.iterations)
+        print(f"\nSaved {len(results)} results to {args.output}")
+
+    if not args.baseline:
+        return 0
+
+    comparisons = compare(results, load_report(Path(args.baseline)), args.max_regression)
+    print(f"\nAgainst {args.baseline}:")
+    for entry in comparisons:
+        print(format_comparison(entry))
+    return 1 if any(entry.regressed for entry in comparisons) else 0
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    # Nearest-rank: with few iterations p99 is the slowest run
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
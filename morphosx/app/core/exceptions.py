@@ -25,10 +25,24 @@ class SignatureError(MorphosXError):
     pass
 
 
+class CapacityError(MorphosXError):
+    """Raised when the processing workers are saturated."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 def handle_morphosx_error(err: MorphosXError):
     """
     Map internal MorphosX errors to FastAPI HTTPExceptions.
     """
+    if isinstance(err, CapacityError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server busy: {str(err)}",
+            headers={"Retry-After": str(err.retry_after)},
+        )
     if isinstance(err, StorageError):
         return HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -0,0 +1,92 @@
+import json
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# "import time:       self [us] |  cumulative | imported package" lines of `python -X importtime`
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    # 0 for modules imported directly by the measured code
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse the stderr of `python -X importtime`."""
+    records = []
+    for line in output.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def measure_startup(module: str = "morphosx.app.main", load_engines: bool = False) -> Tuple[List[ImportRecord], Dict]:
+    """
+    Import a module in a fresh interpreter under `-X importtime`.
+
+    :param module: Module whose import is measured (the uvicorn app by default).
+    :param load_engines: Also load every lazily registered engine afterwards.
+    :return: (records, engines): the import records, and per-engine load times in ms when load_engines is set.
+    """
+    code = f"import {module}"
+    if load_engines:
+        code += (
+            "\nimport json"
+            "\nfrom morphosx.app.api import assets"
+            "\nloaded = assets.processor_registry.load_all()"
+            "\nprint(json.dumps({name: round(seconds * 1000, 1) for name, seconds in loaded.items()}))"
+        )
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    records = parse_importtime(completed.stderr)
+    if completed.returncode != 0:
+        errors = "\n".join(line for line in completed.stderr.splitlines() if not IMPORT_LINE.match(line))
+        raise RuntimeError(f"Importing {module} failed:\n{errors}")
+    engines = json.loads(completed.stdout.strip().splitlines()[-1]) if load_engines else {}
+    return records, engines
+
+
+def format_report(module: str, records: List[ImportRecord], engines: Dict[str, float], top: int = 20) -> str:
+    packages: Dict[str, int] = {}
+    for record in records:
+        # Attribute each module's own time to its top-level package
+        package = record.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + record.self_us
+
+    startup = next((record.cumulative_us for record in records if record.module == module and record.depth == 0), 0)
+    total = sum(record.cumulative_us for record in records if record.depth == 0)
+    lines = [f"Importing {module}: {startup / 1000:.1f} ms"]
+    if engines:
+        lines.append(f"Including every engine: {total / 1000:.1f} ms")
+    lines += [f"Modules: {len(records)}", "", "By package (self time):"]
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {self_us / 1000:>9.1f} ms  {package}")
+
+    lines += ["", "Slowest modules (cumulative):"]
+    for record in sorted(records, key=lambda record: -record.cumulative_us)[:top]:
+        lines.append(f"  {record.cumulative_us / 1000:>9.1f} ms  {record.module}")
+
+    if engines:
+        lines += ["", "Lazy engines (import + build on first request):"]
+        for name, load_ms in sorted(engines.items(), key=lambda item: -item[1]):
+            lines.append(f"  {load_ms:>9.1f} ms  {name}")
+    return "\n".join(lines)
+
+
+def run_cli(args) -> int:
+    """Entry point of `morphosx importtime`."""
+    try:
+        records, engines = measure_startup(args.module, load_engines=args.engines)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(format_report(args.module, records, engines, top=args.top))
+    return 0
@@ -0,0 +1,390 @@
+import asyncio
+import io
+import json
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from PIL import Image, ImageDraw
+
+from morphosx.app.core.bench import percentile
+from morphosx.app.core.security import generate_signature
+from morphosx.app.settings import settings
+
+# Request kinds a load mix can weight
+KINDS = ("hit", "miss", "upload", "list")
+
+DEFAULT_MIX = "hit=70,miss=20,upload=5,list=5"
+
+# Derivatives rendered during setup; 'hit' requests only ask for these
+HIT_WIDTHS = (160, 320, 640)
+
+
+@dataclass
+class Sample:
+    kind: str
+    latency: float
+    status: int
+    # X-MorphosX-Cache of GETs (HIT, MISS, BYPASS)
+    cache: Optional[str] = None
+
+
+@dataclass
+class LoadReport:
+    target: str
+    duration: float
+    concurrency: int
+    samples: List[Sample] = field(default_factory=list)
+    # Event-loop lag samples (seconds); with an in-process target this is the server's loop
+    loop_lag: List[float] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, object]:
+        kinds = {}
+        for kind in KINDS:
+            samples = [sample for sample in self.samples if sample.kind == kind]
+            if samples:
+                kinds[kind] = {
+                    **_latency_summary([sample.latency for sample in samples]),
+                    "requests": len(samples),
+                    "errors": sum(1 for sample in samples if sample.status >= 400),
+                    "statuses": dict(Counter(str(sample.status) for sample in samples)),
+                    "cache": dict(Counter(sample.cache for sample in samples if sample.cache)),
+                }
+        return {
+            "target": self.target,
+            "duration": round(self.duration, 3),
+            "concurrency": self.concurrency,
+            "requests": len(self.samples),
+            "errors": sum(1 for sample in self.samples if sample.status >= 400),
+            "throughput": round(len(self.samples) / self.duration, 2) if self.duration else 0.0,
+            "latency": _latency_summary([sample.latency for sample in self.samples]),
+            "loop_lag": _latency_summary(self.loop_lag),
+            "kinds": kinds,
+        }
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Parse a request mix such as 'hit=70,miss=20,upload=5,list=5'.
+
+    :return: Weight per request kind; kinds left out get no traffic.
+    """
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        kind, _, weight = part.partition("=")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown request kind '{kind}'. Available: {', '.join(KINDS)}")
+        mix[kind] = float(weight)
+        if mix[kind] < 0:
+            raise ValueError(f"Negative weight for '{kind}'")
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one positive weight")
+    return mix
+
+
+class LoopLagMonitor:
+    """
+    Samples event-loop lag: how late a short sleep wakes up.
+
+    A blocked loop (sync I/O, CPU work on the loop) delays every request on
+    the worker; the lag shows it even when request latencies look acceptable.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _sample(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+
+class LoadGenerator:
+    """
+    Closed-loop load: `concurrency` clients issue requests back to back, drawn from the mix.
+
+    Setup uploads seed originals and renders the HIT_WIDTHS derivatives of
+    each, so 'hit' requests find them cached. 'miss' requests walk a sequence
+    of odd widths and qualities that are never repeated within a run.
+    """
+
+    def __init__(self, client, mix: Dict[str, float], concurrency: int = 16, seeds: int = 8, seed: int = 0):
+        self.client = client
+        self.mix = mix
+        self.concurrency = concurrency
+        self.seeds = seeds
+        self.random = random.Random(seed)
+        self.assets: List[str] = []
+        self._upload_body = _seed_image(-1, (640, 480))
+        self._misses = 0
+
+    async def setup(self):
+        """Upload the seed originals and warm their hit derivatives."""
+        for index in range(self.seeds):
+            response = await self._upload(_seed_image(index))
+            response.raise_for_status()
+            self.assets.append(response.json()["asset_id"])
+        for asset_id in self.assets:
+            for width in HIT_WIDTHS:
+                response = await self.client.get(_signed_url(asset_id, width))
+                response.raise_for_status()
+
+    async def run(self, duration: float = 10.0, max_requests: Optional[int] = None) -> LoadReport:
+        """
+        Generate load until `duration` elapses or `max_requests` were sent.
+        """
+        report = LoadReport(target=str(self.client.base_url), duration=0.0, concurrency=self.concurrency)
+        kinds, weights = zip(*self.mix.items())
+        deadline = time.perf_counter() + duration
+        issued = 0
+
+        async def client_loop():
+            nonlocal issued
+            while time.perf_counter() < deadline and (max_requests is None or issued < max_requests):
+                issued += 1
+                kind = self.random.choices(kinds, weights)[0]
+                start = time.perf_counter()
+                try:
+                    response = await self._send(kind)
+                    status, cache = response.status_code, response.headers.get("X-MorphosX-Cache")
+                except Exception:
+                    status, cache = 599, None
+                report.samples.append(Sample(kind, time.perf_counter() - start, status, cache))
+
+        monitor = LoopLagMonitor()
+        monitor.start()
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(client_loop() for _ in range(self.concurrency)))
+        finally:
+            report.duration = time.perf_counter() - start
+            await monitor.stop()
+        report.loop_lag = monitor.samples
+        return report
+
+    async def _send(self, kind: str):
+        if kind == "hit":
+            return await self.client.get(_signed_url(self.random.choice(self.assets), self.random.choice(HIT_WIDTHS)))
+        if kind == "miss":
+            return await self.client.get(self._next_miss())
+        if kind == "upload":
+            return await self._upload(self._upload_body)
+        return await self.client.get(f"{settings.api_prefix}/assets/list/originals")
+
+    def _next_miss(self) -> str:
+        index, self._misses = self._misses, self._misses + 1
+        asset_id = self.assets[index % len(self.assets)]
+        # Odd widths never collide with HIT_WIDTHS; quality moves on once the widths are used up
+        widths = (min(settings.max_image_dimension, 2000) - 33) // 2
+        step = index // len(self.assets)
+        return _signed_url(asset_id, 33 + 2 * (step % widths), quality=50 + (step // widths) % 46)
+
+    async def _upload(self, body: bytes):
+        return await self.client.post(
+            f"{settings.api_prefix}/assets/upload", files={"file": ("load.jpg", body, "image/jpeg")}
+        )
+
+
+@asynccontextmanager
+async def in_process_client(
+    storage_type: str = "local",
+    s3_endpoint: Optional[str] = None,
+    s3_bucket: Optional[str] = None,
+    engine_type: Optional[str] = None,
+) -> AsyncIterator[object]:
+    """
+    An httpx client bound to a fresh app over ASGI, with the app lifespan running.
+
+    The assets router is pointed at an isolated backend for the duration:
+    a temporary LocalStorage, or S3 (an endpoint such as MinIO, else an
+    in-process moto server).
+
+    :param engine_type: Core image engine of the app, 'vips' or 'pil' (default: settings.engine_type).
+    """
+    try:
+        import httpx
+    except ImportError:
+        raise RuntimeError("httpx is not installed. Run 'pip install httpx' to use the load tester.")
+
+    from morphosx.app.api import assets
+    from morphosx.app.engine.base import ProcessorRegistry, initialize_registry
+    from morphosx.app.main import create_app
+    from morphosx.app.storage.local import LocalStorage
+    from morphosx.app.storage.s3 import S3Storage
+
+    directory = tempfile.mkdtemp(prefix="morphosx-loadtest-")
+    server = None
+    if storage_type == "s3" and not s3_endpoint:
+        server, endpoint_url = _start_moto()
+        _create_bucket(endpoint_url, "morphosx-loadtest")
+        backend = S3Storage(
+            bucket_name="morphosx-loadtest",
+            region_name="us-east-1",
+            endpoint_url=endpoint_url,
+            access_key_id="testing",
+            secret_access_key="testing",
+        )
+    elif storage_type == "s3":
+        backend = S3Storage(
+            bucket_name=s3_bucket or settings.s3_bucket,
+            region_name=settings.s3_region,
+            endpoint_url=s3_endpoint,
+            access_key_id=settings.s3_access_key,
+            secret_access_key=settings.s3_secret_key,
+        )
+    else:
+        backend = LocalStorage(base_directory=directory)
+
+    previous = assets.storage, assets.derivative_cache, assets.processor_registry
+    assets.storage, assets.derivative_cache = backend, None
+    if engine_type:
+        assets.processor_registry = initialize_registry(ProcessorRegistry(), engine_type=engine_type)
+    app = create_app()
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://morphosx", timeout=None) as client:
+                yield client
+    finally:
+        assets.storage, assets.derivative_cache, assets.processor_registry = previous
+        if server:
+            server.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@asynccontextmanager
+async def remote_client(url: str, concurrency: int) -> AsyncIterator[object]:
+    """An httpx client for a running server (e.g. a local uvicorn)."""
+    try:
+        import httpx
+    except ImportError:
+        raise RuntimeError("httpx is not installed. Run 'pip install httpx' to use the load tester.")
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        yield client
+
+
+def format_report(report: Dict[str, object]) -> str:
+    lines = [
+        f"Target: {report['target']}  concurrency {report['concurrency']}  {report['duration']:.1f} s",
+        f"Requests: {report['requests']}  errors {report['errors']}  throughput {report['throughput']:.1f} req/s",
+        "",
+        f"{'kind':<8} {'requests':>8} {'errors':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}  cache",
+    ]
+    rows = [*report["kinds"].items(), ("all", {**report["latency"], "requests": report["requests"]})]
+    for kind, stats in rows:
+        cache = " ".join(f"{name}={count}" for name, count in stats.get("cache", {}).items())
+        lines.append(
+            f"{kind:<8} {stats['requests']:>8} {stats.get('errors', report['errors']):>6} {stats['p50_ms']:>9.1f}"
+            f" {stats['p90_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}  {cache}"
+        )
+    lag = report["loop_lag"]
+    lines.append("")
+    lines.append(f"Event-loop lag: p50 {lag['p50_ms']:.1f} ms  p99 {lag['p99_ms']:.1f} ms  max {lag['max_ms']:.1f} ms")
+    return "\n".join(lines)
+
+
+async def run_load(args) -> Dict[str, object]:
+    mix = parse_mix(args.mix)
+    if args.url:
+        target = remote_client(args.url, args.concurrency)
+    else:
+        target = in_process_client(args.storage, args.s3_endpoint, args.s3_bucket, args.engine)
+
+    async with target as client:
+        generator = LoadGenerator(client, mix, concurrency=args.concurrency, seeds=args.seeds, seed=args.seed)
+        await generator.setup()
+        report = await generator.run(duration=args.duration, max_requests=args.requests)
+    return report.to_dict()
+
+
+def run_cli(args) -> int:
+    """
+    Entry point of `morphosx loadtest`.
+
+    :return: Exit status: 1 when any request failed.
+    """
+    try:
+        report = asyncio.run(run_load(args))
+    except (RuntimeError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    print(format_report(report))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    return 1 if report["errors"] else 0
+
+
+def _signed_url(asset_id: str, width: int, quality: int = 80) -> str:
+    signature = generate_signature(asset_id, width, None, "webp", quality, settings.secret_key)
+    return f"{settings.api_prefix}/assets/{asset_id}?width={width}&format=WEBP&quality={quality}&signature={signature}"
+
+
+def _seed_image(index: int, size=(1600, 1200)) -> bytes:
+    # Distinct content per seed, so content-addressed storage does not merge them
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((size[0] // 4, size[1] // 4, size[0] // 2, size[1] // 2), fill=(200, 40, 40))
+    draw.text((20, 20), f"morphosx load seed {index}", fill=(255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p90_ms": round(percentile(values, 90) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+def _start_moto():
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        raise RuntimeError("moto[server] is not installed. Pass --s3-endpoint or run 'pip install moto[server]'.")
+    # Keep werkzeug's per-request access log out of the report
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    return server, f"http://{host}:{port}"
+
+
+def _create_bucket(endpoint_url: str, bucket: str):
+    import boto3
+
+    boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    ).create_bucket(Bucket=bucket)
@@ -0,0 +1,95 @@
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Iterator, List, Optional, Tuple
+
+# Profiles captured while serving the current request, when profiling was requested
+_profiles: ContextVar[Optional[List[bytes]]] = ContextVar("morphosx_profiles", default=None)
+
+
+@contextmanager
+def capture_profiles() -> Iterator[List[bytes]]:
+    """
+    Profile every engine call made inside the block.
+
+    :return: The list the captured profiles (marshalled pstats data) are appended to.
+    """
+    profiles: List[bytes] = []
+    token = _profiles.set(profiles)
+    try:
+        yield profiles
+    finally:
+        _profiles.reset(token)
+
+
+class CaptureBudget:
+    """
+    Sliding-window cap on profile captures, so a leaked token cannot force renders without limit.
+    """
+
+    def __init__(self, max_captures: int, window: float = 60.0):
+        self.max_captures = max_captures
+        self.window = window
+        self._started: Deque[float] = deque()
+
+    def try_acquire(self) -> bool:
+        """Count a capture and return True, or return False when the window is full."""
+        now = time.monotonic()
+        while self._started and now - self._started[0] >= self.window:
+            self._started.popleft()
+        if len(self._started) >= self.max_captures:
+            return False
+        self._started.append(now)
+        return True
+
+
+def profiling_requested() -> bool:
+    return _profiles.get() is not None
+
+
+def add_profile(data: bytes):
+    profiles = _profiles.get()
+    if profiles is not None:
+        profiles.append(data)
+
+
+def invoke_profiled(target: Any, method: str, *args, **kwargs) -> Tuple[Any, bytes]:
+    """
+    Call an engine method under cProfile, inside the worker thread or process that runs it.
+
+    :return: (result, profile) where profile is in the format of cProfile's dump_stats().
+    """
+    func: Callable = getattr(target, method)
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    profiler.create_stats()
+    return result, marshal.dumps(profiler.stats)
+
+
+class _LoadedProfile:
+    # pstats.Stats accepts any object with create_stats() and a `stats` dict
+    def __init__(self, data: bytes):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+def merge_profiles(profiles: List[bytes]) -> Tuple[bytes, str]:
+    """
+    Combine captured profiles.
+
+    :return: (profile, summary): a file loadable with pstats/snakeviz, and the top
+             functions by cumulative time as text.
+    """
+    summary = io.StringIO()
+    stats = pstats.Stats(_LoadedProfile(profiles[0]), stream=summary)
+    for data in profiles[1:]:
+        stats.add(_LoadedProfile(data))
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(40)
+    return marshal.dumps(stats.stats), summary.getvalue()
@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("morphosx.queue")
+
+# Job states, in lifecycle order
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Upper bound on the seconds between purges of finished jobs while idle
+PURGE_INTERVAL = 60.0
+
+
+@dataclass
+class RenderJob:
+    """One preset to render for one asset."""
+
+    id: int
+    asset_id: str
+    preset: str
+    priority: int
+    attempts: int
+
+
+class RenderQueue:
+    """
+    Persistent queue of background preset renders, backed by a local SQLite file.
+
+    Jobs survive restarts. A claimed job is leased to its worker for `lease`
+    seconds, renewed while it renders; a job whose lease ran out (its worker
+    crashed or was restarted) is claimed again by any worker, while jobs
+    rendering in live workers are left alone. Workers claim jobs lowest
+    priority value first, so callers can schedule cheap renders (small
+    presets) ahead of expensive ones. Claiming is a single UPDATE ... RETURNING
+    statement, which keeps it atomic when several uvicorn workers share the
+    file. A failed job is retried after `retry_backoff` seconds, doubled on
+    each further attempt. Done and failed jobs are purged `retention` seconds
+    after they finish.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        handler: Callable[[RenderJob], Awaitable[None]],
+        workers: int = 1,
+        poll_interval: float = 1.0,
+        max_attempts: int = 3,
+        lease: float = 60.0,
+        retention: float = 86400.0,
+        retry_backoff: float = 5.0,
+    ):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.retention = retention
+        self.retry_backoff = retry_backoff
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._next_purge = 0.0
+
+    async def startup(self):
+        """Open the queue, purge old finished jobs and start the workers."""
+        await asyncio.to_thread(self._open)
+        await self.purge()
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def shutdown(self):
+        """Stop the workers. Interrupted jobs are retried once their lease expires."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
+                self._conn = None
+
+    async def enqueue(self, asset_id: str, presets: List[Tuple[str, int]]):
+        """
+        Schedule preset renders for an asset. Re-enqueueing a preset resets it to pending.
+
+        :param asset_id: The asset id as used in GET URLs.
+        :param presets: (preset, priority) pairs; lower priorities run first.
+        """
+        now = time.time()
+        rows = [(asset_id, preset, priority, PENDING, now, now) for preset, priority in presets]
+        await self._run(
+            self._executemany,
+            "INSERT INTO jobs (asset_id, preset, priority, status, created, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(asset_id, preset) DO UPDATE SET "
+            "status = excluded.status, priority = excluded.priority, attempts = 0, error = NULL, "
+            "not_before = NULL, updated = excluded.updated",
+            rows,
+        )
+        self._wakeup.set()
+
+    async def status(self, asset_id: str) -> List[Dict[str, object]]:
+        """Per-preset state of an asset's renders, in scheduling order."""
+        rows = await self._run(
+            self._fetchall,
+            "SELECT preset, status, attempts, error, updated FROM jobs WHERE asset_id = ? ORDER BY priority, id",
+            (asset_id,),
+        )
+        return [
+            {"preset": preset, "status": status, "attempts": attempts, "error": error, "updated": updated}
+            for preset, status, attempts, error, updated in rows
+        ]
+
+    async def forget(self, asset_id: str):
+        """Drop all jobs of an asset (e.g. once it is deleted)."""
+        await self._run(self._execute, "DELETE FROM jobs WHERE asset_id = ?", (asset_id,))
+
+    async def stats(self) -> Dict[str, int]:
+        """Number of jobs in each state."""
+        rows = await self._run(self._fetchall, "SELECT status, COUNT(*) FROM jobs GROUP BY status", ())
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    async def purge(self) -> int:
+        """
+        Delete done and failed jobs that finished more than `retention` seconds ago.
+
+        :return: Number of jobs removed.
+        """
+        self._next_purge = time.monotonic() + min(self.retention, PURGE_INTERVAL)
+        return await self._run(
+            self._execute,
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?",
+            (DONE, FAILED, time.time() - self.retention),
+        )
+
+    async def run_next(self) -> bool:
+        """
+        Claim and run one job.
+
+        :return: False when the queue had nothing pending.
+        """
+        job = await self._run(self._claim)
+        if job is None:
+            return False
+
+        renewal = asyncio.create_task(self._renew_lease(job.id))
+        try:
+            await self.handler(job)
+        except Exception as e:
+            # Transient failures (storage hiccups, saturated workers) are retried up to max_attempts,
+            # backing off so a failing render does not spin on every poll
+            status = PENDING if job.attempts < self.max_attempts else FAILED
+            now = time.time()
+            await self._run(
+                self._execute,
+                "UPDATE jobs SET status = ?, error = ?, updated = ?, not_before = ? WHERE id = ?",
+                (status, str(e), now, now + self.retry_backoff * 2 ** (job.attempts - 1), job.id),
+            )
+        else:
+            await self._run(
+                self._execute,
+                "UPDATE jobs SET status = ?, error = NULL, updated = ? WHERE id = ?",
+                (DONE, time.time(), job.id),
+            )
+        finally:
+            renewal.cancel()
+        return True
+
+    async def _renew_lease(self, job_id: int):
+        # Keeps long renders from being reclaimed by other workers while this one is alive
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await self._run(
+                    self._execute,
+                    "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ?",
+                    (time.time() + self.lease, job_id, RUNNING),
+                )
+            except Exception:
+                # Database hiccup: the next renewal still lands before the lease runs out
+                logger.exception("Could not renew the lease of render job %s", job_id)
+
+    async def _worker(self):
+        while True:
+            try:
+                if await self.run_next():
+                    continue
+                if time.monotonic() >= self._next_purge:
+                    await self.purge()
+            except Exception:
+                # Database hiccup: back off and retry
+                logger.exception("Render queue worker failed, retrying after the poll interval")
+            self._wakeup.clear()
+            try:
+                # Jobs enqueued by other processes are only noticed by polling
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, func, *args):
+        if self._conn is None:
+            await asyncio.to_thread(self._open)
+        return await asyncio.to_thread(func, *args)
+
+    def _open(self):
+        with self._db_lock:
+            if self._conn is not None:
+                return
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, asset_id TEXT NOT NULL, preset TEXT NOT NULL, "
+                "priority INTEGER NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, created REAL NOT NULL, updated REAL NOT NULL, "
+                "lease_until REAL, not_before REAL, UNIQUE (asset_id, preset))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority, id)")
+            self._conn = conn
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self._db_lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def _executemany(self, sql: str, rows: List[tuple]):
+        with self._db_lock:
+            self._conn.executemany(sql, rows)
+
+    def _fetchall(self, sql: str, params: tuple) -> List[tuple]:
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _claim(self) -> Optional[RenderJob]:
+        now = time.time()
+        with self._db_lock:
+            # Abandoned jobs that already used up their attempts are not retried again
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated = ? "
+                "WHERE status = ? AND IFNULL(lease_until, 0) < ? AND attempts >= ?",
+                (FAILED, "worker lease expired", now, RUNNING, now, self.max_attempts),
+            )
+            row = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, updated = ?, lease_until = ? WHERE id = ("
+                "SELECT id FROM jobs WHERE (status = ? AND IFNULL(not_before, 0) <= ?) "
+                "OR (status = ? AND IFNULL(lease_until, 0) < ?) "
+                "ORDER BY priority, id LIMIT 1) "
+                "RETURNING id, asset_id, preset, priority, attempts",
+                (RUNNING, now, now + self.lease, PENDING, now, RUNNING, now),
+            ).fetchone()
+        return RenderJob(*row) if row else None
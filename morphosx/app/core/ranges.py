@@ -0,0 +1,104 @@
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+# More ranges than this in one request are ignored and the full body is sent
+MAX_RANGES = 16
+
+# Inclusive (first_byte, last_byte) pair
+ByteRange = Tuple[int, int]
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[List[ByteRange]]:
+    """
+    Parse a `Range: bytes=...` header (RFC 9110) against a body of `size` bytes.
+
+    Ranges are clamped to the body, sorted, and overlapping or adjacent ones
+    are merged.
+
+    :param header: The raw Range header value.
+    :param size: Total size of the representation.
+    :return: None when the header is absent, malformed or uses another unit (serve the
+             full body); an empty list when no range is satisfiable (416).
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    parts = [part.strip() for part in spec.split(",") if part.strip()]
+    if len(parts) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for part in parts:
+        first, dash, last = part.partition("-")
+        first, last = first.strip(), last.strip()
+        if not dash or not (first or last) or not all(value.isdigit() for value in (first, last) if value):
+            return None
+
+        if not first:
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix == 0 or size == 0:
+                continue
+            ranges.append((max(size - suffix, 0), size - 1))
+            continue
+
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = int(last) if last else size - 1
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    ranges.sort()
+    merged: List[ByteRange] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def content_range(start: int, end: int, size: int) -> str:
+    """Value of the Content-Range header for one byte range."""
+    return f"bytes {start}-{end}/{size}"
+
+
+def multipart_byteranges(
+    ranges: List[ByteRange],
+    size: int,
+    media_type: str,
+    boundary: str,
+    read: Callable[[int, int], AsyncIterator[bytes]],
+) -> Tuple[AsyncIterator[bytes], int]:
+    """
+    Build a `multipart/byteranges` body that streams each part from `read`.
+
+    :param ranges: Satisfiable ranges, as returned by parse_range().
+    :param size: Total size of the representation.
+    :param media_type: Content-Type of the parts.
+    :param boundary: Multipart boundary (must not occur in the data).
+    :param read: Called with (offset, length); yields the bytes of one range.
+    :return: (body, content_length). The length is known upfront, without reading.
+    """
+    headers = [
+        (
+            f"\r\n--{boundary}\r\nContent-Type: {media_type}\r\n"
+            f"Content-Range: {content_range(start, end, size)}\r\n\r\n"
+        ).encode()
+        for start, end in ranges
+    ]
+    closing = f"\r\n--{boundary}--\r\n".encode()
+    length = sum(len(header) for header in headers) + sum(end - start + 1 for start, end in ranges) + len(closing)
+
+    async def body() -> AsyncIterator[bytes]:
+        for header, (start, end) in zip(headers, ranges):
+            yield header
+            async for chunk in read(start, end - start + 1):
+                yield chunk
+        yield closing
+
+    return body(), length
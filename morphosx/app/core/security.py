@@ -1,5 +1,6 @@
 import hashlib
 import hmac
+import time
 from typing import Optional
 
 
@@ -58,3 +59,45 @@ def verify_signature(
 
     # Use hmac.compare_digest to prevent timing attacks
     return hmac.compare_digest(expected, signature_to_verify)
+
+
+def generate_profile_token(
+    asset_id: str,
+    cache_key: str,
+    expires: int,
+    secret_key: str,
+    user_id: Optional[str] = None,
+) -> str:
+    """
+    Generate the token that enables a cProfile capture of one derivative.
+
+    :param asset_id: The unique ID of the original asset.
+    :param cache_key: ProcessingOptions.get_cache_key() of the derivative to profile.
+    :param expires: Unix timestamp after which the token is rejected.
+    :param secret_key: The server-side secret key.
+    :param user_id: Optional user identifier for protected assets.
+    :return: Hexadecimal signature string (first 16 chars, as for transform URLs).
+    """
+    payload = f"{asset_id}|profile|k{cache_key}|e{expires}|u{user_id}"
+    return hmac.new(secret_key.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+
+def verify_profile_token(
+    asset_id: str,
+    cache_key: str,
+    expires: int,
+    token_to_verify: str,
+    secret_key: str,
+    user_id: Optional[str] = None,
+    max_lifetime: Optional[float] = None,
+) -> bool:
+    """
+    Check a profiling token: it must match the derivative and not be expired.
+
+    :param max_lifetime: Reject tokens expiring further than this many seconds ahead.
+    """
+    remaining = expires - time.time()
+    if remaining < 0 or (max_lifetime is not None and remaining > max_lifetime):
+        return False
+    expected = generate_profile_token(asset_id, cache_key, expires, secret_key, user_id)
+    return hmac.compare_digest(expected, token_to_verify)
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share the same key.
+
+    The first caller (the leader) starts the work; callers arriving while it is
+    in flight (followers) await the same result instead of repeating it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run `fn` once per key at a time.
+
+        :param key: Identity of the work (e.g. the derivative id).
+        :param fn: Zero-argument coroutine factory doing the actual work.
+        :return: (result, shared) where shared is True for followers.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+
+        if task is None:
+            # The work runs as its own task so a disconnecting leader
+            # does not cancel it for everyone else.
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
@@ -0,0 +1,70 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from morphosx.app.core.metrics import STAGE_SECONDS
+
+# Stage durations (seconds) of the request being served, when it is being timed
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("morphosx_timings", default=None)
+
+
+def record_timing(name: str, seconds: float):
+    """Add to a stage of the current request's Server-Timing (no-op outside timed requests)."""
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """
+    Time a pipeline stage for both the metrics histogram and the Server-Timing header.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        record_timing(stage, elapsed)
+
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """Render stage durations as a Server-Timing header value (milliseconds)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware adding a Server-Timing header to responses under `path_prefix`.
+
+    Stages timed with timed_stage() while serving the request (lookup, fetch,
+    render, store) are listed, followed by the total time until the response
+    started. Renders shared through single-flight are reported by the request
+    that ran them.
+    """
+
+    def __init__(self, app, path_prefix: str = ""):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = format_server_timing({**timings, "total": time.perf_counter() - start})
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
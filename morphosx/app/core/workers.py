@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from morphosx.app.core.exceptions import CapacityError
+from morphosx.app.core.metrics import ENGINE_SECONDS, WORKER_WAIT_SECONDS, registry
+from morphosx.app.core.profiling import invoke_profiled
+from morphosx.app.engine.base import BaseProcessor, EngineSpec, build_engine_from_spec, engine_spec
+from morphosx.app.settings import settings
+
+logger = logging.getLogger("morphosx.workers")
+
+# Children are started from a clean server process, never forked from this
+# multi-threaded one (locks held by libvips, aiobotocore or logging threads
+# would be copied into the child in their locked state)
+PROCESS_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class WorkerPool:
+    """
+    Bounded execution layer for CPU-heavy processing work.
+
+    Keeps transformations off the event loop so that cache HITs stay fast while
+    misses are being rendered. Engines that release the GIL (libvips, PyMuPDF,
+    ffmpeg subprocesses) run on a thread pool; GIL-bound engines (Pillow,
+    trimesh, pygments) run on a process pool when one is configured. Built-in
+    engines are sent to the process pool by name and built once per child.
+    """
+
+    def __init__(
+        self,
+        thread_workers: int = 8,
+        process_workers: int = 0,
+        queue_limit: int = 64,
+        engine_limits: Optional[Dict[str, int]] = None,
+        retry_after: int = 1,
+        preload: Tuple[EngineSpec, ...] = (),
+    ):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.queue_limit = queue_limit
+        self.engine_limits = engine_limits or {}
+        self.retry_after = retry_after
+        # Engines every process pool child builds at start, before its first job
+        self.preload = preload
+
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._pending = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs currently running or waiting for a worker."""
+        return self._pending
+
+    def startup(self):
+        """Create the executors. Called from the application lifespan."""
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_workers, thread_name_prefix="morphosx-worker"
+            )
+        if self._process_pool is None and self.process_workers > 0:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context(PROCESS_START_METHOD),
+                initializer=_init_process_worker,
+                initargs=(self.preload,),
+            )
+
+    def shutdown(self):
+        """Tear down the executors and forget loop-bound semaphores."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=True)
+            self._thread_pool = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+        self._semaphores.clear()
+
+    async def run(self, processor: Any, method: str = "process", *args, **kwargs) -> Any:
+        """
+        Run a processor method on the matching executor.
+
+        :param processor: The engine instance (built-in engines are rebuilt in the child,
+                          others must be picklable for process mode).
+        :param method: Name of the engine method to invoke.
+        :return: Whatever the engine method returns.
+        :raises CapacityError: If the queue-depth limit is reached.
+        """
+        return await self._submit(processor, _invoke, method, *args, **kwargs)
+
+    async def run_profiled(self, processor: Any, method: str = "process", *args, **kwargs) -> Tuple[Any, bytes]:
+        """
+        Like run(), with the engine method executed under cProfile.
+
+        :return: (result, profile) where profile is marshalled pstats data.
+        """
+        return await self._submit(processor, invoke_profiled, method, *args, **kwargs)
+
+    async def _submit(self, processor: Any, invoke: Callable[..., Any], method: str, *args, **kwargs) -> Any:
+        if self._pending >= self.queue_limit:
+            raise CapacityError("Processing queue is full", retry_after=self.retry_after)
+
+        self.startup()
+        engine_name = type(processor).__name__
+        executor = self._get_executor(processor)
+        spec = engine_spec(processor) if executor is self._process_pool else None
+        if spec is not None:
+            call = functools.partial(_invoke_in_child, invoke, spec, method, *args, **kwargs)
+        else:
+            call = functools.partial(invoke, processor, method, *args, **kwargs)
+
+        self._pending += 1
+        queued = time.perf_counter()
+        try:
+            async with self._get_semaphore(engine_name):
+                started = time.perf_counter()
+                WORKER_WAIT_SECONDS.observe(started - queued, engine=engine_name)
+                loop = asyncio.get_running_loop()
+                try:
+                    return await loop.run_in_executor(executor, call)
+                finally:
+                    ENGINE_SECONDS.observe(time.perf_counter() - started, engine=engine_name)
+        finally:
+            self._pending -= 1
+
+    def _get_executor(self, processor: Any) -> Executor:
+        if getattr(processor, "execution_mode", "thread") == "process" and self._process_pool is not None:
+            return self._process_pool
+        return self._thread_pool
+
+    def _get_semaphore(self, engine_name: str) -> asyncio.Semaphore:
+        if engine_name not in self._semaphores:
+            limit = self.engine_limits.get(engine_name) or self.thread_workers + self.process_workers
+            self._semaphores[engine_name] = asyncio.Semaphore(limit)
+        return self._semaphores[engine_name]
+
+
+def _invoke(target: Any, method: str, *args, **kwargs) -> Any:
+    """Module-level trampoline so calls can be pickled for the process pool."""
+    func: Callable = getattr(target, method)
+    return func(*args, **kwargs)
+
+
+# Processors built in this process when it is a pool child, by spec, plus the core engines they share
+_child_engines: Dict[EngineSpec, BaseProcessor] = {}
+_child_cores: Dict[str, BaseProcessor] = {}
+
+
+def _init_process_worker(preload: Tuple[EngineSpec, ...]):
+    """Process pool initializer: build the preloaded engines once, before the child takes jobs."""
+    for spec in preload:
+        try:
+            _child_engine(spec)
+        except Exception:
+            # A failing engine must not break the pool: its jobs will report the error
+            logger.exception("Could not preload engine %s in a worker process", spec)
+
+
+def _child_engine(spec: EngineSpec) -> BaseProcessor:
+    processor = _child_engines.get(spec)
+    if processor is None:
+        processor = _child_engines[spec] = build_engine_from_spec(spec, _child_cores)
+    return processor
+
+
+def _invoke_in_child(invoke: Callable[..., Any], spec: EngineSpec, method: str, *args, **kwargs) -> Any:
+    """Run `invoke` on the child's own processor for `spec`, building it on first use."""
+    return invoke(_child_engine(spec), method, *args, **kwargs)
+
+
+# Global pool instance
+worker_pool = WorkerPool(
+    thread_workers=settings.worker_threads,
+    process_workers=settings.worker_processes,
+    queue_limit=settings.worker_queue_limit,
+    engine_limits=settings.engine_concurrency,
+    retry_after=settings.worker_retry_after,
+    # The core image engine serves most process-pool jobs and is shared by the specialized ones
+    preload=(("core", "vips" if settings.engine_type == "vips" else "pil"),),
+)
+registry.gauge(
+    "morphosx_worker_queue_depth",
+    "Processing jobs running or waiting for a worker.",
+    lambda: worker_pool.queue_depth,
+)
@@ -14,6 +14,8 @@ class ArchiveProcessor(BaseProcessor):
     Engine for generating content-list previews for ZIP and TAR archives.
     """
 
+    execution_mode = "process"
+
     def __init__(self, image_processor: BaseProcessor):
         self.image_processor = image_processor
 
@@ -26,13 +28,19 @@ class ArchiveProcessor(BaseProcessor):
         """
         Generate archive card and process it as an image.
         """
-        card_bytes = self.render_thumbnail(source_data, filename or "archive.zip")
-        return self.image_processor.process(card_bytes, options)
+        card = self._render_card(source_data, filename or "archive.zip")
+        return self.image_processor.process_image(card, options)
 
     def render_thumbnail(self, archive_data: bytes, filename: str) -> bytes:
         """
         Create a preview of the archive contents.
         """
+        output = io.BytesIO()
+        self._render_card(archive_data, filename).save(output, format="JPEG")
+        return output.getvalue()
+
+    def _render_card(self, archive_data: bytes, filename: str) -> Image.Image:
+        """Build the archive preview as an in-memory image."""
         ext = filename.split(".")[-1].lower()
         file_list = []
         try:
@@ -55,7 +63,7 @@ class ArchiveProcessor(BaseProcessor):
         except Exception as e:
             return self._create_folder_card("Archive Error", f"Could not read archive: {str(e)}")
 
-    def _create_folder_card(self, title: str, text: str) -> bytes:
+    def _create_folder_card(self, title: str, text: str) -> Image.Image:
         """Render a folder-style card image."""
         width, height = 800, 600
         img = Image.new("RGB", (width, height), color=(255, 250, 230))  # Manila folder yellow
@@ -71,6 +79,4 @@ class ArchiveProcessor(BaseProcessor):
         draw.text((40, 60), title, fill=(100, 80, 20))
         draw.text((40, 110), text, fill=(60, 50, 30))
 
-        output = io.BytesIO()
-        img.save(output, format="JPEG")
-        return output.getvalue()
+        return img
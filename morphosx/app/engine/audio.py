@@ -1,10 +1,8 @@
-import os
-import tempfile
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 import ffmpeg
 
-from .base import BaseProcessor
+from .base import BaseProcessor, source_path
 from .types import ProcessingOptions
 
 
@@ -13,6 +11,8 @@ class AudioProcessor(BaseProcessor):
     Core engine for audio manipulation and waveform generation.
     """
 
+    supports_source_uri = True
+
     def __init__(self, image_processor: BaseProcessor):
         self.image_processor = image_processor
 
@@ -28,9 +28,21 @@ class AudioProcessor(BaseProcessor):
         waveform_bytes = self.generate_waveform(source_data, options.width or 800, options.height or 200)
         return self.image_processor.process(waveform_bytes, options)
 
+    def process_uri(
+        self,
+        source_uri: str,
+        options: ProcessingOptions,
+        filename: Optional[str] = None,
+    ) -> Tuple[bytes, str]:
+        """
+        Generate a waveform from a local path or URL and process it as an image.
+        """
+        waveform_bytes = self.generate_waveform(source_uri, options.width or 800, options.height or 200)
+        return self.image_processor.process(waveform_bytes, options)
+
     def generate_waveform(
         self,
-        audio_data: bytes,
+        audio_data: Union[bytes, str],
         width: int = 800,
         height: int = 200,
         color: str = "cyan",
@@ -38,28 +50,22 @@ class AudioProcessor(BaseProcessor):
         """
         Generate a waveform image (PNG) from an audio file.
 
-        :param audio_data: Raw audio bytes.
+        :param audio_data: Raw audio bytes, or a path/URL FFmpeg can open.
         :param width: Target width of the waveform image.
         :param height: Target height of the waveform image.
         :param color: The color of the waveform.
         :return: PNG image bytes.
         """
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".audio") as tmp:
-            tmp.write(audio_data)
-            tmp_path = tmp.name
-
-        try:
-            # Command: ffmpeg -i input -filter_complex "showwavespic=s=800x200:colors=cyan" -frames:v 1 output.png
-            # This generates a visual representation of the audio amplitudes.
-            out, _ = (
-                ffmpeg.input(tmp_path)
-                .filter("showwavespic", s=f"{width}x{height}", colors=color)
-                .output("pipe:", vframes=1, format="image2", vcodec="png")
-                .run(capture_stdout=True, quiet=True)
-            )
-            return out
-        except ffmpeg.Error as e:
-            raise RuntimeError(f"FFmpeg waveform generation failed: {e.stderr.decode()}")
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        with source_path(audio_data, suffix=".audio") as input_path:
+            try:
+                # Command: ffmpeg -i input -filter_complex "showwavespic=s=800x200:colors=cyan" -frames:v 1 output.png
+                # This generates a visual representation of the audio amplitudes.
+                out, _ = (
+                    ffmpeg.input(input_path)
+                    .filter("showwavespic", s=f"{width}x{height}", colors=color)
+                    .output("pipe:", vframes=1, format="image2", vcodec="png")
+                    .run(capture_stdout=True, quiet=True)
+                )
+                return out
+            except ffmpeg.Error as e:
+                raise RuntimeError(f"FFmpeg waveform generation failed: {e.stderr.decode()}")
@@ -1,14 +1,32 @@
+import functools
+import importlib
+import logging
+import os
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from .types import ProcessingOptions
 
+logger = logging.getLogger("morphosx.engine")
+
 
 class BaseProcessor(ABC):
     """
     Abstract base class for all media processing engines.
     """
 
+    # Executor used by the worker pool: 'thread' for engines that release the GIL
+    # (native libraries, subprocesses), 'process' for GIL-bound pure-Python work.
+    execution_mode: str = "thread"
+
+    # Engines that can read the original directly from a local path or URL
+    # (e.g. ffmpeg) set this and implement process_uri().
+    supports_source_uri: bool = False
+
     @abstractmethod
     def process(
         self,
@@ -26,6 +44,44 @@ class BaseProcessor(ABC):
         """
         pass
 
+    def process_uri(
+        self,
+        source_uri: str,
+        options: ProcessingOptions,
+        filename: Optional[str] = None,
+    ) -> Tuple[bytes, str]:
+        """
+        Process an original given by a local path or a (presigned) URL instead of bytes.
+
+        :param source_uri: Filesystem path or URL readable by the engine.
+        :param options: Transformation and formatting options.
+        :param filename: Optional filename to help with type detection.
+        :return: (processed_bytes, mime_type)
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot read sources by URI")
+
+    def process_image(self, image: Any, options: ProcessingOptions) -> Tuple[bytes, str]:
+        """
+        Process an already-decoded image and return transformed bytes and MIME type.
+
+        Specialised engines use this to hand raw pixels to the core image engine
+        without an intermediate encode/decode hop. Core engines override it; the
+        default encodes losslessly to PNG and delegates to process().
+
+        :param image: A PIL.Image, pyvips.Image or numpy ndarray.
+        :param options: Transformation and formatting options.
+        :return: (processed_bytes, mime_type)
+        """
+        import io
+
+        from PIL import Image
+
+        if not isinstance(image, Image.Image):
+            image = Image.fromarray(image)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return self.process(buffer.getvalue(), options)
+
     def get_metadata(self, source_data: bytes, filename: Optional[str] = None) -> dict:
         """
         Extract metadata from the asset. Default implementation returns basic info.
@@ -33,86 +89,254 @@ class BaseProcessor(ABC):
         return {"size": len(source_data), "filename": filename}
 
 
+@contextmanager
+def source_path(source: Union[bytes, str], suffix: str = "") -> Iterator[str]:
+    """
+    Yield something external tools (ffmpeg, ifcopenshell...) can open by name.
+
+    Strings (a storage path or presigned URL) are passed through untouched;
+    bytes are spooled to a temporary file that is removed afterwards.
+    """
+    if isinstance(source, str):
+        yield source
+        return
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(source)
+        tmp_path = tmp.name
+    try:
+        yield tmp_path
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 class ProcessorRegistry:
     """
     Registry to map file extensions to specific processors.
+
+    Engines registered with register_lazy() are only imported and built the
+    first time one of their extensions is requested, so a worker never pays
+    for engines (and their dependencies) it does not serve.
     """
 
     def __init__(self):
         self._processors: Dict[str, BaseProcessor] = {}
         self._default_processor: Optional[BaseProcessor] = None
+        # extension -> engine name, for engines not loaded yet
+        self._lazy: Dict[str, str] = {}
+        self._factories: Dict[str, Tuple[List[str], Callable[[], BaseProcessor]]] = {}
+        self._lock = threading.Lock()
+        # Engine name -> seconds spent importing and building it
+        self.load_times: Dict[str, float] = {}
 
     def register(self, extensions: List[str], processor: BaseProcessor):
         for ext in extensions:
-            self._processors[ext.lower().lstrip(".")] = processor
+            ext = ext.lower().lstrip(".")
+            self._processors[ext] = processor
+            self._lazy.pop(ext, None)
+
+    def register_lazy(self, name: str, extensions: List[str], factory: Callable[[], BaseProcessor]):
+        """
+        Register an engine built on first use.
+
+        :param name: Engine name, as listed in settings.enabled_engines.
+        :param extensions: File extensions the engine handles.
+        :param factory: Imports and builds the engine.
+        """
+        extensions = [ext.lower().lstrip(".") for ext in extensions]
+        self._factories[name] = (extensions, factory)
+        for ext in extensions:
+            self._processors.pop(ext, None)
+            self._lazy[ext] = name
 
     def set_default(self, processor: BaseProcessor):
         self._default_processor = processor
 
     def get_processor(self, filename: str) -> BaseProcessor:
         ext = filename.split(".")[-1].lower() if "." in filename else ""
-        return self._processors.get(ext, self._default_processor)
+        processor = self._processors.get(ext)
+        if processor is not None:
+            return processor
+        if ext in self._lazy:
+            return self._load(self._lazy[ext])
+        return self._default_processor
+
+    def is_pending(self, filename: str) -> bool:
+        """True when the engine for this file is registered but not loaded yet."""
+        ext = filename.split(".")[-1].lower() if "." in filename else ""
+        return ext in self._lazy
+
+    def load_all(self) -> Dict[str, float]:
+        """
+        Load every pending engine (e.g. to warm a worker or measure their cost).
+
+        :return: Load time in seconds per engine.
+        """
+        for name in set(self._lazy.values()):
+            self._load(name)
+        return dict(self.load_times)
+
+    def loaded_processors(self) -> List[BaseProcessor]:
+        """Engines built so far (registered, lazily loaded or default), each listed once."""
+        processors = [*self._processors.values(), self._default_processor]
+        return list({id(processor): processor for processor in processors if processor is not None}.values())
+
+    def engines(self) -> Dict[str, Dict[str, object]]:
+        """Registered lazy engines, whether they are loaded and what loading them cost."""
+        return {
+            name: {
+                "extensions": extensions,
+                "loaded": name in self.load_times,
+                "load_ms": _ms(self.load_times.get(name)),
+            }
+            for name, (extensions, _) in self._factories.items()
+        }
+
+    def _load(self, name: str) -> BaseProcessor:
+        with self._lock:
+            extensions, factory = self._factories[name]
+            if extensions[0] in self._processors:
+                # Loaded by a concurrent caller
+                return self._processors[extensions[0]]
+            start = time.perf_counter()
+            processor = factory()
+            self.load_times[name] = time.perf_counter() - start
+            logger.info("Loaded engine '%s' in %.1f ms", name, self.load_times[name] * 1000)
+            for ext in extensions:
+                self._processors[ext] = processor
+                self._lazy.pop(ext, None)
+            return processor
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
 
 
 # Global registry instance
 registry = ProcessorRegistry()
 
+# Engine name -> (module, class, extensions). Modules are imported on first use.
+ENGINES: Dict[str, Tuple[str, str, List[str]]] = {
+    "video": ("morphosx.app.engine.video", "VideoProcessor", ["mp4", "webm", "mov", "avi"]),
+    "audio": ("morphosx.app.engine.audio", "AudioProcessor", ["mp3", "wav", "ogg", "flac"]),
+    "document": ("morphosx.app.engine.document", "DocumentProcessor", ["pdf"]),
+    "raw": ("morphosx.app.engine.raw", "RawProcessor", ["cr2", "nef", "dng", "arw"]),
+    "text": ("morphosx.app.engine.text", "TextProcessor", ["json", "xml", "md", "txt"]),
+    "office": ("morphosx.app.engine.office", "OfficeProcessor", ["docx", "pptx", "xlsx"]),
+    "font": ("morphosx.app.engine.font", "FontProcessor", ["ttf", "otf"]),
+    "model3d": ("morphosx.app.engine.model3d", "Model3DProcessor", ["stl", "obj", "glb", "gltf"]),
+    "archive": ("morphosx.app.engine.archive", "ArchiveProcessor", ["zip", "tar", "gz"]),
+    "bim": ("morphosx.app.engine.bim", "BIMProcessor", ["ifc"]),
+}
+
+
+# Core image engine name -> (module, class)
+CORE_ENGINES: Dict[str, Tuple[str, str]] = {
+    "pil": ("morphosx.app.engine.processor", "ImageProcessor"),
+    "vips": ("morphosx.app.engine.vips", "VipsProcessor"),
+}
+
+# (engine, core) names identifying a processor, see engine_spec()
+EngineSpec = Tuple[str, str]
+
+
+def _build_engine(name: str, core_processor: BaseProcessor, **options) -> BaseProcessor:
+    module, class_name, _ = ENGINES[name]
+    return getattr(importlib.import_module(module), class_name)(core_processor, **options)
+
+
+def _build_core(name: str) -> BaseProcessor:
+    module, class_name = CORE_ENGINES[name]
+    return getattr(importlib.import_module(module), class_name)()
+
+
+def _engine_options(name: str) -> Dict[str, Any]:
+    from morphosx.app.settings import settings
 
-def initialize_registry():
+    options = {
+        "document": {
+            "cache_documents": settings.document_cache_size,
+            "cache_bytes": settings.document_cache_max_bytes,
+        },
+        "raw": {"preview_mode": settings.raw_preview_mode},
+    }
+    return options.get(name, {})
+
+
+def _core_name(processor: Any) -> Optional[str]:
+    cls = type(processor)
+    for name, (module, class_name) in CORE_ENGINES.items():
+        if (cls.__module__, cls.__name__) == (module, class_name):
+            return name
+    return None
+
+
+def engine_spec(processor: Any) -> Optional[EngineSpec]:
     """
-    Bootstrap the processor registry with all available engines.
+    Names from which build_engine_from_spec() rebuilds an equivalent processor elsewhere.
+
+    Lets the worker pool send a short tuple to its child processes instead of
+    pickling the processor on every call.
+
+    :return: ("core", core) for core image engines, (engine, core) for the built-in
+             specialized engines, None for anything else (e.g. test stand-ins).
     """
-    from morphosx.app.engine.archive import ArchiveProcessor
-    from morphosx.app.engine.audio import AudioProcessor
-    from morphosx.app.engine.bim import BIMProcessor
-    from morphosx.app.engine.document import DocumentProcessor
-    from morphosx.app.engine.font import FontProcessor
-    from morphosx.app.engine.model3d import Model3DProcessor
-    from morphosx.app.engine.office import OfficeProcessor
-    from morphosx.app.engine.processor import ImageProcessor
-    from morphosx.app.engine.raw import RawProcessor
-    from morphosx.app.engine.text import TextProcessor
-    from morphosx.app.engine.video import VideoProcessor
-    from morphosx.app.engine.vips import VipsProcessor
-    from morphosx.app.settings import settings
+    core = _core_name(processor)
+    if core is not None:
+        return "core", core
+    cls = type(processor)
+    for name, (module, class_name, _) in ENGINES.items():
+        if (cls.__module__, cls.__name__) == (module, class_name):
+            core = _core_name(getattr(processor, "image_processor", None))
+            return (name, core) if core is not None else None
+    return None
 
-    # 1. Initialize core image engine
-    if settings.engine_type == "vips":
-        core_processor = VipsProcessor()
-    else:
-        core_processor = ImageProcessor()
 
-    registry.set_default(core_processor)
+def build_engine_from_spec(spec: EngineSpec, cores: Optional[Dict[str, BaseProcessor]] = None) -> BaseProcessor:
+    """
+    Build the processor named by engine_spec(), with the engine options from settings.
 
-    # 2. Initialize and register specialized engines
-    video_engine = VideoProcessor(core_processor)
-    registry.register(["mp4", "webm", "mov", "avi"], video_engine)
+    :param cores: Core processors already built, reused (and extended) so engines share them.
+    """
+    name, core = spec
+    cores = {} if cores is None else cores
+    if core not in cores:
+        cores[core] = _build_core(core)
+    if name == "core":
+        return cores[core]
+    return _build_engine(name, cores[core], **_engine_options(name))
 
-    audio_engine = AudioProcessor(core_processor)
-    registry.register(["mp3", "wav", "ogg", "flac"], audio_engine)
 
-    doc_engine = DocumentProcessor(core_processor)
-    registry.register(["pdf"], doc_engine)
+def initialize_registry(target: Optional[ProcessorRegistry] = None, engine_type: Optional[str] = None):
+    """
+    Bootstrap the processor registry: the core image engine now, specialized engines lazily.
 
-    raw_engine = RawProcessor(core_processor)
-    registry.register(["cr2", "nef", "dng", "arw"], raw_engine)
+    :param target: Registry to fill (default: the global registry).
+    :param engine_type: Core image engine, 'vips' or 'pil' (default: settings.engine_type).
+    """
+    from morphosx.app.settings import settings
 
-    text_engine = TextProcessor(core_processor)
-    registry.register(["json", "xml", "md", "txt"], text_engine)
+    if target is None:
+        target = registry
 
-    office_engine = OfficeProcessor(core_processor)
-    registry.register(["docx", "pptx", "xlsx"], office_engine)
+    # 1. Initialize core image engine (only the selected one is imported)
+    if (engine_type or settings.engine_type) == "vips":
+        from morphosx.app.engine.vips import VipsProcessor
 
-    font_engine = FontProcessor(core_processor)
-    registry.register(["ttf", "otf"], font_engine)
+        core_processor = VipsProcessor()
+    else:
+        from morphosx.app.engine.processor import ImageProcessor
 
-    model3d_engine = Model3DProcessor(core_processor)
-    registry.register(["stl", "obj", "glb", "gltf"], model3d_engine)
+        core_processor = ImageProcessor()
 
-    archive_engine = ArchiveProcessor(core_processor)
-    registry.register(["zip", "tar", "gz"], archive_engine)
+    target.set_default(core_processor)
 
-    bim_engine = BIMProcessor(core_processor)
-    registry.register(["ifc"], bim_engine)
+    # 2. Register the enabled specialized engines, built on first request
+    for name in settings.enabled_engines:
+        if name not in ENGINES:
+            raise ValueError(f"Unknown engine '{name}' in ENABLED_ENGINES. Available: {', '.join(ENGINES)}")
+        factory = functools.partial(_build_engine, name, core_processor, **_engine_options(name))
+        target.register_lazy(name, ENGINES[name][2], factory)
 
-    return registry
+    return target
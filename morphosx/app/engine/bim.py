@@ -15,6 +15,8 @@ class BIMProcessor(BaseProcessor):
     Engine for generating technical summaries and metadata for BIM (IFC) files.
     """
 
+    execution_mode = "process"
+
     def __init__(self, image_processor: BaseProcessor):
         self.image_processor = image_processor
 
@@ -53,8 +55,8 @@ class BIMProcessor(BaseProcessor):
                 build_xml(root, metadata)
                 return ET.tostring(root, encoding="utf-8"), "application/xml"
 
-        bim_bytes = self.render_summary(source_data, filename or "project.ifc")
-        return self.image_processor.process(bim_bytes, options)
+        card = self._render_card(source_data)
+        return self.image_processor.process_image(card, options)
 
     def get_metadata(self, ifc_data: bytes) -> dict:
         """
@@ -107,6 +109,12 @@ class BIMProcessor(BaseProcessor):
         """
         Create a technical data card for an IFC file.
         """
+        output = io.BytesIO()
+        self._render_card(ifc_data).save(output, format="JPEG")
+        return output.getvalue()
+
+    def _render_card(self, ifc_data: bytes) -> Image.Image:
+        """Build the data card as an in-memory image."""
         metadata = self.get_metadata(ifc_data)
 
         if "error" in metadata:
@@ -125,7 +133,7 @@ class BIMProcessor(BaseProcessor):
 
         return self._create_bim_card(title, summary)
 
-    def _create_bim_card(self, title: str, text: str) -> bytes:
+    def _create_bim_card(self, title: str, text: str) -> Image.Image:
         """Render a technical architecture-style card."""
         width, height = 800, 600
         img = Image.new("RGB", (width, height), color=(30, 30, 35))  # Dark gray
@@ -143,6 +151,4 @@ class BIMProcessor(BaseProcessor):
         draw.polygon([(600, 200), (750, 200), (675, 100)], outline=(100, 255, 100), width=2)
         draw.rectangle([620, 200, 730, 300], outline=(100, 255, 100), width=2)
 
-        output = io.BytesIO()
-        img.save(output, format="JPEG")
-        return output.getvalue()
+        return img
@@ -1,16 +1,115 @@
-from typing import Optional, Tuple
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image
 
 from .base import BaseProcessor
 from .types import ProcessingOptions
 
+# Resolution used when neither width nor height is requested
+DEFAULT_DPI = 150
+
+
+@dataclass
+class CachedDocument:
+    """An open PyMuPDF document and the lock serializing renders on it."""
+
+    document: Any
+    size: int
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class DocumentCache:
+    """
+    LRU cache of parsed PDF documents, bounded by count and by source bytes.
+
+    Keys should identify the content (e.g. asset id plus fingerprint) so a
+    replaced original is never served from a stale parse.
+    """
+
+    def __init__(self, max_documents: int = 16, max_bytes: int = 256 * 1024 * 1024):
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CachedDocument]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str) -> Optional[CachedDocument]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, document: Any, size: int) -> CachedDocument:
+        """
+        Insert a document, evicting the least recently used ones to fit.
+
+        :param size: Source size in bytes, used as the memory estimate.
+        :return: The cache entry (also returned when the document is too big to keep).
+        """
+        entry = CachedDocument(document, size)
+        if self.max_documents <= 0 or size > self.max_bytes:
+            return entry
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += size
+
+            while len(self._entries) > self.max_documents or self._bytes > self.max_bytes:
+                # Evicted documents are not closed here: a render still holding
+                # the entry keeps working and the document is freed with it.
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "documents": len(self._entries),
+                "bytes": self._bytes,
+            }
+
 
 class DocumentProcessor(BaseProcessor):
     """
     Core engine for document (PDF) processing.
+
+    Parsed documents can be kept open across page requests through
+    `process_cached`, so paging through a PDF parses it only once.
     """
 
-    def __init__(self, image_processor: BaseProcessor):
+    def __init__(
+        self,
+        image_processor: BaseProcessor,
+        cache_documents: int = 16,
+        cache_bytes: int = 256 * 1024 * 1024,
+    ):
         self.image_processor = image_processor
+        self.document_cache = DocumentCache(max_documents=cache_documents, max_bytes=cache_bytes)
 
     def process(
         self,
@@ -21,10 +120,36 @@ class DocumentProcessor(BaseProcessor):
         """
         Extract a page and process it as an image.
         """
-        page_bytes = self.extract_page_as_image(source_data, options.page, dpi=150)
-        return self.image_processor.process(page_bytes, options)
+        page = self.render_page(source_data, options.page, width=options.width, height=options.height)
+        return self.image_processor.process_image(page, options)
+
+    def process_cached(
+        self,
+        cache_key: str,
+        options: ProcessingOptions,
+        source_data: Optional[bytes] = None,
+    ) -> Tuple[bytes, str]:
+        """
+        Render a page from the document cache, parsing the PDF only on a miss.
 
-    def extract_page_as_image(self, document_data: bytes, page_number: int = 1, dpi: int = 150) -> bytes:
+        :param cache_key: Content identity of the document (asset id plus fingerprint).
+        :param options: Processing options (page, size, format).
+        :param source_data: Raw PDF bytes; may be omitted when the document is cached.
+        :return: (processed_bytes, mime_type)
+        :raises LookupError: If the document is not cached and no bytes were given.
+        """
+        entry = self.document_cache.get(cache_key)
+        if entry is None:
+            if source_data is None:
+                raise LookupError(f"Document '{cache_key}' is not cached")
+            entry = self.document_cache.put(cache_key, self._open(source_data), len(source_data))
+
+        # A fitz document must not be used by two threads at once
+        with entry.lock:
+            page = self._render(entry.document, options.page, width=options.width, height=options.height)
+        return self.image_processor.process_image(page, options)
+
+    def extract_page_as_image(self, document_data: bytes, page_number: int = 1, dpi: int = DEFAULT_DPI) -> bytes:
         """
         Extract a specific page from a PDF and render it as a PNG image.
 
@@ -33,15 +158,60 @@ class DocumentProcessor(BaseProcessor):
         :param dpi: Resolution for rendering the page to image.
         :return: PNG image bytes.
         """
+        output = io.BytesIO()
+        self.render_page(document_data, page_number, dpi).save(output, format="PNG")
+        return output.getvalue()
+
+    def render_page(
+        self,
+        document_data: bytes,
+        page_number: int = 1,
+        dpi: int = DEFAULT_DPI,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> Image.Image:
+        """
+        Render a specific page of a PDF to an in-memory image.
+
+        When a target width and/or height is given, the page is rendered directly
+        at that size instead of at a fixed DPI.
+
+        :param document_data: Raw PDF bytes.
+        :param page_number: The 1-based index of the page to extract.
+        :param dpi: Resolution used when no target size is given.
+        :param width: Target width in pixels.
+        :param height: Target height in pixels.
+        :return: PIL Image wrapping the rendered pixmap.
+        """
+        doc = self._open(document_data)
         try:
-            import fitz  # PyMuPDF # noqa: F401
+            return self._render(doc, page_number, dpi, width, height)
+        finally:
+            doc.close()
+
+    def _open(self, document_data: bytes) -> Any:
+        try:
+            import fitz  # PyMuPDF
         except ImportError:
             raise RuntimeError("pymupdf is not installed. Run 'pip install morphosx[pdf]' to enable this feature.")
 
         try:
             # Open PDF from memory stream
-            doc = fitz.open(stream=document_data, filetype="pdf")
+            return fitz.open(stream=document_data, filetype="pdf")
+        except Exception as e:
+            raise RuntimeError(f"Document processing failed: {str(e)}")
+
+    def _render(
+        self,
+        doc: Any,
+        page_number: int,
+        dpi: int = DEFAULT_DPI,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> Image.Image:
+        import fitz  # PyMuPDF
 
+        try:
             # fitz uses 0-based indexing
             page_index = max(0, page_number - 1)
 
@@ -50,17 +220,38 @@ class DocumentProcessor(BaseProcessor):
 
             page = doc[page_index]
 
-            # Render page to an image (Pixmap)
-            # The matrix is used to scale the default 72 DPI to the target DPI
-            zoom = dpi / 72.0
-            matrix = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=matrix, alpha=False)
+            # page.rect is the visible (cropped, rotated) page area in points
+            rect = page.rect
+            zoom = self._get_zoom(rect, dpi, width, height)
 
-            # Export as PNG
-            png_bytes = pix.tobytes(output="png")
-            doc.close()
+            # Render page to an image (Pixmap) directly at the output resolution.
+            # The pixmap size is rounded up, so clip to the exact pixel box the image
+            # engine expects: its resize then has nothing left to do.
+            out_width = max(1, int(rect.width * zoom))
+            out_height = max(1, int(rect.height * zoom))
+            clip = fitz.Rect(rect.x0, rect.y0, rect.x0 + out_width / zoom, rect.y0 + out_height / zoom)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
 
-            return png_bytes
+            # Wrap the raw RGB samples directly: no PNG encode/decode
+            return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
 
         except Exception as e:
             raise RuntimeError(f"Document processing failed: {str(e)}")
+
+    def _get_zoom(self, rect: Any, dpi: int, width: Optional[int], height: Optional[int]) -> float:
+        """
+        Scale factor from PDF points to output pixels.
+
+        One axis keeps the aspect ratio; with both axes the page is fitted inside
+        the box. The core engine then applies its own box semantics to the page:
+        VipsProcessor keeps the fit, ImageProcessor stretches it to the exact box,
+        as both do for images.
+        """
+        if width and height:
+            return min(width / rect.width, height / rect.height)
+        if width:
+            return width / rect.width
+        if height:
+            return height / rect.height
+        # Fixed DPI over the 72 points-per-inch PDF space
+        return dpi / 72.0
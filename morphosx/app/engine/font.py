@@ -12,6 +12,8 @@ class FontProcessor(BaseProcessor):
     Engine for generating font specimen images from TTF/OTF files.
     """
 
+    execution_mode = "process"
+
     def __init__(self, image_processor: BaseProcessor):
         self.image_processor = image_processor
 
@@ -24,13 +26,19 @@ class FontProcessor(BaseProcessor):
         """
         Generate specimen and process it as an image.
         """
-        specimen_bytes = self.render_specimen(source_data, {})
-        return self.image_processor.process(specimen_bytes, options)
+        specimen = self._draw_specimen(source_data)
+        return self.image_processor.process_image(specimen, options)
 
     def render_specimen(self, font_data: bytes, options: dict) -> bytes:
         """
         Create a preview of the font.
         """
+        output = io.BytesIO()
+        self._draw_specimen(font_data).save(output, format="JPEG")
+        return output.getvalue()
+
+    def _draw_specimen(self, font_data: bytes) -> Image.Image:
+        """Build the specimen as an in-memory image."""
         try:
             width, height = 1200, 800
             img = Image.new("RGB", (width, height), color=(255, 255, 255))
@@ -61,15 +69,11 @@ class FontProcessor(BaseProcessor):
             large_font = ImageFont.truetype(io.BytesIO(font_data), 72)
             draw.text((40, y), "MorphosX Media Engine", font=large_font, fill=(43, 108, 176))
 
-            output = io.BytesIO()
-            img.save(output, format="JPEG")
-            return output.getvalue()
+            return img
 
         except Exception as e:
             # Fallback image if font is corrupted
             img = Image.new("RGB", (400, 200), color=(255, 0, 0))
             draw = ImageDraw.Draw(img)
             draw.text((20, 80), f"Font Error: {str(e)}", fill=(255, 255, 255))
-            output = io.BytesIO()
-            img.save(output, format="JPEG")
-            return output.getvalue()
+            return img
@@ -16,6 +16,8 @@ class Model3DProcessor(BaseProcessor):
     Engine for generating 2D previews and metadata for 3D Models (STL, OBJ, GLB).
     """
 
+    execution_mode = "process"
+
     def __init__(self, image_processor: BaseProcessor):
         self.image_processor = image_processor
 
@@ -54,8 +56,8 @@ class Model3DProcessor(BaseProcessor):
                 build_xml(root, metadata)
                 return ET.tostring(root, encoding="utf-8"), "application/xml"
 
-        blueprint_bytes = self.render_thumbnail(source_data, filename or "model.obj")
-        return self.image_processor.process(blueprint_bytes, options)
+        blueprint = self._render_card(source_data, filename or "model.obj")
+        return self.image_processor.process_image(blueprint, options)
 
     def get_metadata(self, model_data: bytes, filename: str) -> dict:
         """
@@ -101,6 +103,12 @@ class Model3DProcessor(BaseProcessor):
         """
         Create a preview of the 3D model.
         """
+        output = io.BytesIO()
+        self._render_card(model_data, filename).save(output, format="JPEG")
+        return output.getvalue()
+
+    def _render_card(self, model_data: bytes, filename: str) -> Image.Image:
+        """Build the blueprint card as an in-memory image."""
         metadata = self.get_metadata(model_data, filename)
 
         if "error" in metadata:
@@ -119,7 +127,7 @@ class Model3DProcessor(BaseProcessor):
 
         return self._create_blueprint_card(title, summary)
 
-    def _create_blueprint_card(self, title: str, text: str) -> bytes:
+    def _create_blueprint_card(self, title: str, text: str) -> Image.Image:
         """Render a technical blueprint-style card."""
         width, height = 800, 600
         img = Image.new("RGB", (width, height), color=(10, 50, 100))  # Blueprint blue
@@ -141,6 +149,4 @@ class Model3DProcessor(BaseProcessor):
         draw.line([750, 300, 800, 250], fill=(255, 255, 255), width=2)
         draw.line([550, 250, 800, 250], fill=(255, 255, 255), width=2)
 
-        output = io.BytesIO()
-        img.save(output, format="JPEG")
-        return output.getvalue()
+        return img
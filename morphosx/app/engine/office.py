@@ -15,6 +15,8 @@ class OfficeProcessor(BaseProcessor):
     complex, we generate a 'Summary Card' image.
     """
 
+    execution_mode = "process"
+
     def __init__(self, image_processor: BaseProcessor):
         self.image_processor = image_processor
 
@@ -27,13 +29,19 @@ class OfficeProcessor(BaseProcessor):
         """
         Generate summary card and process it as an image.
         """
-        card_bytes = self.render_thumbnail(source_data, filename or "doc.docx")
-        return self.image_processor.process(card_bytes, options)
+        card = self._render_card(source_data, filename or "doc.docx")
+        return self.image_processor.process_image(card, options)
 
     def render_thumbnail(self, doc_data: bytes, filename: str) -> bytes:
         """
         Generate a summary image for a DOCX, PPTX or XLSX file.
         """
+        output = io.BytesIO()
+        self._render_card(doc_data, filename).save(output, format="JPEG")
+        return output.getvalue()
+
+    def _render_card(self, doc_data: bytes, filename: str) -> Image.Image:
+        """Build the summary card as an in-memory image."""
         try:
             from docx import Document
             from openpyxl import load_workbook
@@ -75,7 +83,7 @@ class OfficeProcessor(BaseProcessor):
         except Exception as e:
             return self._create_summary_card("Error", f"Could not parse office file: {str(e)}")
 
-    def _create_summary_card(self, title: str, text: str) -> bytes:
+    def _create_summary_card(self, title: str, text: str) -> Image.Image:
         """Render a text-based summary card image."""
         width, height = 800, 600
         img = Image.new("RGB", (width, height), color=(240, 240, 240))
@@ -92,6 +100,4 @@ class OfficeProcessor(BaseProcessor):
         except Exception:
             pass
 
-        output = io.BytesIO()
-        img.save(output, format="JPEG")
-        return output.getvalue()
+        return img
@@ -1,11 +1,18 @@
 import io
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 
 from PIL import Image
 
 from .base import BaseProcessor
 from .types import ImageFormat, ProcessingOptions
 
+# Minimum ratio between the intermediate and final size when reducing in steps
+REDUCING_GAP = 2.0
+
+EXIF_ORIENTATION_TAG = 0x0112
+# Orientations that rotate the image by 90 degrees and swap its axes
+SWAPPED_ORIENTATIONS = {5, 6, 7, 8}
+
 try:
     import pillow_heif
 
@@ -26,6 +33,8 @@ class ImageProcessor(BaseProcessor):
     Handles resizing, format conversion, and optimization using memory buffers.
     """
 
+    execution_mode = "process"
+
     def process(
         self,
         source_data: bytes,
@@ -36,48 +45,130 @@ class ImageProcessor(BaseProcessor):
         Apply transformations to the source image data.
         """
         with Image.open(io.BytesIO(source_data)) as img:
+            # Work out the final size up front so the decoder can skip detail we'd throw away
+            target_size = None
+            if options.width or options.height:
+                target_size = self._get_target_size(self._get_oriented_size(img), options.width, options.height)
+                self._apply_draft(img, target_size)
+
             # Handle orientation from EXIF if present
             img = self._handle_exif_orientation(img)
 
-            # Resize if dimensions are provided
-            if options.width or options.height:
-                img = self._resize(img, options.width, options.height)
+            return self._transform(img, options, target_size)
+
+    def process_image(self, image: Any, options: ProcessingOptions) -> Tuple[bytes, str]:
+        """
+        Apply transformations to an already-decoded image (PIL, pyvips or numpy).
+        """
+        img = self._to_pil(image)
+        return self._transform(img, options, self._get_target_size(img.size, options.width, options.height))
 
-            # Prepare for export
-            output_buffer = io.BytesIO()
-            save_params = self._get_save_params(options)
+    def _transform(
+        self, img: Image.Image, options: ProcessingOptions, target_size: Optional[Tuple[int, int]]
+    ) -> Tuple[bytes, str]:
+        """
+        Resize and encode a decoded image.
+
+        :param img: PIL Image object (already oriented).
+        :param options: Processing options.
+        :param target_size: Final (width, height), or None to keep the current size.
+        :return: (processed_bytes, mime_type)
+        """
+        # Resize if dimensions are provided (and differ from what was decoded)
+        if target_size and target_size != img.size:
+            img = self._resize(img, target_size)
 
-            # Convert to RGB if necessary (e.g., saving PNG with alpha to JPEG)
-            if options.format == ImageFormat.JPEG and img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
+        # Prepare for export
+        output_buffer = io.BytesIO()
+        save_params = self._get_save_params(options)
 
-            img.save(output_buffer, format=options.format.value, **save_params)
+        # Convert to RGB if necessary (e.g., saving PNG with alpha to JPEG)
+        if options.format == ImageFormat.JPEG and img.mode in ("RGBA", "P"):
+            img = img.convert("RGB")
 
-            processed_data = output_buffer.getvalue()
-            mime_type = f"image/{options.format.value.lower()}"
+        img.save(output_buffer, format=options.format.value, **save_params)
 
-            return processed_data, mime_type
+        processed_data = output_buffer.getvalue()
+        mime_type = f"image/{options.format.value.lower()}"
 
-    def _resize(self, img: Image.Image, width: Optional[int], height: Optional[int]) -> Image.Image:
+        return processed_data, mime_type
+
+    def _to_pil(self, image: Any) -> Image.Image:
+        """
+        Convert an in-memory image from another library to a PIL Image.
         """
-        Resize image while maintaining aspect ratio if only one dimension is provided.
+        if isinstance(image, Image.Image):
+            return image
+        if hasattr(image, "write_to_memory"):
+            # pyvips.Image: copy the raw pixel buffer, no encode/decode
+            image = image.cast("uchar")
+            mode = {1: "L", 2: "LA", 3: "RGB", 4: "RGBA"}[image.bands]
+            return Image.frombytes(mode, (image.width, image.height), image.write_to_memory())
+        # numpy ndarray (e.g. rawpy output)
+        return Image.fromarray(image)
+
+    def _get_target_size(
+        self, size: Tuple[int, int], width: Optional[int], height: Optional[int]
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Compute the output size, maintaining aspect ratio if only one dimension is provided.
 
-        :param img: PIL Image object.
+        :param size: Source (width, height) after EXIF orientation.
         :param width: Target width.
         :param height: Target height.
-        :return: Resized PIL Image object.
+        :return: (width, height) or None if no resize is requested.
         """
-        original_width, original_height = img.size
+        original_width, original_height = size
 
         if width and not height:
             height = int((width / original_width) * original_height)
         elif height and not width:
             width = int((height / original_height) * original_width)
         elif not width and not height:
+            return None
+
+        return width, height
+
+    def _get_oriented_size(self, img: Image.Image) -> Tuple[int, int]:
+        """
+        Return the image size as it will be after EXIF orientation is applied.
+        """
+        if img.getexif().get(EXIF_ORIENTATION_TAG) in SWAPPED_ORIENTATIONS:
+            return img.height, img.width
+        return img.size
+
+    def _apply_draft(self, img: Image.Image, target_size: Tuple[int, int]):
+        """
+        Enable JPEG draft mode so libjpeg decodes at 1/2, 1/4 or 1/8 scale (DCT-domain scaling).
+
+        The draft is requested at REDUCING_GAP times the target size, so the final
+        Lanczos pass still has enough pixels to keep full quality. No-op for other formats.
+
+        :param img: Freshly opened (not yet loaded) PIL Image.
+        :param target_size: Final (width, height) after EXIF orientation.
+        """
+        if img.format != "JPEG":
+            return
+
+        width, height = target_size
+        if img.getexif().get(EXIF_ORIENTATION_TAG) in SWAPPED_ORIENTATIONS:
+            width, height = height, width
+
+        img.draft(None, (int(width * REDUCING_GAP), int(height * REDUCING_GAP)))
+
+    def _resize(self, img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        """
+        Resize image to the given size.
+
+        :param img: PIL Image object.
+        :param size: Target (width, height).
+        :return: Resized PIL Image object.
+        """
+        if img.size == size:
             return img
 
-        # Use LANCZOS for high-quality downsampling
-        return img.resize((width, height), resample=Image.Resampling.LANCZOS)
+        # Integer-factor reduce() first, then LANCZOS for high-quality downsampling
+        return img.resize(size, resample=Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
 
     def _handle_exif_orientation(self, img: Image.Image) -> Image.Image:
         """
@@ -1,19 +1,37 @@
 import io
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 
 from PIL import Image
 
 from .base import BaseProcessor
 from .types import ProcessingOptions
 
+# Accepted values of settings.raw_preview_mode
+PREVIEW_MODES = ("auto", "full")
+
+# LibRaw 'flip' values and the transpose that applies them to an embedded preview
+FLIP_TRANSPOSE = {
+    3: Image.Transpose.ROTATE_180,
+    5: Image.Transpose.ROTATE_90,
+    6: Image.Transpose.ROTATE_270,
+}
+
 
 class RawProcessor(BaseProcessor):
     """
     Core engine for processing RAW image formats (e.g., CR2, NEF, DNG, ARW).
+
+    In 'auto' mode the cheapest source that still covers the requested size is
+    used: the embedded JPEG preview, then a half-size demosaic, then a full
+    demosaic. 'full' mode always demosaics at full resolution.
     """
 
-    def __init__(self, image_processor: BaseProcessor):
+    def __init__(self, image_processor: BaseProcessor, preview_mode: str = "auto"):
+        if preview_mode not in PREVIEW_MODES:
+            raise ValueError(f"Unknown RAW preview mode '{preview_mode}', expected one of {list(PREVIEW_MODES)}")
+
         self.image_processor = image_processor
+        self.preview_mode = preview_mode
 
     def process(
         self,
@@ -24,8 +42,8 @@ class RawProcessor(BaseProcessor):
         """
         Extract preview and process it as an image.
         """
-        preview_bytes = self.extract_preview(source_data)
-        return self.image_processor.process(preview_bytes, options)
+        preview = self.render_preview(source_data, options.width, options.height)
+        return self.image_processor.process_image(preview, options)
 
     def extract_preview(self, raw_data: bytes) -> bytes:
         """
@@ -34,6 +52,23 @@ class RawProcessor(BaseProcessor):
         :param raw_data: Raw bytes of the image file.
         :return: Standard image bytes (e.g., JPEG or PNG) ready for ImageProcessor.
         """
+        preview = self.render_preview(raw_data)
+        if not isinstance(preview, Image.Image):
+            preview = Image.fromarray(preview)
+
+        output_buffer = io.BytesIO()
+        preview.convert("RGB").save(output_buffer, format="JPEG", quality=95)
+        return output_buffer.getvalue()
+
+    def render_preview(self, raw_data: bytes, width: Optional[int] = None, height: Optional[int] = None) -> Any:
+        """
+        Render the RAW image to an in-memory RGB image, as cheaply as the target size allows.
+
+        :param raw_data: Raw bytes of the image file.
+        :param width: Target width in pixels (None keeps the full resolution).
+        :param height: Target height in pixels (None keeps the full resolution).
+        :return: PIL Image (embedded preview) or numpy ndarray (height, width, 3), ready for process_image().
+        """
         try:
             import imageio.v3 as iio  # noqa: F401
             import rawpy
@@ -45,22 +80,71 @@ class RawProcessor(BaseProcessor):
         try:
             # Load raw data from memory buffer
             with rawpy.imread(io.BytesIO(raw_data)) as raw:
-                # Post-process the raw image to an RGB numpy array
-                # use_camera_wb=True ensures colors match the camera settings
-                # half_size=True speeds up processing by reducing resolution,
-                # which is usually fine since the ImageProcessor will likely downscale anyway.
-                # However, for highest quality we might want half_size=False.
-                # Let's use half_size=False for best quality, but it might be slower.
-                rgb = raw.postprocess(use_camera_wb=True, half_size=False)
+                if self.preview_mode == "full":
+                    return raw.postprocess(use_camera_wb=True, half_size=False)
 
-                # Convert the numpy array to a Pillow Image
-                img = Image.fromarray(rgb)
+                flip = int(raw.sizes.flip)
+                full_size = (int(raw.sizes.width), int(raw.sizes.height))
+                if flip in (5, 6):
+                    full_size = full_size[::-1]
+                target_size = self._get_target_size(full_size, width, height)
 
-                # Save to a memory buffer as JPEG
-                output_buffer = io.BytesIO()
-                img.save(output_buffer, format="JPEG", quality=95)
+                # 1. Embedded preview: no demosaic at all
+                preview = self._embedded_preview(raw, flip, target_size)
+                if preview is not None:
+                    return preview
 
-                return output_buffer.getvalue()
+                # 2. Half-size demosaic: 2x2 binning, about 4x less work
+                # use_camera_wb=True ensures colors match the camera settings
+                half_size = target_size[0] * 2 <= full_size[0] and target_size[1] * 2 <= full_size[1]
+                return raw.postprocess(use_camera_wb=True, half_size=half_size)
 
         except Exception as e:
             raise RuntimeError(f"RAW image processing failed: {str(e)}")
+
+    def _get_target_size(
+        self, full_size: Tuple[int, int], width: Optional[int], height: Optional[int]
+    ) -> Tuple[int, int]:
+        """
+        Output size the preview must cover, keeping the sensor's aspect ratio.
+        """
+        full_width, full_height = full_size
+        if width and not height:
+            height = int(width / full_width * full_height)
+        elif height and not width:
+            width = int(height / full_height * full_width)
+        elif not width and not height:
+            return full_size
+        return width, height
+
+    def _embedded_preview(self, raw: Any, flip: int, target_size: Tuple[int, int]) -> Optional[Image.Image]:
+        """
+        Return the embedded preview if it is at least as large as the target, else None.
+        """
+        import rawpy
+
+        try:
+            thumb = raw.extract_thumb()
+        except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError):
+            return None
+
+        if thumb.format == rawpy.ThumbFormat.JPEG:
+            img = Image.open(io.BytesIO(thumb.data))
+        elif thumb.format == rawpy.ThumbFormat.BITMAP:
+            img = Image.fromarray(thumb.data)
+        else:
+            return None
+
+        # The preview is stored in sensor orientation: compare and rotate like the demosaic output
+        oriented_size = img.size[::-1] if flip in (5, 6) else img.size
+        if oriented_size[0] < target_size[0] or oriented_size[1] < target_size[1]:
+            return None
+
+        if img.format == "JPEG":
+            # DCT-domain downscale while decoding, never below the target
+            stored_target = target_size[::-1] if flip in (5, 6) else target_size
+            img.draft("RGB", stored_target)
+
+        if flip in FLIP_TRANSPOSE:
+            img = img.transpose(FLIP_TRANSPOSE[flip])
+        return img
@@ -1,8 +1,10 @@
+import io
 import json
 import xml.dom.minidom
 from typing import Optional, Tuple
 
 import markdown
+from PIL import Image
 from pygments import highlight
 from pygments.formatters import ImageFormatter
 from pygments.lexers import ClassNotFound, get_lexer_by_name, get_lexer_for_filename
@@ -18,6 +20,8 @@ class TextProcessor(BaseProcessor):
     Can minify/prettify data or render it as a syntax-highlighted image.
     """
 
+    execution_mode = "process"
+
     def __init__(self, image_processor: BaseProcessor):
         self.image_processor = image_processor
 
@@ -38,19 +42,27 @@ class TextProcessor(BaseProcessor):
             ImageFormat.MD,
             ImageFormat.HTML,
         ):
-            rendered_bytes = self.render_to_image(source_data, filename or "file.txt", options)
-            return self.image_processor.process(rendered_bytes, options)
+            # BMP is uncompressed: the image engine gets the pixels without a PNG round trip
+            rendered_bytes = self.render_to_image(source_data, filename or "file.txt", options, image_format="bmp")
+            return self.image_processor.process_image(Image.open(io.BytesIO(rendered_bytes)), options)
 
         # Otherwise, process as text
         return self.process_text(source_data, filename or "file.txt")
 
-    def render_to_image(self, text_data: bytes, filename: str, options: ProcessingOptions) -> bytes:
+    def render_to_image(
+        self,
+        text_data: bytes,
+        filename: str,
+        options: ProcessingOptions,
+        image_format: str = "png",
+    ) -> bytes:
         """
         Render text content as a syntax-highlighted image.
 
         :param text_data: Raw bytes of the text file.
         :param filename: Original filename to determine the lexer.
         :param options: Transformation parameters.
+        :param image_format: Pygments image format ('png', 'bmp', ...).
         :return: Processed image bytes.
         """
         try:
@@ -81,6 +93,7 @@ class TextProcessor(BaseProcessor):
                 line_number_chars=3,
                 line_numbers=True,
                 style="monokai",
+                image_format=image_format,
             )
 
             # Highlight to image
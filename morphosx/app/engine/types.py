@@ -14,6 +14,7 @@ class ImageFormat(str, Enum):
     XML = "XML"
     MD = "MD"
     HTML = "HTML"
+    VTT = "VTT"
 
 
 @dataclass(frozen=True)
@@ -27,6 +28,8 @@ class ProcessingOptions:
     :param quality: Compression quality from 1 to 100.
     :param time: For media with a temporal dimension (video/audio), the timestamp in seconds.
     :param page: For multi-page documents (PDF), the 1-based page index.
+    :param sprite_interval: For video, seconds between storyboard tiles (0 disables sprite mode).
+    :param sprite_columns: For video storyboards, the number of tiles per sheet row.
     """
 
     width: Optional[int] = None
@@ -35,17 +38,20 @@ class ProcessingOptions:
     quality: int = 80
     time: float = 0.0
     page: int = 1
+    sprite_interval: float = 0.0
+    sprite_columns: int = 10
 
     def get_cache_key(self) -> str:
         """
         Generate a unique, readable filename for the processed variant.
-        Example: w300_hauto_q80_t1.2_p1.webp
+        Example: w300_hauto_q80_t1.2_p1.webp (storyboards: w160_hauto_q80_t0_p1_s2.0x10.webp)
         """
         w_part = f"w{self.width}" if self.width else "wauto"
         h_part = f"h{self.height}" if self.height else "hauto"
         q_part = f"q{self.quality}"
         t_part = f"t{self.time}" if self.time > 0 else "t0"
         p_part = f"p{self.page}" if self.page > 1 else "p1"
+        s_part = f"_s{self.sprite_interval}x{self.sprite_columns}" if self.sprite_interval > 0 else ""
         ext = self.format.value.lower()
 
-        return f"{w_part}_{h_part}_{q_part}_{t_part}_{p_part}.{ext}"
+        return f"{w_part}_{h_part}_{q_part}_{t_part}_{p_part}{s_part}.{ext}"
@@ -1,18 +1,43 @@
-import os
-import tempfile
-from typing import Optional, Tuple
+import io
+import json
+import math
+import re
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple, Union
 
-from .base import BaseProcessor
-from .types import ProcessingOptions
+from PIL import Image
+
+from .base import BaseProcessor, source_path
+from .types import ImageFormat, ProcessingOptions
+
+# Storyboard limits: tile width when no size is requested, the largest tile edge,
+# a hard cap on tiles per sheet and the largest sheet edge WEBP can encode
+SPRITE_TILE_WIDTH = 160
+SPRITE_MAX_TILE_SIZE = 320
+SPRITE_MAX_FRAMES = 400
+SPRITE_MAX_SHEET_SIZE = 16383
+SPRITE_SHEET_FORMATS = {ImageFormat.JPEG, ImageFormat.PNG, ImageFormat.WEBP}
+SPRITE_FORMATS = SPRITE_SHEET_FORMATS | {ImageFormat.JSON, ImageFormat.VTT}
+
+PPM_HEADER = re.compile(rb"P6\s+(\d+)\s+(\d+)\s+255\s")
+PTS_TIME = re.compile(r"pts_time:\s*([\d.]+)")
+
+
+class StoryboardTooLarge(ValueError):
+    """Raised before decoding when a storyboard sheet would exceed the encoder limit."""
 
 
 class VideoProcessor(BaseProcessor):
     """
     Core engine for video metadata and thumbnail extraction.
 
-    Uses FFmpeg for high-performance frame manipulation.
+    Uses FFmpeg for high-performance frame manipulation. Sources can be raw
+    bytes or a path/URL handed over by the storage backend, in which case
+    FFmpeg reads (and seeks in) the original directly.
     """
 
+    supports_source_uri = True
+
     def __init__(self, image_processor: BaseProcessor):
         self.image_processor = image_processor
 
@@ -23,19 +48,156 @@ class VideoProcessor(BaseProcessor):
         filename: Optional[str] = None,
     ) -> Tuple[bytes, str]:
         """
-        Extract a frame and process it as an image.
+        Extract a frame (or a storyboard) and process it as an image.
+        """
+        if options.sprite_interval > 0:
+            return self._sprite_output(source_data, options)
+        frame = self.extract_frame(source_data, options.time)
+        return self.image_processor.process_image(frame, options)
+
+    def process_uri(
+        self,
+        source_uri: str,
+        options: ProcessingOptions,
+        filename: Optional[str] = None,
+    ) -> Tuple[bytes, str]:
+        """
+        Extract a frame (or a storyboard) from a local path or URL and process it as an image.
         """
-        frame_bytes = self.extract_thumbnail(source_data, options.time)
-        return self.image_processor.process(frame_bytes, options)
+        if options.sprite_interval > 0:
+            return self._sprite_output(source_uri, options)
+        frame = self.extract_frame(source_uri, options.time)
+        return self.image_processor.process_image(frame, options)
 
-    def extract_thumbnail(self, video_data: bytes, timestamp: float = 0.0) -> bytes:
+    def extract_thumbnail(self, video_data: Union[bytes, str], timestamp: float = 0.0) -> bytes:
         """
         Extract a single frame from video at a given timestamp.
 
-        :param video_data: Raw video bytes.
+        :param video_data: Raw video bytes, or a path/URL FFmpeg can open.
         :param timestamp: Time in seconds to extract the frame from.
         :return: JPEG bytes of the extracted frame.
         """
+        return self._grab_frame(video_data, timestamp, vcodec="mjpeg")
+
+    def extract_frame(self, video_data: Union[bytes, str], timestamp: float = 0.0) -> Image.Image:
+        """
+        Extract a single frame as an in-memory image, without lossy compression.
+
+        :param video_data: Raw video bytes, or a path/URL FFmpeg can open.
+        :param timestamp: Time in seconds to extract the frame from.
+        :return: PIL Image of the frame.
+        """
+        # PPM is uncompressed RGB with a tiny header: no lossy encode, trivial decode
+        frame_bytes = self._grab_frame(video_data, timestamp, vcodec="ppm")
+        return Image.open(io.BytesIO(frame_bytes))
+
+    def render_sprite(self, video_data: Union[bytes, str], options: ProcessingOptions) -> Tuple[Image.Image, dict]:
+        """
+        Tile frames taken every `options.sprite_interval` seconds into a single sheet.
+
+        :param video_data: Raw video bytes, or a path/URL FFmpeg can open.
+        :param options: Tile size (width/height), interval, columns and start time.
+        :return: (sheet, index) where index maps each tile to its timestamp and geometry.
+        :raises StoryboardTooLarge: If the sheet would not fit the encoder, checked before decoding.
+        """
+        with source_path(video_data, suffix=".video") as input_path:
+            tile_size = self.sprite_tile_size(input_path, options)
+            frames, timestamps = self._grab_keyframes(input_path, options, tile_size)
+        if not frames:
+            raise RuntimeError("FFmpeg returned no frames for the storyboard")
+
+        tile_width, tile_height = frames[0].size
+        columns = min(options.sprite_columns, len(frames))
+        rows = math.ceil(len(frames) / columns)
+        sheet = Image.new("RGB", (columns * tile_width, rows * tile_height))
+
+        tiles = []
+        for i, (frame, timestamp) in enumerate(zip(frames, timestamps)):
+            x, y = (i % columns) * tile_width, (i // columns) * tile_height
+            sheet.paste(frame, (x, y))
+            tiles.append({"time": timestamp, "x": x, "y": y, "width": tile_width, "height": tile_height})
+
+        index = {
+            "interval": options.sprite_interval,
+            "columns": columns,
+            "rows": rows,
+            "tile_width": tile_width,
+            "tile_height": tile_height,
+            "frames": tiles,
+        }
+        return sheet, index
+
+    def render_sprite_set(
+        self,
+        video_data: Union[bytes, str],
+        options: ProcessingOptions,
+        sheet_url: Optional[str] = None,
+    ) -> Dict[ImageFormat, Tuple[bytes, str]]:
+        """
+        Render every storyboard output from a single decode pass.
+
+        The WEBP sheet, the JSON and VTT indexes (both pointing at that sheet) and,
+        if a different image format was requested, the sheet in that format.
+
+        :param video_data: Raw video bytes, or a path/URL FFmpeg can open.
+        :param options: Storyboard options; `format` selects the extra sheet format.
+        :param sheet_url: URL of the WEBP sheet used in the indexes. Defaults to its
+                          cache file name, a sibling of the indexes under cache/.
+        :return: Mapping of output format to (bytes, mime_type).
+        """
+        sheet, index = self.render_sprite(video_data, options)
+        sheet_options = replace(options, width=None, height=None, format=ImageFormat.WEBP)
+
+        outputs = {ImageFormat.WEBP: self.image_processor.process_image(sheet, sheet_options)}
+        if options.format in SPRITE_SHEET_FORMATS and options.format not in outputs:
+            outputs[options.format] = self.image_processor.process_image(
+                sheet, replace(sheet_options, format=options.format)
+            )
+
+        if sheet_url is None:
+            sheet_url = replace(options, format=ImageFormat.WEBP).get_cache_key()
+        outputs[ImageFormat.JSON] = (json.dumps(dict(index, sheet=sheet_url)).encode(), "application/json")
+        outputs[ImageFormat.VTT] = (self._sprite_vtt(index, sheet_url).encode(), "text/vtt")
+        return outputs
+
+    def _sprite_output(self, video_data: Union[bytes, str], options: ProcessingOptions) -> Tuple[bytes, str]:
+        outputs = self.render_sprite_set(video_data, options)
+        if options.format not in outputs:
+            raise ValueError(f"Storyboards are not available as {options.format.value}")
+        return outputs[options.format]
+
+    def sprite_tile_size(self, video_data: Union[bytes, str], options: ProcessingOptions) -> Tuple[int, int]:
+        """
+        Tile size of a storyboard, after checking that its sheet fits the encoder.
+
+        Uses only the container header (duration and frame size), so oversized
+        requests are rejected before any frame is decoded.
+
+        :param video_data: Raw video bytes, or a path/URL FFmpeg can open.
+        :param options: Tile size (width/height), interval, columns and start time.
+        :return: (tile_width, tile_height), capped to SPRITE_MAX_TILE_SIZE.
+        :raises StoryboardTooLarge: If the sheet would exceed SPRITE_MAX_SHEET_SIZE.
+        """
+        metadata = self.get_metadata(video_data)
+        tile_width, tile_height = _sprite_tile_size(options, metadata["width"], metadata["height"])
+
+        frames = SPRITE_MAX_FRAMES
+        if metadata["duration"] > 0:
+            span = max(metadata["duration"] - options.time, 0.0)
+            frames = min(frames, math.floor(span / options.sprite_interval) + 1)
+        columns = min(options.sprite_columns, frames)
+        rows = math.ceil(frames / columns)
+        sheet_width, sheet_height = columns * tile_width, rows * tile_height
+        if max(sheet_width, sheet_height) > SPRITE_MAX_SHEET_SIZE:
+            raise StoryboardTooLarge(
+                f"A storyboard of {frames} tiles would be {sheet_width}x{sheet_height} px, over the "
+                f"{SPRITE_MAX_SHEET_SIZE} px sheet limit: use a longer interval, other columns or smaller tiles"
+            )
+        return tile_width, tile_height
+
+    def _grab_keyframes(
+        self, video_data: Union[bytes, str], options: ProcessingOptions, tile_size: Tuple[int, int]
+    ) -> Tuple[List[Image.Image], List[float]]:
         try:
             import ffmpeg
         except ImportError:
@@ -43,29 +205,70 @@ class VideoProcessor(BaseProcessor):
                 "ffmpeg-python is not installed. Run 'pip install morphosx[video]' to enable this feature."
             )
 
-        # FFmpeg works with file paths, so we need a temporary file
-        # unless we pipe, but piping video bytes can be complex.
-        # For simplicity and performance, we use a temporary file in /tmp (RAM-backed in many Linux distros)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".video") as tmp:
-            tmp.write(video_data)
-            tmp_path = tmp.name
+        # Keep the first keyframe, then the first one at least `interval` seconds after the last pick
+        select = f"select='isnan(prev_selected_t)+gte(t-prev_selected_t,{options.sprite_interval})'"
+        scale = f"scale={tile_size[0]}:{tile_size[1]}"
+
+        with source_path(video_data, suffix=".video") as input_path:
+            try:
+                # Command: ffmpeg -ss {time} -skip_frame nokey -i {input} -vf select,scale,showinfo
+                #          -fps_mode vfr -f image2pipe -vcodec ppm pipe:
+                # Only keyframes are decoded, in one pass, instead of one seek per timestamp
+                out, err = (
+                    ffmpeg.input(input_path, ss=options.time, skip_frame="nokey")
+                    .output(
+                        "pipe:",
+                        vf=f"{select},{scale},showinfo",
+                        fps_mode="vfr",
+                        vframes=SPRITE_MAX_FRAMES,
+                        format="image2pipe",
+                        vcodec="ppm",
+                    )
+                    .run(capture_stdout=True, capture_stderr=True)
+                )
+            except ffmpeg.Error as e:
+                raise RuntimeError(f"FFmpeg storyboard extraction failed: {e.stderr.decode()}")
+
+        frames = _split_ppm_stream(out)
+        # showinfo reports the actual (keyframe-snapped) time of every selected frame
+        timestamps = [options.time + float(t) for t in PTS_TIME.findall(err.decode(errors="replace"))]
+        if len(timestamps) != len(frames):
+            timestamps = [options.time + i * options.sprite_interval for i in range(len(frames))]
+        return frames, timestamps
+
+    def _sprite_vtt(self, index: dict, sheet_url: str) -> str:
+        frames = index["frames"]
+        lines = ["WEBVTT", ""]
+        for i, frame in enumerate(frames):
+            start = frame["time"]
+            end = frames[i + 1]["time"] if i + 1 < len(frames) else start + index["interval"]
+            lines.append(f"{_vtt_timestamp(start)} --> {_vtt_timestamp(end)}")
+            lines.append(f"{sheet_url}#xywh={frame['x']},{frame['y']},{frame['width']},{frame['height']}")
+            lines.append("")
+        return "\n".join(lines)
 
+    def _grab_frame(self, video_data: Union[bytes, str], timestamp: float, vcodec: str) -> bytes:
         try:
-            # Command: ffmpeg -ss {timestamp} -i {input} -vframes 1 -f image2 pipe:1
-            out, _ = (
-                ffmpeg.input(tmp_path, ss=timestamp)
-                .output("pipe:", vframes=1, format="image2", vcodec="mjpeg")
-                .run(capture_stdout=True, quiet=True)
+            import ffmpeg
+        except ImportError:
+            raise RuntimeError(
+                "ffmpeg-python is not installed. Run 'pip install morphosx[video]' to enable this feature."
             )
-            return out
-        except ffmpeg.Error as e:
-            raise RuntimeError(f"FFmpeg thumbnail extraction failed: {e.stderr.decode()}")
-        finally:
-            # Cleanup temp file
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
 
-    def get_metadata(self, video_data: bytes) -> dict:
+        # Paths/URLs go straight to FFmpeg; raw bytes are spooled to a temporary file
+        with source_path(video_data, suffix=".video") as input_path:
+            try:
+                # Command: ffmpeg -ss {timestamp} -i {input} -vframes 1 -f image2 pipe:1
+                out, _ = (
+                    ffmpeg.input(input_path, ss=timestamp)
+                    .output("pipe:", vframes=1, format="image2", vcodec=vcodec)
+                    .run(capture_stdout=True, quiet=True)
+                )
+                return out
+            except ffmpeg.Error as e:
+                raise RuntimeError(f"FFmpeg thumbnail extraction failed: {e.stderr.decode()}")
+
+    def get_metadata(self, video_data: Union[bytes, str]) -> dict:
         """
         Probe video for metadata (resolution, duration, etc).
         """
@@ -76,26 +279,65 @@ class VideoProcessor(BaseProcessor):
                 "ffmpeg-python is not installed. Run 'pip install morphosx[video]' to enable this feature."
             )
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".video") as tmp:
-            tmp.write(video_data)
-            tmp_path = tmp.name
+        with source_path(video_data, suffix=".video") as input_path:
+            try:
+                probe = ffmpeg.probe(input_path)
+                video_stream = next(
+                    (stream for stream in probe["streams"] if stream["codec_type"] == "video"),
+                    None,
+                )
+
+                return {
+                    "duration": float(probe["format"].get("duration", 0)),
+                    "width": int(video_stream["width"]) if video_stream else None,
+                    "height": int(video_stream["height"]) if video_stream else None,
+                    "codec": video_stream["codec_name"] if video_stream else None,
+                    "bitrate": int(probe["format"].get("bit_rate", 0)),
+                }
+            except ffmpeg.Error as e:
+                raise RuntimeError(f"FFmpeg probe failed: {e.stderr.decode()}")
+
+
+def _sprite_tile_size(
+    options: ProcessingOptions, source_width: Optional[int], source_height: Optional[int]
+) -> Tuple[int, int]:
+    width, height = options.width, options.height
+    if not width and not height:
+        width = SPRITE_TILE_WIDTH
+    # Fill in the missing edge from the source aspect ratio, even-sized like ffmpeg's scale=-2
+    if source_width and source_height:
+        if not height:
+            height = _even(width * source_height / source_width)
+        elif not width:
+            width = _even(height * source_width / source_height)
+    width, height = width or height, height or width
+
+    # Tiles are thumbnails: scale oversized requests down, keeping their proportions
+    factor = min(1.0, SPRITE_MAX_TILE_SIZE / width, SPRITE_MAX_TILE_SIZE / height)
+    if factor < 1.0:
+        width, height = _even(width * factor), _even(height * factor)
+    return width, height
+
+
+def _even(value: float) -> int:
+    return max(2, 2 * round(value / 2))
+
+
+def _split_ppm_stream(data: bytes) -> List[Image.Image]:
+    """Split concatenated binary PPM images (FFmpeg image2pipe output) into frames."""
+    frames = []
+    offset = 0
+    while match := PPM_HEADER.match(data, offset):
+        width, height = int(match.group(1)), int(match.group(2))
+        end = match.end() + width * height * 3
+        frames.append(Image.frombytes("RGB", (width, height), data[match.end() : end]))
+        offset = end
+    return frames
 
-        try:
-            probe = ffmpeg.probe(tmp_path)
-            video_stream = next(
-                (stream for stream in probe["streams"] if stream["codec_type"] == "video"),
-                None,
-            )
 
-            return {
-                "duration": float(probe["format"].get("duration", 0)),
-                "width": int(video_stream["width"]) if video_stream else None,
-                "height": int(video_stream["height"]) if video_stream else None,
-                "codec": video_stream["codec_name"] if video_stream else None,
-                "bitrate": int(probe["format"].get("bit_rate", 0)),
-            }
-        except ffmpeg.Error as e:
-            raise RuntimeError(f"FFmpeg probe failed: {e.stderr.decode()}")
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+def _vtt_timestamp(seconds: float) -> str:
+    millis = round(seconds * 1000)
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
@@ -1,8 +1,11 @@
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 
 from .base import BaseProcessor
 from .types import ImageFormat, ProcessingOptions
 
+# libvips' largest coordinate, used to leave one thumbnail axis unconstrained
+VIPS_MAX_COORD = 10_000_000
+
 
 class VipsProcessor(BaseProcessor):
     """
@@ -27,33 +30,119 @@ class VipsProcessor(BaseProcessor):
             raise RuntimeError("pyvips is not installed. Run 'pip install morphosx[vips]' to enable this feature.")
 
         try:
-            # Load image from memory buffer
-            img = pyvips.Image.new_from_buffer(source_data, "")
+            # Load image from memory buffer. Loading is lazy: only the header is parsed here.
+            img = pyvips.Image.new_from_buffer(source_data, "", access="sequential")
 
             # Resize if dimensions are provided
             if options.width or options.height:
-                img = self._resize(img, options.width, options.height)
+                if self._is_downscale(img, options.width, options.height):
+                    img = self._thumbnail(source_data, options.width, options.height)
+                else:
+                    img = self._resize(img, options.width, options.height)
 
-            # Map ImageFormat to libvips format string
-            format_map = {
-                ImageFormat.JPEG: ".jpg",
-                ImageFormat.PNG: ".png",
-                ImageFormat.WEBP: ".webp",
-            }
-            vips_format = format_map.get(options.format, ".webp")
+            return self._encode(img, options)
 
-            # Prepare saving parameters
-            save_params = self._get_save_params(options)
+        except Exception as e:
+            raise RuntimeError(f"Vips processing failed: {str(e)}")
 
-            # Export to buffer
-            processed_data = img.write_to_buffer(vips_format, **save_params)
-            mime_type = f"image/{options.format.value.lower()}"
+    def process_image(self, image: Any, options: ProcessingOptions) -> Tuple[bytes, str]:
+        """
+        Apply transformations to an already-decoded image (pyvips, PIL or numpy).
+        """
+        try:
+            import pyvips  # noqa: F401
+        except ImportError:
+            raise RuntimeError("pyvips is not installed. Run 'pip install morphosx[vips]' to enable this feature.")
+
+        try:
+            img = self._to_vips(image)
 
-            return processed_data, mime_type
+            if options.width or options.height:
+                if self._is_downscale(img, options.width, options.height):
+                    img = img.thumbnail_image(
+                        options.width or VIPS_MAX_COORD,
+                        height=options.height or VIPS_MAX_COORD,
+                        size="down",
+                    )
+                else:
+                    img = self._resize(img, options.width, options.height)
+
+            return self._encode(img, options)
 
         except Exception as e:
             raise RuntimeError(f"Vips processing failed: {str(e)}")
 
+    def _encode(self, img, options: ProcessingOptions) -> Tuple[bytes, str]:
+        """
+        Export a vips image to the requested output format.
+        """
+        # Map ImageFormat to libvips format string
+        format_map = {
+            ImageFormat.JPEG: ".jpg",
+            ImageFormat.PNG: ".png",
+            ImageFormat.WEBP: ".webp",
+        }
+        vips_format = format_map.get(options.format, ".webp")
+
+        # Prepare saving parameters
+        save_params = self._get_save_params(options)
+
+        # Export to buffer
+        processed_data = img.write_to_buffer(vips_format, **save_params)
+        mime_type = f"image/{options.format.value.lower()}"
+
+        return processed_data, mime_type
+
+    def _to_vips(self, image: Any):
+        """
+        Wrap an in-memory image from another library as a pyvips.Image without re-encoding.
+        """
+        import pyvips
+        from PIL import Image
+
+        if isinstance(image, pyvips.Image):
+            return image
+        if isinstance(image, Image.Image):
+            if image.mode not in ("L", "LA", "RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            return pyvips.Image.new_from_memory(
+                image.tobytes(), image.width, image.height, len(image.getbands()), "uchar"
+            )
+        # numpy ndarray (e.g. rawpy output)
+        return pyvips.Image.new_from_array(image)
+
+    def _is_downscale(self, img, width: Optional[int], height: Optional[int]) -> bool:
+        """
+        Check whether the requested box is smaller than the source image.
+        """
+        if width and width < img.width:
+            return True
+        if height and height < img.height:
+            return True
+        return False
+
+    def _thumbnail(self, source_data: bytes, width: Optional[int], height: Optional[int]):
+        """
+        Downscale with libvips' thumbnail pipeline.
+
+        thumbnail_buffer uses shrink-on-load (JPEG DCT scaling, WebP/HEIF
+        subsampled decoding) and streams the image sequentially, so a 24 MP
+        JPEG is never fully decoded to produce a 150px thumbnail.
+
+        EXIF orientation is left alone, as on the resize() path: the fit box
+        applies to the stored pixel grid, the one _is_downscale() compared.
+        """
+        import pyvips
+
+        # An unset axis must not constrain the fit box
+        return pyvips.Image.thumbnail_buffer(
+            source_data,
+            width or VIPS_MAX_COORD,
+            height=height or VIPS_MAX_COORD,
+            size="down",
+            no_rotate=True,
+        )
+
     def _resize(self, img, width: Optional[int], height: Optional[int]):
         """
         Resize image while maintaining aspect ratio using libvips' thumbnail-style scaling.
@@ -1,10 +1,39 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from morphosx.app import __version__
+from morphosx.app.api import assets
 from morphosx.app.api.assets import router as assets_router
+from morphosx.app.api.batch import router as batch_router
+from morphosx.app.api.cache import router as cache_router
+from morphosx.app.api.metrics import router as metrics_router
+from morphosx.app.core.metrics import MetricsMiddleware
+from morphosx.app.core.timing import ServerTimingMiddleware
+from morphosx.app.core.workers import worker_pool
 from morphosx.app.settings import settings
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Manage long-lived resources (worker pools, storage clients) for the application lifetime.
+    """
+    worker_pool.startup()
+    await assets.storage.startup()
+    if assets.derivative_cache:
+        await assets.derivative_cache.startup()
+    if assets.render_queue:
+        await assets.render_queue.startup()
+    yield
+    if assets.render_queue:
+        await assets.render_queue.shutdown()
+    if assets.derivative_cache:
+        await assets.derivative_cache.shutdown()
+    await assets.storage.shutdown()
+    worker_pool.shutdown()
+
+
 def create_app() -> FastAPI:
     """
     Initialize and configure the FastAPI application.
@@ -15,10 +44,19 @@ def create_app() -> FastAPI:
         title=settings.app_name,
         description="High-performance OSS cloud storage for on-the-fly image processing.",
         version=__version__,
+        lifespan=lifespan,
     )
 
     # Register API routes
+    app.include_router(batch_router, prefix=settings.api_prefix)
     app.include_router(assets_router, prefix=settings.api_prefix)
+    app.include_router(cache_router, prefix=settings.api_prefix)
+
+    if settings.server_timing_enabled:
+        app.add_middleware(ServerTimingMiddleware, path_prefix=f"{settings.api_prefix}/assets")
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
 
     @app.get("/", tags=["Health"])
     async def root_health_check():
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -35,6 +35,20 @@ class Settings(BaseSettings):
     s3_endpoint: Optional[str] = None
     s3_access_key: Optional[str] = None
     s3_secret_key: Optional[str] = None
+    # Shared client tuning (one client per worker, opened at startup)
+    s3_max_pool_connections: int = 50
+    s3_connect_timeout: float = 5.0
+    s3_read_timeout: float = 60.0
+    s3_max_attempts: int = 3
+    s3_keepalive_timeout: float = 60.0
+    # Uploads larger than this are sent as multipart uploads in parts of this size (min 5 MiB)
+    s3_multipart_part_size: int = 8 * 1024 * 1024
+    # Lifetime (seconds) of presigned URLs handed to ffmpeg for reading originals
+    s3_presign_expires: int = 900
+
+    # Content-addressed originals: identical uploads share one blob (stored by SHA-256)
+    # and one set of derivatives; asset ids become references with refcounting
+    content_addressed_storage: bool = False
 
     @property
     def originals_dir(self) -> str:
@@ -84,6 +98,79 @@ class Settings(BaseSettings):
         "ifc",
         "gltf",
     ]
+    # RAW previews: 'auto' uses the embedded JPEG or a half-size demosaic when
+    # they cover the requested size; 'full' always demosaics at full resolution
+    raw_preview_mode: str = "auto"
+    # Specialized engines to serve; each is imported on its first request.
+    # Extensions of disabled engines fall back to the core image engine.
+    enabled_engines: List[str] = [
+        "video",
+        "audio",
+        "document",
+        "raw",
+        "text",
+        "office",
+        "font",
+        "model3d",
+        "archive",
+        "bim",
+    ]
+
+    # --- WORKER POOL ---
+    # Transformations run off the event loop. GIL-releasing engines (vips, PDF,
+    # ffmpeg) use threads; GIL-bound engines use processes when worker_processes > 0.
+    worker_threads: int = 8
+    worker_processes: int = 2
+    # Max jobs running or waiting before new misses get a 503
+    worker_queue_limit: int = 64
+    # Seconds advertised in the Retry-After header when saturated
+    worker_retry_after: int = 1
+    # Per-engine concurrency caps, e.g. {"VideoProcessor": 2, "DocumentProcessor": 4}
+    engine_concurrency: Dict[str, int] = {}
+
+    # --- CACHE COORDINATION ---
+    # Concurrent misses are always coalesced per worker. Enable the lock to also
+    # coalesce across uvicorn workers and nodes sharing the same storage.
+    cache_lock_enabled: bool = False
+    # Seconds after which a lock is considered stale
+    cache_lock_ttl: float = 60.0
+    # Seconds between polls while waiting for another worker's render
+    cache_lock_poll_interval: float = 0.1
+
+    # --- DERIVATIVE CACHE INDEX ---
+    # Local SQLite index of derivatives (size, last access, hits) used for budgets and stats
+    cache_index_enabled: bool = False
+    # Defaults to {storage_path}/cache-index.db
+    cache_index_path: Optional[str] = None
+    # Byte budget for cache/ (0 = unbounded, accounting only)
+    cache_max_bytes: int = 0
+    # Choice: 'lru' or 'lfu'
+    cache_eviction_policy: str = "lru"
+    # Seconds between background flush/eviction passes
+    cache_eviction_interval: float = 60.0
+    # Evict down to this fraction of the budget, so passes do not run back to back
+    cache_eviction_target: float = 0.9
+    # Serve GET /cache/stats (it reveals cache occupancy and traffic, so opt-in; OPS_TOKEN applies)
+    cache_stats_enabled: bool = False
+
+    # --- HOT CACHE (in-memory) ---
+    # Per-worker RAM tier for small, popular derivatives (0 disables it)
+    hot_cache_max_bytes: int = 64 * 1024 * 1024
+    # Only derivatives up to this size are kept in memory
+    hot_cache_max_item_bytes: int = 256 * 1024
+    # Requests needed before a derivative is admitted (1 admits on first sight)
+    hot_cache_min_requests: int = 2
+    # Seconds an entry may be served from memory before it is dropped
+    hot_cache_ttl: float = 300.0
+    # Seconds an entry is served without a storage check; bounds staleness after deletes
+    # or re-uploads handled by other workers (0 checks on every hit)
+    hot_cache_revalidate_interval: float = 1.0
+
+    # --- DOCUMENT CACHE ---
+    # Parsed PDFs kept open per worker so paging skips the storage fetch and the parse
+    document_cache_size: int = 16
+    # Upper bound on the summed source size of cached documents
+    document_cache_max_bytes: int = 256 * 1024 * 1024
 
     # --- SMART PRESETS ---
     # Predefined transformation aliases
@@ -94,6 +181,47 @@ class Settings(BaseSettings):
         "preview": {"width": 400, "format": "png", "quality": 80},
     }
 
+    # --- BATCH ---
+    # Maximum transforms in one POST /assets/batch request
+    batch_max_items: int = 200
+    # Misses of one batch rendered at once (the worker pool still bounds the total)
+    batch_concurrency: int = 8
+
+    # --- EAGER RENDERING ---
+    # Presets rendered in the background right after upload, smallest first (empty disables it)
+    eager_presets: List[str] = []
+    # Persistent job queue, defaults to {storage_path}/render-queue.db
+    eager_queue_path: Optional[str] = None
+    # Background renders running at once per worker (kept low so on-demand misses come first)
+    eager_workers: int = 1
+    # Seconds between queue polls when idle (picks up jobs enqueued by other workers)
+    eager_poll_interval: float = 1.0
+    # Attempts per job before it is marked failed
+    eager_max_attempts: int = 3
+    # Seconds before a failed job is retried, doubled on each further attempt
+    eager_retry_backoff: float = 5.0
+    # Seconds a claimed job is reserved for its worker (renewed while it renders); jobs of
+    # crashed or restarted workers are picked up by others once their lease expires
+    eager_lease: float = 60.0
+    # Seconds done and failed jobs are kept for status queries before they are purged
+    eager_retention: float = 86400.0
+
+    # --- OBSERVABILITY ---
+    # Expose per-process Prometheus metrics at /metrics (they reveal routes and traffic, so opt-in)
+    metrics_enabled: bool = False
+    # Bearer token the operational endpoints (/metrics, /cache/stats) require when set
+    ops_token: Optional[str] = None
+    # Add a Server-Timing header (lookup, fetch, render, store) to asset responses
+    server_timing_enabled: bool = True
+    # Storage prefix for profiles captured with a signed ?profile= token (never listed by /assets/list)
+    diagnostics_prefix: str = "diagnostics"
+    # Longest accepted profile token lifetime, in seconds
+    profile_token_max_lifetime: int = 3600
+    # Profile captures per worker and minute; further profiled requests get a 429
+    profile_max_per_minute: int = 10
+    # Captures kept per asset; older ones are deleted after each new capture
+    profile_retention: int = 5
+
     # --- ENVIRONMENT CONFIG ---
     model_config = SettingsConfigDict(
         env_prefix="MORPHOSX_",
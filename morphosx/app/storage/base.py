@@ -1,14 +1,58 @@
+import functools
+import inspect
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, List, Optional
 
+from morphosx.app.core.metrics import STORAGE_SECONDS
 from morphosx.app.storage.models import AssetMetadata
 
+# Default read size for streamed responses
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Backend operations timed in the storage latency histogram
+TIMED_OPERATIONS = ("get_asset", "save_asset", "save_stream", "stat", "delete_asset", "move_asset", "list_assets")
+
+
+def _timed(method, operation: str):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            STORAGE_SECONDS.observe(time.perf_counter() - start, backend=type(self).__name__, operation=operation)
+
+    return wrapper
+
 
 class BaseStorage(ABC):
     """
     Abstract base class for storage providers.
+
+    Operations implemented by a backend are timed automatically (per backend
+    and operation) for the metrics endpoint.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for operation in TIMED_OPERATIONS:
+            method = cls.__dict__.get(operation)
+            if method is not None and inspect.iscoroutinefunction(method):
+                setattr(cls, operation, _timed(method, operation))
+
+    async def startup(self) -> None:
+        """
+        Open long-lived resources (clients, connection pools). Called from the app lifespan.
+        """
+        pass
+
+    async def shutdown(self) -> None:
+        """
+        Release resources opened in startup().
+        """
+        pass
+
     @abstractmethod
     async def get_asset(self, asset_id: str) -> bytes:
         pass
@@ -17,6 +61,71 @@ class BaseStorage(ABC):
     async def save_asset(self, asset_id: str, data: bytes) -> str:
         pass
 
+    @abstractmethod
+    async def save_stream(self, asset_id: str, stream: AsyncIterator[bytes]) -> AssetMetadata:
+        """
+        Store an asset from an async stream of chunks, in bounded memory.
+
+        Size and SHA-256 are computed on the fly while the data is written.
+
+        :param asset_id: Destination path.
+        :param stream: Async iterator of byte chunks.
+        :return: AssetMetadata with size and checksum filled in.
+        """
+        pass
+
+    @abstractmethod
+    async def stat(self, asset_id: str) -> AssetMetadata:
+        """
+        Return size and modification time of a single asset without reading it.
+
+        :param asset_id: The asset path.
+        :return: AssetMetadata for the object.
+        :raises FileNotFoundError: If the asset does not exist.
+        """
+        pass
+
+    @abstractmethod
+    def open_stream(
+        self,
+        asset_id: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        offset: int = 0,
+        length: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream an asset in chunks so memory stays flat regardless of its size.
+
+        Only the requested byte range is read from the backend, so serving a
+        Range request on a large file does not transfer the rest of it.
+
+        :param asset_id: The asset path.
+        :param chunk_size: Maximum bytes per yielded chunk.
+        :param offset: First byte to read.
+        :param length: Number of bytes to read (None reads to the end).
+        :return: An async iterator of byte chunks.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_asset(self, asset_id: str) -> None:
+        """
+        Remove a single asset. Deleting a missing asset is not an error.
+
+        :param asset_id: The asset path.
+        """
+        pass
+
+    async def move_asset(self, source_id: str, destination_id: str) -> None:
+        """
+        Move an asset to a new path. The default copies through a stream, then deletes.
+
+        :param source_id: Current asset path.
+        :param destination_id: New asset path (overwritten if present).
+        """
+        await self.save_stream(destination_id, self.open_stream(source_id))
+        await self.delete_asset(source_id)
+
     @abstractmethod
     async def list_assets(self, prefix: str) -> List[AssetMetadata]:
         """
@@ -26,3 +135,32 @@ class BaseStorage(ABC):
         :return: A list of AssetMetadata objects.
         """
         pass
+
+    async def get_source_uri(self, asset_id: str) -> Optional[str]:
+        """
+        Return a local path or URL external tools (e.g. ffmpeg) can read the asset from.
+
+        Lets engines stream and seek in large originals instead of copying them
+        through Python memory. The default returns None (no direct access).
+
+        :param asset_id: The asset path.
+        :return: A filesystem path, a presigned URL, or None.
+        :raises FileNotFoundError: If the asset does not exist.
+        """
+        return None
+
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        """
+        Try to take a cross-worker lock. The default is a no-op that always succeeds.
+
+        :param key: Lock identity (e.g. a derivative id).
+        :param ttl: Seconds after which a held lock is considered stale.
+        :return: True if the lock was acquired.
+        """
+        return True
+
+    async def release_lock(self, key: str) -> None:
+        """
+        Release a lock taken with acquire_lock().
+        """
+        pass
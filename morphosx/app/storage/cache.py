@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from morphosx.app.storage.base import BaseStorage
+
+logger = logging.getLogger("morphosx.cache")
+
+EVICTION_POLICIES = {
+    # Least recently used first
+    "lru": "last_access ASC",
+    # Least frequently used first, oldest access breaking ties
+    "lfu": "hits ASC, last_access ASC",
+}
+
+
+class DerivativeCache:
+    """
+    Size accounting and eviction for derivatives stored under cache/.
+
+    Every stored derivative is recorded in a local SQLite index with its size,
+    last access time and hit count. HITs are buffered in memory and written in
+    batches, so serving a cached file never waits on a database write. A
+    background task flushes the buffer and, when the byte budget is exceeded,
+    deletes the least valuable derivatives until usage drops below the target.
+    """
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        index_path: str,
+        max_bytes: int = 0,
+        policy: str = "lru",
+        eviction_interval: float = 60.0,
+        eviction_target: float = 0.9,
+    ):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {sorted(EVICTION_POLICIES)}")
+
+        self.storage = storage
+        self.index_path = index_path
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.eviction_interval = eviction_interval
+        self.eviction_target = eviction_target
+
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        # derivative_id -> (last_access, new_hits, size)
+        self._pending: Dict[str, Tuple[float, int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def startup(self):
+        """Open the index and start the background eviction task."""
+        await asyncio.to_thread(self._open)
+        if self._task is None:
+            self._task = asyncio.create_task(self._eviction_loop())
+
+    async def shutdown(self):
+        """Stop the eviction task, persist buffered hits and close the index."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            await self.flush()
+            with self._db_lock:
+                self._conn.close()
+                self._conn = None
+
+    def record_hit(self, derivative_id: str, size: int):
+        """
+        Note a cache HIT. Buffered in memory until the next flush.
+
+        :param derivative_id: The derivative path.
+        :param size: Its size in bytes (adopts derivatives the index does not know yet).
+        """
+        self.hits += 1
+        _, new_hits, _ = self._pending.get(derivative_id, (0.0, 0, size))
+        self._pending[derivative_id] = (time.time(), new_hits + 1, size)
+
+    async def record_store(self, derivative_id: str, size: int):
+        """Note a newly written derivative."""
+        self.stores += 1
+        now = time.time()
+        await self._run(
+            self._upsert,
+            [(derivative_id, size, now, now, 0)],
+            "size = excluded.size, last_access = excluded.last_access",
+        )
+
+    async def forget(self, derivative_ids: List[str]):
+        """Drop index entries for derivatives deleted outside the cache manager."""
+        for derivative_id in derivative_ids:
+            self._pending.pop(derivative_id, None)
+        await self._run(self._delete_rows, derivative_ids)
+
+    async def flush(self):
+        """Write buffered HITs to the index."""
+        pending, self._pending = self._pending, {}
+        if pending:
+            rows = [(key, size, last, last, hits) for key, (last, hits, size) in pending.items()]
+            await self._run(
+                self._upsert,
+                rows,
+                "last_access = MAX(last_access, excluded.last_access), hits = hits + excluded.hits",
+            )
+
+    async def evict(self) -> int:
+        """
+        Delete derivatives until usage is back under the budget target.
+
+        :return: Number of derivatives evicted.
+        """
+        await self.flush()
+        if self.max_bytes <= 0:
+            return 0
+
+        victims = await self._run(self._select_victims, int(self.max_bytes * self.eviction_target))
+        for derivative_id in victims:
+            await self.storage.delete_asset(derivative_id)
+        await self._run(self._delete_rows, victims)
+        self.evictions += len(victims)
+        return len(victims)
+
+    async def stats(self) -> Dict[str, object]:
+        """Occupancy and activity counters."""
+        await self.flush()
+        entries, total = await self._run(self._totals)
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "utilization": round(total / self.max_bytes, 4) if self.max_bytes else None,
+            "policy": self.policy,
+            "hits": self.hits,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    async def _eviction_loop(self):
+        while True:
+            await asyncio.sleep(self.eviction_interval)
+            try:
+                await self.evict()
+            except Exception:
+                # A failed pass (e.g. storage hiccup) is retried on the next tick
+                logger.exception("Derivative cache eviction pass failed")
+
+    async def _run(self, func, *args):
+        if self._conn is None:
+            await asyncio.to_thread(self._open)
+        return await asyncio.to_thread(func, *args)
+
+    def _open(self):
+        with self._db_lock:
+            if self._conn is not None:
+                return
+            Path(self.index_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.index_path, check_same_thread=False, isolation_level=None)
+            # WAL lets several uvicorn workers share the index without blocking readers
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS derivatives ("
+                "id TEXT PRIMARY KEY, size INTEGER NOT NULL, created REAL NOT NULL, "
+                "last_access REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn = conn
+
+    def _upsert(self, rows: List[Tuple[str, int, float, float, int]], on_conflict: str):
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT INTO derivatives (id, size, created, last_access, hits) VALUES (?, ?, ?, ?, ?) "
+                f"ON CONFLICT(id) DO UPDATE SET {on_conflict}",
+                rows,
+            )
+
+    def _delete_rows(self, derivative_ids: List[str]):
+        with self._db_lock:
+            self._conn.executemany("DELETE FROM derivatives WHERE id = ?", [(i,) for i in derivative_ids])
+
+    def _totals(self) -> Tuple[int, int]:
+        with self._db_lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM derivatives").fetchone()
+        return entries, total
+
+    def _select_victims(self, target_bytes: int) -> List[str]:
+        _, total = self._totals()
+        if total <= self.max_bytes:
+            return []
+
+        victims = []
+        with self._db_lock:
+            cursor = self._conn.execute(f"SELECT id, size FROM derivatives ORDER BY {EVICTION_POLICIES[self.policy]}")
+            for derivative_id, size in cursor:
+                if total <= target_bytes:
+                    break
+                victims.append(derivative_id)
+                total -= size
+        return victims
@@ -0,0 +1,128 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+
+from morphosx.app.storage.base import BaseStorage
+from morphosx.app.storage.models import AssetMetadata
+
+# Top-level folders owned by the content store, never addressed by asset ids
+INTERNAL_PREFIXES = ("blobs", "refs", "tmp")
+
+
+class ContentStore:
+    """
+    Content-addressed layout for originals, on top of any storage backend.
+
+    Each distinct file is stored once, under blobs/ by its SHA-256. An asset id
+    is a small reference object under refs/ that holds the digest. Every
+    reference also leaves a marker next to its blob, so the blob is deleted
+    only when its last reference goes away.
+    """
+
+    def __init__(self, storage: BaseStorage, lock_ttl: float = 60.0, poll_interval: float = 0.1):
+        self.storage = storage
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+
+    @staticmethod
+    def blob_id(digest: str) -> str:
+        """Storage path of the blob with this SHA-256 (sharded by the first byte)."""
+        return f"blobs/{digest[:2]}/{digest}"
+
+    @staticmethod
+    def ref_id(asset_id: str) -> str:
+        """Storage path of the reference object for an asset id."""
+        return f"refs/{asset_id}"
+
+    def _markers_prefix(self, digest: str) -> str:
+        return f"{self.blob_id(digest)}.refs"
+
+    def _marker_id(self, digest: str, asset_id: str) -> str:
+        return f"{self._markers_prefix(digest)}/{quote(asset_id, safe='')}"
+
+    async def save_stream(self, asset_id: str, stream: AsyncIterator[bytes]) -> Tuple[AssetMetadata, bool]:
+        """
+        Store an upload under its content hash and point `asset_id` at it.
+
+        The stream is staged once (the digest is computed while writing). If a
+        blob with that digest already exists, the staged copy is dropped.
+
+        :param asset_id: Reference to create (e.g. 'originals/{uuid}.jpg').
+        :param stream: Async iterator of byte chunks.
+        :return: (metadata, deduplicated) where deduplicated is True if the blob already existed.
+        """
+        staging_id = f"tmp/{uuid.uuid4().hex}"
+        staged = await self.storage.save_stream(staging_id, stream)
+        digest = staged.checksum
+
+        try:
+            async with self._blob_lock(digest):
+                await self.storage.save_asset(self._marker_id(digest, asset_id), b"")
+                try:
+                    await self.storage.stat(self.blob_id(digest))
+                    deduplicated = True
+                except FileNotFoundError:
+                    await self.storage.move_asset(staging_id, self.blob_id(digest))
+                    deduplicated = False
+            await self.storage.save_asset(self.ref_id(asset_id), digest.encode())
+        finally:
+            # No-op once the staged copy has become the blob
+            await self.storage.delete_asset(staging_id)
+
+        metadata = AssetMetadata(
+            name=asset_id.split("/")[-1],
+            path=asset_id,
+            is_dir=False,
+            size=staged.size,
+            modified=staged.modified,
+            checksum=digest,
+        )
+        return metadata, deduplicated
+
+    async def resolve(self, asset_id: str) -> Optional[str]:
+        """
+        Return the SHA-256 an asset id points to, or None if it is not a reference.
+        """
+        try:
+            return (await self.storage.get_asset(self.ref_id(asset_id))).decode().strip()
+        except FileNotFoundError:
+            return None
+
+    async def reference_count(self, digest: str) -> int:
+        """Number of asset ids currently pointing at a blob."""
+        markers = await self.storage.list_assets(self._markers_prefix(digest))
+        return sum(1 for marker in markers if not marker.is_dir)
+
+    async def delete(self, asset_id: str) -> Tuple[str, int]:
+        """
+        Drop a reference, and its blob once nothing else points at it.
+
+        :param asset_id: Reference to delete.
+        :return: (digest, remaining) where remaining is the blob's reference count afterwards.
+        :raises FileNotFoundError: If the asset id is not a reference.
+        """
+        digest = await self.resolve(asset_id)
+        if digest is None:
+            raise FileNotFoundError(f"Asset '{asset_id}' not found")
+
+        async with self._blob_lock(digest):
+            await self.storage.delete_asset(self.ref_id(asset_id))
+            await self.storage.delete_asset(self._marker_id(digest, asset_id))
+            remaining = await self.reference_count(digest)
+            if remaining == 0:
+                await self.storage.delete_asset(self.blob_id(digest))
+        return digest, remaining
+
+    @asynccontextmanager
+    async def _blob_lock(self, digest: str):
+        # Uploads and deletes of the same blob are serialized (across workers when the
+        # backend supports locks), so a blob is never removed under a new reference
+        key = f"blobs/{digest}"
+        while not await self.storage.acquire_lock(key, self.lock_ttl):
+            await asyncio.sleep(self.poll_interval)
+        try:
+            yield
+        finally:
+            await self.storage.release_lock(key)
@@ -0,0 +1,149 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class HotCache:
+    """
+    Byte-bounded in-process LRU of small, popular derivatives.
+
+    Sits in front of storage so hot thumbnails are served from RAM with no
+    storage I/O. Admission is selective: only items up to `max_item_bytes` and
+    requested at least `min_requests` times get in, so one-off requests
+    cannot flush the working set. Entries expire after `ttl` seconds, and
+    callers re-check an entry against storage once it has gone unconfirmed
+    for `revalidate_after` seconds, which bounds staleness when another
+    worker deletes or replaces an asset.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_item_bytes: int = 256 * 1024,
+        min_requests: int = 2,
+        ttl: float = 300.0,
+        revalidate_after: float = 1.0,
+        max_tracked: int = 10_000,
+    ):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.min_requests = min_requests
+        self.ttl = ttl
+        self.revalidate_after = revalidate_after
+        self.max_tracked = max_tracked
+
+        self.hits = 0
+        self.misses = 0
+        self.admissions = 0
+        self.evictions = 0
+
+        # key -> (data, media_type, headers, derivative_id, checked_at, expires_at)
+        self._entries: "OrderedDict[str, Tuple[bytes, str, Dict[str, str], str, float, float]]" = OrderedDict()
+        # Request counts of candidates that have not been admitted yet
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str, Dict[str, str], str]]:
+        """
+        Return (data, media_type, headers, derivative_id) for a cached derivative, or None.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None or entry[5] < time.monotonic():
+            if entry is not None:
+                self.discard(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0], entry[1], entry[2], entry[3]
+
+    def needs_revalidation(self, key: str) -> bool:
+        """
+        True when the entry has not been confirmed against storage for `revalidate_after` seconds.
+        """
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry[4] >= self.revalidate_after
+
+    def confirm(self, key: str):
+        """Mark an entry as just checked against storage."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries[key] = (*entry[:4], time.monotonic(), entry[5])
+
+    def should_admit(self, key: str, size: int) -> bool:
+        """
+        Count a request for a derivative and decide whether to keep it in memory.
+
+        :param key: The derivative id.
+        :param size: Its size in bytes.
+        :return: True once the item is small enough and requested often enough.
+        """
+        if not self.enabled or size > self.max_item_bytes or size > self.max_bytes:
+            return False
+
+        count = self._seen.pop(key, 0) + 1
+        if count >= self.min_requests:
+            return True
+
+        self._seen[key] = count
+        while len(self._seen) > self.max_tracked:
+            self._seen.popitem(last=False)
+        return False
+
+    def put(
+        self,
+        key: str,
+        data: bytes,
+        media_type: str,
+        headers: Optional[Dict[str, str]] = None,
+        derivative_id: Optional[str] = None,
+    ):
+        """
+        Insert a derivative, evicting least recently used entries to fit.
+
+        :param headers: Response headers to replay with it (e.g. validators).
+        :param derivative_id: Storage path of the derivative, when it differs from the key.
+        """
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+
+        self.discard(key)
+        now = time.monotonic()
+        self._entries[key] = (data, media_type, dict(headers or {}), derivative_id or key, now, now + self.ttl)
+        self._bytes += len(data)
+        self.admissions += 1
+
+        while self._bytes > self.max_bytes:
+            _, (evicted, *_) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+        self._seen.pop(key, None)
+
+    def discard_prefix(self, prefix: str):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self.discard(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Occupancy and hit/miss counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "admissions": self.admissions,
+            "evictions": self.evictions,
+        }
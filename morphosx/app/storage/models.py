@@ -13,3 +13,7 @@ class AssetMetadata(BaseModel):
     is_dir: bool
     size: Optional[int] = None
     modified: Optional[float] = None
+    # Hex SHA-256 of the content, when known (e.g. computed while streaming an upload)
+    checksum: Optional[str] = None
+    # Backend-native entity tag of the stored object, when the backend keeps one (e.g. S3's content MD5)
+    etag: Optional[str] = None
@@ -1,14 +1,26 @@
-from typing import List, Optional
+import asyncio
+import hashlib
+import time
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, List, Optional
 
 import aioboto3
+from aiobotocore.config import AioConfig
+from botocore.exceptions import ClientError
 
-from morphosx.app.storage.base import BaseStorage
+from morphosx.app.storage.base import DEFAULT_CHUNK_SIZE, BaseStorage
 from morphosx.app.storage.models import AssetMetadata
 
+# Largest object a single CopyObject call accepts
+S3_MAX_COPY_SIZE = 5 * 1024 * 1024 * 1024
+
 
 class S3Storage(BaseStorage):
     """
     Amazon S3 (or S3-compatible) storage provider.
+
+    A single long-lived client (and its connection pool) is shared by all
+    requests. It is opened on application startup, or lazily on first use.
     """
 
     def __init__(
@@ -18,6 +30,13 @@ class S3Storage(BaseStorage):
         endpoint_url: Optional[str] = None,
         access_key_id: Optional[str] = None,
         secret_access_key: Optional[str] = None,
+        max_pool_connections: int = 50,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        max_attempts: int = 3,
+        keepalive_timeout: float = 60.0,
+        multipart_part_size: int = 8 * 1024 * 1024,
+        presign_expires: int = 900,
     ):
         self.bucket_name = bucket_name
         self.session = aioboto3.Session(
@@ -26,56 +45,269 @@ class S3Storage(BaseStorage):
             region_name=region_name,
         )
         self.endpoint_url = endpoint_url
+        self.config = AioConfig(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={"max_attempts": max_attempts, "mode": "standard"},
+            connector_args={"keepalive_timeout": keepalive_timeout},
+        )
+
+        # S3 requires every part but the last to be at least 5 MiB
+        self.multipart_part_size = max(multipart_part_size, 5 * 1024 * 1024)
+        self.presign_expires = presign_expires
+
+        self._client = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
+
+    async def startup(self) -> None:
+        await self._get_client()
+
+    async def shutdown(self) -> None:
+        async with self._client_lock:
+            if self._exit_stack is not None:
+                await self._exit_stack.aclose()
+            self._client = None
+            self._exit_stack = None
+
+    async def _get_client(self):
+        """
+        Return the shared client, creating it on first use.
+        """
+        if self._client is not None:
+            return self._client
+
+        async with self._client_lock:
+            if self._client is None:
+                exit_stack = AsyncExitStack()
+                self._client = await exit_stack.enter_async_context(
+                    self.session.client("s3", endpoint_url=self.endpoint_url, config=self.config)
+                )
+                self._exit_stack = exit_stack
+        return self._client
 
     async def get_asset(self, asset_id: str) -> bytes:
-        async with self.session.client("s3", endpoint_url=self.endpoint_url) as s3:
-            try:
-                response = await s3.get_object(Bucket=self.bucket_name, Key=asset_id)
-                async with response["Body"] as stream:
-                    return await stream.read()
-            except s3.exceptions.NoSuchKey:
+        s3 = await self._get_client()
+        try:
+            response = await s3.get_object(Bucket=self.bucket_name, Key=asset_id)
+            async with response["Body"] as stream:
+                return await stream.read()
+        except s3.exceptions.NoSuchKey:
+            raise FileNotFoundError(f"Asset '{asset_id}' not found in S3")
+        except Exception as e:
+            raise RuntimeError(f"S3 get failed: {str(e)}")
+
+    async def stat(self, asset_id: str) -> AssetMetadata:
+        s3 = await self._get_client()
+        try:
+            response = await s3.head_object(Bucket=self.bucket_name, Key=asset_id)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
                 raise FileNotFoundError(f"Asset '{asset_id}' not found in S3")
-            except Exception as e:
-                raise RuntimeError(f"S3 get failed: {str(e)}")
+            raise RuntimeError(f"S3 head failed: {str(e)}")
+        return AssetMetadata(
+            name=asset_id.split("/")[-1],
+            path=asset_id,
+            is_dir=False,
+            size=response["ContentLength"],
+            modified=response["LastModified"].timestamp(),
+            etag=response.get("ETag", "").strip('"') or None,
+        )
+
+    async def open_stream(
+        self,
+        asset_id: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        offset: int = 0,
+        length: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        s3 = await self._get_client()
+        kwargs = {}
+        if offset or length is not None:
+            # Ranged GET: S3 only sends the bytes asked for
+            end = "" if length is None else offset + length - 1
+            kwargs["Range"] = f"bytes={offset}-{end}"
+        try:
+            response = await s3.get_object(Bucket=self.bucket_name, Key=asset_id, **kwargs)
+        except s3.exceptions.NoSuchKey:
+            raise FileNotFoundError(f"Asset '{asset_id}' not found in S3")
+        body = response["Body"]
+        async with body:
+            async for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+
+    async def get_source_uri(self, asset_id: str) -> Optional[str]:
+        # Fail fast on missing originals: a presigned URL is generated even for absent keys
+        await self.stat(asset_id)
+
+        s3 = await self._get_client()
+        # Presigned GET: ffmpeg reads the object over HTTP(S) with range requests
+        return await s3.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket_name, "Key": asset_id},
+            ExpiresIn=self.presign_expires,
+        )
 
     async def save_asset(self, asset_id: str, data: bytes) -> str:
-        async with self.session.client("s3", endpoint_url=self.endpoint_url) as s3:
-            try:
-                await s3.put_object(Bucket=self.bucket_name, Key=asset_id, Body=data)
-                return asset_id
-            except Exception as e:
+        s3 = await self._get_client()
+        try:
+            await s3.put_object(Bucket=self.bucket_name, Key=asset_id, Body=data)
+            return asset_id
+        except Exception as e:
+            raise RuntimeError(f"S3 save failed: {str(e)}")
+
+    async def save_stream(self, asset_id: str, stream: AsyncIterator[bytes]) -> AssetMetadata:
+        s3 = await self._get_client()
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+
+        try:
+            async for chunk in stream:
+                digest.update(chunk)
+                size += len(chunk)
+                buffer.extend(chunk)
+
+                if len(buffer) >= self.multipart_part_size:
+                    if upload_id is None:
+                        response = await s3.create_multipart_upload(Bucket=self.bucket_name, Key=asset_id)
+                        upload_id = response["UploadId"]
+                    parts.append(await self._upload_part(s3, asset_id, upload_id, len(parts) + 1, bytes(buffer)))
+                    buffer.clear()
+
+            if upload_id is None:
+                # Small object: a single PUT is cheaper than a multipart round trip
+                await s3.put_object(Bucket=self.bucket_name, Key=asset_id, Body=bytes(buffer))
+            else:
+                if buffer:
+                    parts.append(await self._upload_part(s3, asset_id, upload_id, len(parts) + 1, bytes(buffer)))
+                await s3.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=asset_id,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException as e:
+            if upload_id is not None:
+                await s3.abort_multipart_upload(Bucket=self.bucket_name, Key=asset_id, UploadId=upload_id)
+            if isinstance(e, Exception):
                 raise RuntimeError(f"S3 save failed: {str(e)}")
+            raise
+
+        return AssetMetadata(
+            name=asset_id.split("/")[-1],
+            path=asset_id,
+            is_dir=False,
+            size=size,
+            modified=time.time(),
+            checksum=digest.hexdigest(),
+        )
+
+    async def _upload_part(self, s3, asset_id: str, upload_id: str, part_number: int, data: bytes) -> dict:
+        response = await s3.upload_part(
+            Bucket=self.bucket_name,
+            Key=asset_id,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    async def delete_asset(self, asset_id: str) -> None:
+        s3 = await self._get_client()
+        try:
+            await s3.delete_object(Bucket=self.bucket_name, Key=asset_id)
+        except Exception as e:
+            raise RuntimeError(f"S3 delete failed: {str(e)}")
+
+    async def move_asset(self, source_id: str, destination_id: str) -> None:
+        source = await self.stat(source_id)
+        if source.size > S3_MAX_COPY_SIZE:
+            # CopyObject is limited to 5 GiB: stream it through instead
+            return await super().move_asset(source_id, destination_id)
+
+        s3 = await self._get_client()
+        try:
+            # Server-side copy: the data never leaves S3
+            await s3.copy_object(
+                Bucket=self.bucket_name,
+                Key=destination_id,
+                CopySource={"Bucket": self.bucket_name, "Key": source_id},
+            )
+        except Exception as e:
+            raise RuntimeError(f"S3 move failed: {str(e)}")
+        await self.delete_asset(source_id)
 
     async def list_assets(self, prefix: str) -> List[AssetMetadata]:
         if prefix and not prefix.endswith("/"):
             prefix += "/"
 
-        async with self.session.client("s3", endpoint_url=self.endpoint_url) as s3:
-            try:
-                paginator = s3.get_paginator("list_objects_v2")
-                results = []
-
-                async for page in paginator.paginate(
-                    Bucket=self.bucket_name, Prefix=prefix, Delimiter="/"
-                ):
-                    for folder in page.get("CommonPrefixes", []):
-                        name = folder["Prefix"].strip("/").split("/")[-1]
-                        results.append(
-                            AssetMetadata(name=name, path=folder["Prefix"], is_dir=True)
-                        )
+        s3 = await self._get_client()
+        try:
+            paginator = s3.get_paginator("list_objects_v2")
+            results = []
+
+            async for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix, Delimiter="/"):
+                for folder in page.get("CommonPrefixes", []):
+                    name = folder["Prefix"].strip("/").split("/")[-1]
+                    results.append(AssetMetadata(name=name, path=folder["Prefix"], is_dir=True))
 
-                    for obj in page.get("Contents", []):
-                        if obj["Key"] == prefix:
-                            continue
-                        results.append(
-                            AssetMetadata(
-                                name=obj["Key"].split("/")[-1],
-                                path=obj["Key"],
-                                is_dir=False,
-                                size=obj["Size"],
-                                modified=obj["LastModified"].timestamp(),
-                            )
+                for obj in page.get("Contents", []):
+                    if obj["Key"] == prefix:
+                        continue
+                    results.append(
+                        AssetMetadata(
+                            name=obj["Key"].split("/")[-1],
+                            path=obj["Key"],
+                            is_dir=False,
+                            size=obj["Size"],
+                            modified=obj["LastModified"].timestamp(),
+                            etag=obj.get("ETag", "").strip('"') or None,
                         )
-                return results
-            except Exception as e:
-                raise RuntimeError(f"S3 list failed: {str(e)}")
+                    )
+            return results
+        except Exception as e:
+            raise RuntimeError(f"S3 list failed: {str(e)}")
+
+    async def acquire_lock(self, key: str, ttl: float) -> bool:
+        lock_key = f"locks/{key}"
+        s3 = await self._get_client()
+        for _ in range(2):
+            try:
+                # Conditional put: only succeeds if no marker exists yet
+                await s3.put_object(
+                    Bucket=self.bucket_name,
+                    Key=lock_key,
+                    Body=str(time.time() + ttl).encode(),
+                    IfNoneMatch="*",
+                )
+                return True
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in ("PreconditionFailed", "ConditionalRequestConflict"):
+                    raise RuntimeError(f"S3 lock failed: {str(e)}")
+
+            try:
+                response = await s3.get_object(Bucket=self.bucket_name, Key=lock_key)
+                async with response["Body"] as stream:
+                    expires_at = float(await stream.read())
+            except s3.exceptions.NoSuchKey:
+                continue
+            except ValueError:
+                expires_at = 0.0
+
+            if time.time() < expires_at:
+                return False
+            # Stale marker left behind by a crashed worker
+            await s3.delete_object(Bucket=self.bucket_name, Key=lock_key)
+        return False
+
+    async def release_lock(self, key: str) -> None:
+        s3 = await self._get_client()
+        try:
+            await s3.delete_object(Bucket=self.bucket_name, Key=f"locks/{key}")
+        except Exception as e:
+            raise RuntimeError(f"S3 unlock failed: {str(e)}")
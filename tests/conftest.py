@@ -74,3 +74,30 @@ def real_docx():
 def real_ifc():
     with open("tests/assets/Ifc4_SampleHouse.ifc", "rb") as f:
         return f.read()
+
+
+@pytest.fixture
+def moto_s3():
+    """Starts a local moto S3 server and yields (endpoint_url, bucket)."""
+    try:
+        import boto3
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        pytest.skip("moto[server] not installed")
+
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint_url = f"http://{host}:{port}"
+
+    bucket = "morphosx-test"
+    boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    ).create_bucket(Bucket=bucket)
+
+    yield endpoint_url, bucket
+    server.stop()
@@ -0,0 +1,570 @@
+import io
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from morphosx.app.api import assets
+from morphosx.app.core.queue import RenderQueue
+from morphosx.app.core.security import generate_signature
+from morphosx.app.engine.base import ProcessorRegistry
+from morphosx.app.main import create_app
+from morphosx.app.settings import settings
+from morphosx.app.storage.hot import HotCache
+from morphosx.app.storage.local import LocalStorage
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Points the assets router at an isolated LocalStorage."""
+    local = LocalStorage(base_directory=str(tmp_path))
+    monkeypatch.setattr(assets, "storage", local)
+    return local
+
+
+@pytest.fixture
+def registry(monkeypatch, core_processor):
+    """Uses the Pillow engine so the tests do not depend on libvips."""
+    pillow_registry = ProcessorRegistry()
+    pillow_registry.set_default(core_processor)
+    monkeypatch.setattr(assets, "processor_registry", pillow_registry)
+    return pillow_registry
+
+
+@pytest.fixture
+def hot_cache(monkeypatch):
+    """A fresh in-memory tier per test."""
+    cache = HotCache()
+    monkeypatch.setattr(assets, "hot_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def client(storage, registry, hot_cache):
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+def signed_url(asset_id: str, width=None, height=None, fmt="webp", quality=80) -> str:
+    sig = generate_signature(asset_id, width, height, fmt, quality, settings.secret_key)
+    url = f"{settings.api_prefix}/assets/{asset_id}?format={fmt.upper()}&quality={quality}&signature={sig}"
+    if width:
+        url += f"&width={width}"
+    if height:
+        url += f"&height={height}"
+    return url
+
+
+@pytest.mark.asyncio
+async def test_get_asset_miss_then_streamed_hit(client, storage, sample_image):
+    """A miss renders and stores the derivative; the next request streams it back."""
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    url = signed_url("photo.jpg", width=50)
+
+    miss = client.get(url)
+    assert miss.status_code == 200
+    assert miss.headers["X-MorphosX-Cache"] == "MISS"
+
+    hit = client.get(url)
+    assert hit.status_code == 200
+    assert hit.headers["X-MorphosX-Cache"] == "HIT"
+    assert hit.headers["Content-Length"] == str(len(miss.content))
+    assert hit.content == miss.content
+    assert Image.open(io.BytesIO(hit.content)).width == 50
+
+
+def test_get_asset_not_found(client):
+    """Missing originals return 404."""
+    response = client.get(signed_url("missing.jpg", width=50))
+    assert response.status_code == 404
+
+
+def test_get_asset_invalid_signature(client):
+    """Tampered signatures are rejected before any storage access."""
+    response = client.get(f"{settings.api_prefix}/assets/photo.jpg?width=50&signature=deadbeef")
+    assert response.status_code == 403
+
+
+def test_upload_asset_streams_into_storage(client, storage, sample_image):
+    """Uploads report the streamed size and land under originals/."""
+    response = client.post(
+        f"{settings.api_prefix}/assets/upload",
+        files={"file": ("photo.jpg", sample_image, "image/jpeg")},
+    )
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["size"] == len(sample_image)
+    assert (storage.base_dir / "originals" / body["asset_id"]).read_bytes() == sample_image
+
+
+def delete_url(asset_id: str) -> str:
+    sig = generate_signature(asset_id, None, None, "delete", 0, settings.secret_key)
+    return f"{settings.api_prefix}/assets/{asset_id}?signature={sig}"
+
+
+@pytest.mark.asyncio
+async def test_delete_asset_removes_original_and_derivatives(client, storage, sample_image):
+    """Deleting an asset drops the original and every cached derivative."""
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    assert client.get(signed_url("photo.jpg", width=50)).status_code == 200
+
+    assert client.delete(f"{settings.api_prefix}/assets/photo.jpg?signature=deadbeef").status_code == 403
+    response = client.delete(delete_url("photo.jpg"))
+    assert response.status_code == 200
+    assert await storage.list_assets("cache/photo.jpg") == []
+    assert client.get(signed_url("photo.jpg", width=50)).status_code == 404
+    assert client.delete(delete_url("photo.jpg")).status_code == 404
+
+
+def test_content_addressed_uploads_share_derivatives(client, storage, sample_image, monkeypatch):
+    """Duplicate uploads are stored once and rendered once; deletes are reference counted."""
+    monkeypatch.setattr(settings, "content_addressed_storage", True)
+
+    def upload():
+        return client.post(
+            f"{settings.api_prefix}/assets/upload",
+            files={"file": ("photo.jpg", sample_image, "image/jpeg")},
+        ).json()
+
+    first, second = upload(), upload()
+    assert first["asset_id"] != second["asset_id"]
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert first["checksum"] == second["checksum"]
+
+    assert client.get(signed_url(first["asset_id"], width=50)).headers["X-MorphosX-Cache"] == "MISS"
+    assert client.get(signed_url(second["asset_id"], width=50)).headers["X-MorphosX-Cache"] == "HIT"
+
+    listing = client.get(f"{settings.api_prefix}/assets/list/originals").json()
+    assert {item["path"] for item in listing["items"]} == {
+        f"originals/{first['asset_id']}",
+        f"originals/{second['asset_id']}",
+    }
+
+    assert client.delete(delete_url(first["asset_id"])).json()["references"] == 1
+    assert client.get(signed_url(second["asset_id"], width=50)).status_code == 200
+
+    assert client.delete(delete_url(second["asset_id"])).json()["references"] == 0
+    assert not any(p.is_file() for p in (storage.base_dir / "blobs").rglob("*"))
+    assert not any(p.is_file() for p in (storage.base_dir / "cache").rglob("*"))
+
+
+def test_content_addressed_listing_keeps_user_folders_private(client, sample_image, monkeypatch):
+    """Private references cannot be listed through refs/, and the store's internal folders are hidden."""
+    from morphosx.app.core.auth import create_access_token
+
+    monkeypatch.setattr(settings, "content_addressed_storage", True)
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': 'bob'})}"}
+    asset_id = client.post(
+        f"{settings.api_prefix}/assets/upload?private=true",
+        files={"file": ("photo.jpg", sample_image, "image/jpeg")},
+        headers=alice,
+    ).json()["asset_id"]
+    assert asset_id.startswith("users/alice/")
+
+    own = client.get(f"{settings.api_prefix}/assets/list/refs/users/alice", headers=alice).json()
+    assert [item["path"] for item in own["items"]] == [asset_id]
+    for path in ("refs/users/alice", "users/bob/../alice", "refs%2Fusers%2Falice"):
+        assert client.get(f"{settings.api_prefix}/assets/list/{path}", headers=bob).status_code == 403
+    for path in ("blobs", "tmp", "refs/refs/users/alice"):
+        assert client.get(f"{settings.api_prefix}/assets/list/{path}", headers=alice).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_cache_index_tracks_requests(client, storage, sample_image, monkeypatch, tmp_path):
+    """MISS and HIT are recorded in the derivative index and reported by the stats endpoint."""
+    from morphosx.app.storage.cache import DerivativeCache
+
+    cache = DerivativeCache(storage, index_path=str(tmp_path / "index.db"), max_bytes=10_000_000)
+    monkeypatch.setattr(assets, "derivative_cache", cache)
+    monkeypatch.setattr(settings, "cache_stats_enabled", True)
+
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    miss = client.get(signed_url("photo.jpg", width=50))
+    client.get(signed_url("photo.jpg", width=50))
+
+    stats = client.get(f"{settings.api_prefix}/cache/stats").json()
+    assert stats["enabled"] is True
+    assert (stats["entries"], stats["bytes"]) == (1, len(miss.content))
+    assert (stats["hits"], stats["stores"]) == (1, 1)
+
+    client.delete(delete_url("photo.jpg"))
+    assert client.get(f"{settings.api_prefix}/cache/stats").json()["entries"] == 0
+    await cache.shutdown()
+
+
+def test_cache_stats_disabled(client, monkeypatch):
+    monkeypatch.setattr(settings, "cache_stats_enabled", True)
+    stats = client.get(f"{settings.api_prefix}/cache/stats").json()
+    assert stats["enabled"] is False
+    assert stats["memory"]["entries"] == 0
+
+
+def test_cache_stats_is_opt_in_and_token_protected(client, monkeypatch):
+    """/cache/stats is hidden by default; with OPS_TOKEN set it requires the bearer token."""
+    url = f"{settings.api_prefix}/cache/stats"
+    assert client.get(url).status_code == 404
+
+    monkeypatch.setattr(settings, "cache_stats_enabled", True)
+    monkeypatch.setattr(settings, "ops_token", "scraper-secret")
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers={"Authorization": "Bearer scraper-secret"}).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_hot_cache_serves_repeat_requests_from_memory(client, storage, hot_cache, sample_image, monkeypatch):
+    """The second request admits a small derivative; later ones never touch storage."""
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    url = signed_url("photo.jpg", width=50)
+
+    miss = client.get(url)
+    assert hot_cache.stats()["entries"] == 0
+    client.get(url)
+    assert hot_cache.stats()["entries"] == 1
+
+    async def no_storage(*args, **kwargs):
+        raise AssertionError("storage accessed")
+
+    monkeypatch.setattr(storage, "stat", no_storage)
+    monkeypatch.setattr(storage, "get_asset", no_storage)
+
+    hit = client.get(url)
+    assert hit.status_code == 200
+    assert hit.headers["X-MorphosX-Cache"] == "HIT"
+    assert hit.content == miss.content
+    assert hot_cache.stats()["hits"] == 1
+
+
+def test_hot_cache_admission_rules():
+    """Items are admitted only when small enough and requested often enough; LRU keeps the byte bound."""
+    cache = HotCache(max_bytes=100, max_item_bytes=60, min_requests=2)
+
+    assert cache.should_admit("big", 61) is False
+    assert cache.should_admit("a", 50) is False
+    assert cache.should_admit("a", 50) is True
+    cache.put("a", b"a" * 50, "image/webp")
+    cache.put("b", b"b" * 50, "image/webp")
+    cache.get("a")
+    cache.put("c", b"c" * 50, "image/webp")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == (b"a" * 50, "image/webp", {}, "a")
+    assert cache.stats()["bytes"] == 100
+
+    cache.discard_prefix("a")
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_hot_cache_hits_refresh_the_derivative_index(
+    client, storage, hot_cache, sample_image, monkeypatch, tmp_path
+):
+    """Memory-tier hits are recorded too, so eviction does not pick the hottest derivatives first."""
+    from morphosx.app.storage.cache import DerivativeCache
+
+    cache = DerivativeCache(storage, index_path=str(tmp_path / "index.db"))
+    monkeypatch.setattr(assets, "derivative_cache", cache)
+
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    url = signed_url("photo.jpg", width=50)
+    for _ in range(3):
+        client.get(url)
+
+    assert hot_cache.stats()["hits"] == 1
+    assert cache.hits == 2
+    await cache.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hot_cache_drops_entries_deleted_by_other_workers(client, storage, sample_image, monkeypatch):
+    """Once due for revalidation, an entry whose derivative is gone from storage is not served."""
+    cache = HotCache(revalidate_after=0)
+    monkeypatch.setattr(assets, "hot_cache", cache)
+
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    url = signed_url("photo.jpg", width=50)
+    client.get(url)
+    client.get(url)
+    assert cache.stats()["entries"] == 1
+
+    assert client.get(url).headers["X-MorphosX-Cache"] == "HIT"
+
+    # Another worker deletes the asset: this worker's memory tier is not told
+    await storage.delete_asset("originals/photo.jpg")
+    for derivative in await storage.list_assets("cache/photo.jpg"):
+        await storage.delete_asset(derivative.path)
+
+    assert client.get(url).status_code == 404
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_answers_304_without_reading_body(client, storage, sample_image, monkeypatch):
+    """Matching If-None-Match / If-Modified-Since get a 304 from the stat alone."""
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    url = signed_url("photo.jpg", width=50)
+
+    miss = client.get(url)
+    etag = miss.headers["ETag"]
+    assert etag.startswith('"') and miss.headers["Last-Modified"]
+
+    hit = client.get(url)
+    assert hit.headers["ETag"] == etag
+
+    # A stale tag takes precedence over a matching date
+    last_modified = miss.headers["Last-Modified"]
+    changed = client.get(url, headers={"If-None-Match": '"stale"', "If-Modified-Since": last_modified})
+    assert changed.status_code == 200
+    assert changed.content == miss.content
+
+    async def no_body(*args, **kwargs):
+        raise AssertionError("derivative body read")
+
+    monkeypatch.setattr(storage, "open_stream", no_body)
+    monkeypatch.setattr(storage, "get_asset", no_body)
+
+    revalidated = client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+
+    since = client.get(url, headers={"If-Modified-Since": last_modified})
+    assert since.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_from_memory_tier(client, storage, hot_cache, sample_image):
+    """Hot-tier entries keep their validators and revalidate without storage."""
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    url = signed_url("photo.jpg", width=50)
+
+    client.get(url)
+    etag = client.get(url).headers["ETag"]
+    assert hot_cache.stats()["entries"] == 1
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert hot_cache.stats()["hits"] == 1
+
+
+def original_url(asset_id: str) -> str:
+    sig = generate_signature(asset_id, None, None, "original", 0, settings.secret_key)
+    return f"{settings.api_prefix}/assets/original/{asset_id}?signature={sig}"
+
+
+@pytest.mark.asyncio
+async def test_derivative_evicted_after_stat_is_rendered_again(client, storage, sample_image, monkeypatch):
+    """A HIT whose file disappears before it is opened falls back to a render, never a broken body."""
+    # Streamed HITs only: the memory tier would read the file whole instead
+    monkeypatch.setattr(assets, "hot_cache", HotCache(max_bytes=0))
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    url = signed_url("photo.jpg", width=50)
+    rendered = client.get(url).content
+
+    open_stream = storage.open_stream
+
+    def evicting_open_stream(asset_id, *args, **kwargs):
+        (storage.base_dir / asset_id).unlink(missing_ok=True)
+        return open_stream(asset_id, *args, **kwargs)
+
+    monkeypatch.setattr(storage, "open_stream", evicting_open_stream)
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.headers["X-MorphosX-Cache"] == "MISS"
+    assert response.content == rendered
+
+    await storage.save_asset("originals/clip.mp4", b"x" * 100)
+    assert client.get(original_url("clip.mp4")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_original_download_with_ranges(client, storage, monkeypatch):
+    """Originals are served whole or as single/multi byte ranges read straight from storage."""
+    data = bytes(range(256)) * 4000
+    await storage.save_asset("originals/clip.mp4", data)
+    url = original_url("clip.mp4")
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.headers["Accept-Ranges"] == "bytes"
+    assert full.headers["Content-Type"] == "video/mp4"
+    assert full.content == data
+
+    reads = []
+    open_stream = storage.open_stream
+
+    def tracking_open_stream(asset_id, *args, **kwargs):
+        reads.append((kwargs.get("offset"), kwargs.get("length")))
+        return open_stream(asset_id, *args, **kwargs)
+
+    monkeypatch.setattr(storage, "open_stream", tracking_open_stream)
+
+    single = client.get(url, headers={"Range": "bytes=1000-1999"})
+    assert single.status_code == 206
+    assert single.headers["Content-Range"] == f"bytes 1000-1999/{len(data)}"
+    assert single.content == data[1000:2000]
+    assert reads == [(1000, 1000)]
+
+    multi = client.get(url, headers={"Range": "bytes=0-9,-10"})
+    assert multi.status_code == 206
+    assert multi.headers["Content-Type"].startswith("multipart/byteranges; boundary=")
+    assert int(multi.headers["Content-Length"]) == len(multi.content)
+    assert data[:10] in multi.content and data[-10:] in multi.content
+
+    unsatisfiable = client.get(url, headers={"Range": f"bytes={len(data)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["Content-Range"] == f"bytes */{len(data)}"
+
+    # A stale If-Range validator turns the request back into a full download
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert len(stale.content) == len(data)
+
+    fresh = client.get(url, headers={"Range": "bytes=0-9", "If-Range": full.headers["ETag"]})
+    assert fresh.status_code == 206
+
+
+def test_original_download_requires_its_own_signature(client):
+    sig = generate_signature("clip.mp4", None, None, "webp", 80, settings.secret_key)
+    response = client.get(f"{settings.api_prefix}/assets/original/clip.mp4?signature={sig}")
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_derivative_ranges_on_miss_and_hit(client, storage, sample_image):
+    """Range requests work on rendered, stored and in-memory derivatives alike."""
+    await storage.save_asset("originals/photo.jpg", sample_image)
+    url = signed_url("photo.jpg", width=50)
+
+    miss = client.get(url, headers={"Range": "bytes=0-15"})
+    assert miss.status_code == 206
+    assert miss.headers["X-MorphosX-Cache"] == "MISS"
+    whole = client.get(url).content
+    assert miss.content == whole[:16]
+
+    hit = client.get(url, headers={"Range": "bytes=-16"})
+    assert hit.status_code == 206
+    assert hit.headers["X-MorphosX-Cache"] == "HIT"
+    assert hit.content == whole[-16:]
+    assert hit.headers["Content-Range"] == f"bytes {len(whole) - 16}-{len(whole) - 1}/{len(whole)}"
+
+
+@pytest.fixture
+def render_queue(tmp_path, monkeypatch):
+    """Eager rendering of two presets, with a queue the app lifespan starts."""
+    monkeypatch.setattr(settings, "eager_presets", ["preview", "thumb", "unknown"])
+    queue = RenderQueue(str(tmp_path / "render-queue.db"), handler=assets._render_preset, poll_interval=0.05)
+    monkeypatch.setattr(assets, "render_queue", queue)
+    return queue
+
+
+def test_upload_renders_eager_presets_in_background(render_queue, client, sample_image, monkeypatch):
+    """Presets are rendered smallest first after upload, so the first view is a HIT."""
+    monkeypatch.setattr(settings, "cache_stats_enabled", True)
+    body = client.post(
+        f"{settings.api_prefix}/assets/upload",
+        files={"file": ("photo.jpg", sample_image, "image/jpeg")},
+    ).json()
+    assert body["renders"] == ["thumb", "preview"]
+
+    status_url = f"{settings.api_prefix}/assets/status/{body['asset_id']}"
+    deadline = time.monotonic() + 10
+    while not (status := client.get(status_url).json())["complete"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    assert status["done"] == status["total"] == 2
+    assert [render["preset"] for render in status["renders"]] == ["thumb", "preview"]
+
+    sig = generate_signature(body["asset_id"], None, None, "", 0, settings.secret_key, preset="thumb")
+    response = client.get(f"{settings.api_prefix}/assets/{body['asset_id']}?preset=thumb&signature={sig}")
+    assert response.headers["X-MorphosX-Cache"] == "HIT"
+    assert Image.open(io.BytesIO(response.content)).size == (150, 150)
+
+    stats = client.get(f"{settings.api_prefix}/cache/stats").json()
+    assert stats["queue"]["done"] == 2
+
+
+def batch_item(asset_id: str, width: int, fmt: str = "webp", quality: int = 80) -> dict:
+    sig = generate_signature(asset_id, width, None, fmt, quality, settings.secret_key)
+    return {"asset_id": asset_id, "width": width, "format": fmt.upper(), "quality": quality, "signature": sig}
+
+
+@pytest.mark.asyncio
+async def test_batch_manifest_renders_misses_and_reports_errors(client, storage, sample_image, monkeypatch):
+    """One listing per asset resolves HITs; misses render; bad items fail alone."""
+    await storage.save_asset("originals/a.jpg", sample_image)
+    await storage.save_asset("originals/b.jpg", sample_image)
+    client.get(signed_url("a.jpg", width=50))
+
+    listings = []
+    list_assets = storage.list_assets
+
+    async def counting_list_assets(prefix):
+        listings.append(prefix)
+        return await list_assets(prefix)
+
+    monkeypatch.setattr(storage, "list_assets", counting_list_assets)
+
+    tampered = {**batch_item("a.jpg", 70), "signature": "deadbeef"}
+    response = client.post(
+        f"{settings.api_prefix}/assets/batch",
+        json={
+            "items": [
+                batch_item("a.jpg", 50),
+                batch_item("a.jpg", 60),
+                batch_item("b.jpg", 50),
+                tampered,
+                batch_item("missing.jpg", 50),
+            ]
+        },
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+
+    assert [item["status"] for item in items] == [200, 200, 200, 403, 404]
+    assert [item.get("cache") for item in items[:3]] == ["HIT", "MISS", "MISS"]
+    assert sorted(listings) == ["cache/a.jpg", "cache/b.jpg", "cache/missing.jpg"]
+
+    # Manifest URLs are the regular signed GETs, now cache hits with the same ETag
+    hit = client.get(items[1]["url"])
+    assert hit.headers["X-MorphosX-Cache"] == "HIT"
+    assert hit.headers["ETag"] == items[1]["etag"]
+    assert int(hit.headers["Content-Length"]) == items[1]["size"]
+    assert Image.open(io.BytesIO(hit.content)).width == 60
+
+
+@pytest.mark.asyncio
+async def test_batch_multipart_streams_bodies_in_order(client, storage, sample_image):
+    await storage.save_asset("originals/a.jpg", sample_image)
+    client.get(signed_url("a.jpg", width=50))
+
+    response = client.post(
+        f"{settings.api_prefix}/assets/batch",
+        json={"items": [batch_item("a.jpg", 50), batch_item("a.jpg", 40, fmt="png")], "output": "multipart"},
+    )
+    assert response.status_code == 200
+    boundary = response.headers["Content-Type"].split("boundary=")[1]
+
+    parts = response.content.split(f"--{boundary}".encode())[1:-1]
+    assert len(parts) == 2
+    bodies = []
+    for part in parts:
+        head, body = part[2:-2].split(b"\r\n\r\n", 1)
+        headers = dict(line.split(": ", 1) for line in head.decode().split("\r\n"))
+        assert int(headers["Content-Length"]) == len(body)
+        bodies.append((headers, body))
+
+    assert bodies[0][0]["X-MorphosX-Cache"] == "HIT"
+    assert bodies[1][0]["X-MorphosX-Cache"] == "MISS"
+    assert bodies[1][0]["Content-Type"] == "image/png"
+    assert Image.open(io.BytesIO(bodies[0][1])).width == 50
+    assert Image.open(io.BytesIO(bodies[1][1])).width == 40
+
+
+def test_batch_rejects_oversized_requests(client):
+    items = [batch_item("a.jpg", 50)] * (settings.batch_max_items + 1)
+    assert client.post(f"{settings.api_prefix}/assets/batch", json={"items": items}).status_code == 422
@@ -0,0 +1,84 @@
+import json
+
+from morphosx.app.core.bench import (
+    BenchResult,
+    build_cases,
+    compare,
+    format_result,
+    load_report,
+    prepare_fixture,
+    run_benchmarks,
+    run_case,
+    save_report,
+)
+
+
+def test_fixtures_are_deterministic(tmp_path):
+    """Fixtures are regenerated byte for byte, so baselines stay comparable across machines."""
+    first = prepare_fixture("image", 1, tmp_path / "a").read_bytes()
+    second = prepare_fixture("image", 1, tmp_path / "b").read_bytes()
+    assert first == second
+
+
+def test_quick_run_measures_registered_engines(tmp_path):
+    """Each fixture goes through the engine its extension is registered to."""
+    cases = build_cases(fixtures=["image", "archive"], cores=["pil"], quick=True, fixtures_dir=tmp_path)
+    assert [case.name for case in cases] == ["image-1mp[pil]", "archive-100f[pil]"]
+
+    seen = []
+    results = run_benchmarks(cases, iterations=2, warmup=0, isolate=False, progress=seen.append)
+
+    assert seen == results
+    assert [result.engine for result in results] == ["ImageProcessor", "ArchiveProcessor"]
+    for result in results:
+        assert result.error is None
+        assert result.iterations == 2
+        assert result.ops_per_sec > 0
+        assert 0 < result.p50_ms <= result.p99_ms
+        assert result.input_bytes > 0
+
+
+def test_zero_iterations_report_no_latency(tmp_path):
+    """A run without timed iterations returns a result instead of dividing by zero."""
+    [case] = build_cases(fixtures=["archive"], cores=["pil"], quick=True, fixtures_dir=tmp_path)
+    result = run_case(case, iterations=0, warmup=0)
+
+    assert result.error is None
+    assert (result.iterations, result.ops_per_sec, result.p50_ms) == (0, None, None)
+    assert "no timed iterations" in format_result(result)
+
+
+def test_unavailable_fixtures_are_reported_not_raised(tmp_path, monkeypatch):
+    """A missing tool (ffmpeg) skips its cases with the reason."""
+    monkeypatch.setenv("PATH", str(tmp_path))
+    cases = build_cases(fixtures=["video"], cores=["pil"], quick=True, fixtures_dir=tmp_path)
+    [result] = run_benchmarks(cases, iterations=1, warmup=0)
+
+    assert result.p50_ms is None
+    assert "ffmpeg is not installed" in result.error
+
+
+def test_baseline_round_trip_and_regressions(tmp_path):
+    """Saved baselines load back; slower p50 or higher RSS beyond the threshold is flagged."""
+    baseline = [
+        BenchResult(case="image-1mp[pil]", fixture="image", size=1, core="pil", p50_ms=100.0, peak_rss_mb=100.0),
+        BenchResult(case="pdf-1p[pil]", fixture="pdf", size=1, core="pil", p50_ms=100.0, peak_rss_mb=100.0),
+        BenchResult(case="mesh-1280f[pil]", fixture="mesh", size=1280, core="pil", p50_ms=100.0, peak_rss_mb=100.0),
+    ]
+    path = tmp_path / "baseline.json"
+    save_report(baseline, path, iterations=5)
+    assert json.loads(path.read_text())["iterations"] == 5
+    assert load_report(path) == baseline
+
+    current = [
+        BenchResult(case="image-1mp[pil]", fixture="image", size=1, core="pil", p50_ms=110.0, peak_rss_mb=100.0),
+        BenchResult(case="pdf-1p[pil]", fixture="pdf", size=1, core="pil", p50_ms=150.0, peak_rss_mb=100.0),
+        BenchResult(case="mesh-1280f[pil]", fixture="mesh", size=1280, core="pil", p50_ms=90.0, peak_rss_mb=200.0),
+        BenchResult(case="new-case[pil]", fixture="image", size=2, core="pil", p50_ms=10.0),
+    ]
+    comparisons = {entry.case: entry for entry in compare(current, load_report(path), max_regression=0.2)}
+
+    assert set(comparisons) == {"image-1mp[pil]", "pdf-1p[pil]", "mesh-1280f[pil]"}
+    assert not comparisons["image-1mp[pil]"].regressed
+    assert comparisons["pdf-1p[pil]"].notes == ["p50 +50%"]
+    assert comparisons["mesh-1280f[pil]"].notes == ["rss +100%"]
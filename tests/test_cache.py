@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from morphosx.app.storage.cache import DerivativeCache
+from morphosx.app.storage.local import LocalStorage
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalStorage(base_directory=str(tmp_path / "data"))
+
+
+async def _store(cache, storage, derivative_id, size):
+    await storage.save_asset(derivative_id, b"x" * size)
+    await cache.record_store(derivative_id, size)
+
+
+@pytest.mark.asyncio
+async def test_derivative_cache_accounts_sizes_and_hits(tmp_path, local_storage):
+    """Stores and buffered HITs end up in the index and its stats."""
+    cache = DerivativeCache(local_storage, index_path=str(tmp_path / "index.db"))
+    try:
+        await _store(cache, local_storage, "cache/a.jpg/w100.webp", 100)
+        await _store(cache, local_storage, "cache/b.jpg/w100.webp", 250)
+        cache.record_hit("cache/a.jpg/w100.webp", 100)
+        cache.record_hit("cache/a.jpg/w100.webp", 100)
+        # A derivative written before the index existed is adopted on its first HIT
+        cache.record_hit("cache/legacy.jpg/w100.webp", 50)
+
+        stats = await cache.stats()
+        assert stats["entries"] == 3
+        assert stats["bytes"] == 400
+        assert (stats["hits"], stats["stores"], stats["evictions"]) == (3, 2, 0)
+        assert stats["utilization"] is None
+    finally:
+        await cache.shutdown()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", ["lru", "lfu"])
+async def test_derivative_cache_evicts_to_target(tmp_path, local_storage, policy):
+    """Over budget, the least valuable derivatives are deleted until usage is under the target."""
+    cache = DerivativeCache(
+        local_storage, index_path=str(tmp_path / "index.db"), max_bytes=250, policy=policy, eviction_target=0.5
+    )
+    try:
+        await _store(cache, local_storage, "cache/popular.jpg/w100.webp", 100)
+        await _store(cache, local_storage, "cache/old.jpg/w100.webp", 100)
+        await _store(cache, local_storage, "cache/new.jpg/w100.webp", 100)
+        for _ in range(3):
+            cache.record_hit("cache/popular.jpg/w100.webp", 100)
+
+        assert await cache.evict() == 2
+        assert (await cache.stats())["bytes"] == 100
+        # Most recently and most frequently used: kept by both policies
+        assert (await local_storage.stat("cache/popular.jpg/w100.webp")).size == 100
+        with pytest.raises(FileNotFoundError):
+            await local_storage.stat("cache/old.jpg/w100.webp")
+    finally:
+        await cache.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_derivative_cache_lfu_keeps_frequent_items(tmp_path, local_storage):
+    """LFU keeps a frequently hit derivative even if it was not the most recent one."""
+    cache = DerivativeCache(local_storage, index_path=str(tmp_path / "index.db"), max_bytes=150, policy="lfu")
+    try:
+        await _store(cache, local_storage, "cache/frequent.jpg/w100.webp", 100)
+        for _ in range(5):
+            cache.record_hit("cache/frequent.jpg/w100.webp", 100)
+        await _store(cache, local_storage, "cache/recent.jpg/w100.webp", 100)
+        cache.record_hit("cache/recent.jpg/w100.webp", 100)
+
+        await cache.evict()
+
+        assert (await local_storage.stat("cache/frequent.jpg/w100.webp")).size == 100
+        with pytest.raises(FileNotFoundError):
+            await local_storage.stat("cache/recent.jpg/w100.webp")
+    finally:
+        await cache.shutdown()
+
+
+def test_derivative_cache_rejects_unknown_policy(tmp_path, local_storage):
+    with pytest.raises(ValueError):
+        DerivativeCache(local_storage, index_path=str(tmp_path / "index.db"), policy="fifo")
+
+
+@pytest.mark.asyncio
+async def test_derivative_cache_logs_failed_eviction_passes(tmp_path, local_storage, caplog):
+    """A failing pass is logged and the background task keeps running."""
+    cache = DerivativeCache(local_storage, index_path=str(tmp_path / "index.db"), eviction_interval=0.01)
+    passes = []
+
+    async def broken_evict():
+        passes.append(1)
+        raise OSError("No space left on device")
+
+    cache.evict = broken_evict
+    await cache.startup()
+    await asyncio.sleep(0.1)
+    try:
+        assert len(passes) > 1
+        assert "No space left on device" in caplog.text
+    finally:
+        await cache.shutdown()
@@ -0,0 +1,160 @@
+import io
+
+import pytest
+from PIL import Image
+
+from morphosx.app.engine.document import DocumentProcessor
+from morphosx.app.engine.types import ImageFormat, ProcessingOptions
+
+fitz = pytest.importorskip("fitz")
+
+
+@pytest.fixture
+def sample_pdf():
+    """Generates a 3-page A4 PDF in memory."""
+    doc = fitz.open()
+    for number in range(1, 4):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((72, 72), f"Page {number}", fontsize=36)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_document_processor_page_to_image(core_processor, sample_pdf):
+    """A PDF page is rendered and resized by the core engine."""
+    processor = DocumentProcessor(core_processor)
+
+    options = ProcessingOptions(width=200, format=ImageFormat.PNG, page=2)
+    processed_bytes, mime_type = processor.process(sample_pdf, options, filename="doc.pdf")
+
+    assert mime_type == "image/png"
+    img = Image.open(io.BytesIO(processed_bytes))
+    assert img.width == 200
+    assert img.height == int(200 / 595 * 842)
+
+
+def test_document_processor_page_out_of_bounds(core_processor, sample_pdf):
+    """Requesting a missing page fails with a clear error."""
+    processor = DocumentProcessor(core_processor)
+
+    with pytest.raises(RuntimeError) as exc:
+        processor.process(sample_pdf, ProcessingOptions(page=9), filename="doc.pdf")
+    assert "out of bounds" in str(exc.value)
+
+
+def test_document_cache_reuses_parsed_document(core_processor, sample_pdf):
+    """Sequential pages reuse the open document and count hits/misses."""
+    processor = DocumentProcessor(core_processor)
+
+    for page in (1, 2, 3):
+        processor.process_cached("doc.pdf@v1", ProcessingOptions(width=100, page=page), sample_pdf)
+
+    assert processor.document_cache.stats() == {
+        "hits": 2,
+        "misses": 1,
+        "documents": 1,
+        "bytes": len(sample_pdf),
+    }
+
+    # Once cached, the bytes are not needed at all
+    processed_bytes, _ = processor.process_cached("doc.pdf@v1", ProcessingOptions(width=100, page=3))
+    assert Image.open(io.BytesIO(processed_bytes)).width == 100
+
+    with pytest.raises(LookupError):
+        processor.process_cached("doc.pdf@v2", ProcessingOptions(page=1))
+
+
+def test_document_cache_evicts_least_recently_used(sample_pdf):
+    """The cache stays within its document-count and byte bounds."""
+    from morphosx.app.engine.document import DocumentCache
+
+    cache = DocumentCache(max_documents=2, max_bytes=3 * len(sample_pdf))
+    cache.put("a", object(), len(sample_pdf))
+    cache.put("b", object(), len(sample_pdf))
+    cache.get("a")
+    cache.put("c", object(), len(sample_pdf))
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+    cache.put("huge", object(), 4 * len(sample_pdf))
+    assert "huge" not in cache
+    assert cache.stats()["bytes"] == 2 * len(sample_pdf)
+
+
+def test_pdf_pages_skip_storage_fetch(tmp_path, monkeypatch, core_processor, sample_pdf):
+    """Paging through a cached PDF reads the original from storage only once; /cache/stats counts the reuse."""
+    from fastapi.testclient import TestClient
+
+    from morphosx.app.api import assets
+    from morphosx.app.core.security import generate_signature
+    from morphosx.app.engine.base import ProcessorRegistry
+    from morphosx.app.main import create_app
+    from morphosx.app.settings import settings
+    from morphosx.app.storage.hot import HotCache
+    from morphosx.app.storage.local import LocalStorage
+
+    storage = LocalStorage(base_directory=str(tmp_path))
+    monkeypatch.setattr(assets, "storage", storage)
+    registry = ProcessorRegistry()
+    registry.register(["pdf"], DocumentProcessor(core_processor))
+    monkeypatch.setattr(assets, "processor_registry", registry)
+    monkeypatch.setattr(assets, "hot_cache", HotCache())
+    monkeypatch.setattr(settings, "cache_stats_enabled", True)
+    (tmp_path / "originals").mkdir()
+    (tmp_path / "originals" / "doc.pdf").write_bytes(sample_pdf)
+
+    fetched = []
+    get_asset = storage.get_asset
+
+    async def counting_get_asset(asset_id):
+        fetched.append(asset_id)
+        return await get_asset(asset_id)
+
+    monkeypatch.setattr(storage, "get_asset", counting_get_asset)
+
+    sig = generate_signature("doc.pdf", 100, None, "png", 0, settings.secret_key)
+    with TestClient(create_app()) as client:
+        for page in (1, 2, 3):
+            response = client.get(
+                f"{settings.api_prefix}/assets/doc.pdf?width=100&format=PNG&page={page}&signature={sig}"
+            )
+            assert response.status_code == 200
+            assert response.headers["X-MorphosX-Cache"] == "MISS"
+        stats = client.get(f"{settings.api_prefix}/cache/stats").json()
+
+    assert fetched == ["originals/doc.pdf"]
+    assert stats["documents"] == {"hits": 2, "misses": 1, "documents": 1, "bytes": len(sample_pdf)}
+
+
+def test_document_processor_renders_at_target_size(core_processor, sample_pdf):
+    """Pages are rasterized at the output size rather than at a fixed DPI and then resized."""
+    processor = DocumentProcessor(core_processor)
+
+    thumb = processor.render_page(sample_pdf, 1, width=150)
+    assert thumb.size == (150, int(150 / 595 * 842))
+
+    large = processor.render_page(sample_pdf, 1, width=4096)
+    assert large.size == (4096, int(4096 / 595 * 842))
+
+    # Both axes fit the page in the box
+    assert processor.render_page(sample_pdf, 1, width=300, height=300).size == (211, 300)
+    # ...and the Pillow engine then fills the box, as it does for images
+    processed_bytes, _ = processor.process(sample_pdf, ProcessingOptions(width=300, height=300, format=ImageFormat.PNG))
+    assert Image.open(io.BytesIO(processed_bytes)).size == (300, 300)
+
+    # Without a target size the fixed DPI still applies
+    assert processor.render_page(sample_pdf, 1).size == (1239, 1754)
+
+
+def test_document_processor_skips_engine_resize(core_processor, sample_pdf):
+    """The core engine receives a page that already has the requested size."""
+    from unittest.mock import patch
+
+    processor = DocumentProcessor(core_processor)
+    options = ProcessingOptions(width=200, format=ImageFormat.PNG)
+
+    with patch.object(type(core_processor), "_resize", side_effect=AssertionError("unexpected resize")):
+        processed_bytes, _ = processor.process(sample_pdf, options)
+
+    assert Image.open(io.BytesIO(processed_bytes)).size == (200, 283)
@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+import pytest
+
+from morphosx.app.core.loadtest import LoadGenerator, LoopLagMonitor, in_process_client, parse_mix
+
+
+def test_parse_mix():
+    assert parse_mix("hit=70, miss=30") == {"hit": 70.0, "miss": 30.0}
+    with pytest.raises(ValueError):
+        parse_mix("hit=1,purge=1")
+    with pytest.raises(ValueError):
+        parse_mix("hit=0")
+
+
+@pytest.mark.asyncio
+async def test_in_process_load_hits_warm_derivatives_and_misses_cold_ones():
+    """Setup warms the hit set; misses never repeat, so each one renders."""
+    # Pillow, so the test does not depend on libvips
+    async with in_process_client(engine_type="pil") as client:
+        generator = LoadGenerator(client, parse_mix("hit=1,miss=1,upload=1,list=1"), concurrency=4, seeds=2)
+        await generator.setup()
+        report = (await generator.run(duration=30, max_requests=40)).to_dict()
+
+    assert report["requests"] == 40
+    assert report["errors"] == 0
+    kinds = report["kinds"]
+    assert set(kinds) == {"hit", "miss", "upload", "list"}
+    assert kinds["hit"]["cache"] == {"HIT": kinds["hit"]["requests"]}
+    assert kinds["miss"]["cache"] == {"MISS": kinds["miss"]["requests"]}
+    assert kinds["miss"]["p50_ms"] > 0
+    assert report["throughput"] > 0
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_blocking_calls():
+    monitor = LoopLagMonitor(interval=0.005)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    assert max(monitor.samples) >= 0.08
@@ -0,0 +1,243 @@
+import pstats
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from morphosx.app.api import assets
+from morphosx.app.core.metrics import (
+    CACHE_REQUESTS,
+    ENGINE_SECONDS,
+    STAGE_SECONDS,
+    STORAGE_SECONDS,
+    MetricsRegistry,
+)
+from morphosx.app.core.profiling import CaptureBudget
+from morphosx.app.core.security import generate_profile_token, generate_signature
+from morphosx.app.core.timing import format_server_timing
+from morphosx.app.engine.base import ProcessorRegistry
+from morphosx.app.main import create_app
+from morphosx.app.settings import settings
+from morphosx.app.storage.hot import HotCache
+from morphosx.app.storage.local import LocalStorage
+
+
+def test_registry_renders_prometheus_text():
+    """Counters, callback gauges and cumulative histogram buckets in exposition format."""
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests.", ["result"])
+    registry.gauge("test_depth", "Depth.", lambda: 3)
+    latency = registry.histogram("test_seconds", "Latency.", ["stage"], buckets=(0.1, 1.0))
+
+    requests.inc(result="hit")
+    requests.inc(2, result='mi"ss')
+    latency.observe(0.05, stage="fetch")
+    latency.observe(0.5, stage="fetch")
+    latency.observe(5, stage="fetch")
+
+    text = registry.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{result="hit"} 1' in text
+    assert 'test_requests_total{result="mi\\"ss"} 2' in text
+    assert "test_depth 3" in text
+    assert 'test_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="fetch",le="1"} 2' in text
+    assert 'test_seconds_bucket{stage="fetch",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="fetch"} 3' in text
+    assert 'test_seconds_sum{stage="fetch"} 5.55' in text
+
+    with pytest.raises(ValueError):
+        requests.inc(outcome="hit")
+    with pytest.raises(ValueError):
+        registry.counter("test_requests_total", "Duplicate.")
+
+
+def test_metric_subclasses_must_render_samples():
+    from morphosx.app.core.metrics import Metric
+
+    class Incomplete(Metric):
+        type = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("test_incomplete", "Missing samples().")
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_tracks_pipeline(tmp_path, monkeypatch, core_processor, sample_image):
+    """A miss then a hit move the cache counters and fill the stage, engine and storage histograms."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+    registry = ProcessorRegistry()
+    registry.set_default(core_processor)
+    monkeypatch.setattr(assets, "storage", storage)
+    monkeypatch.setattr(assets, "processor_registry", registry)
+    monkeypatch.setattr(assets, "hot_cache", HotCache(max_bytes=0))
+    await storage.save_asset("originals/photo.jpg", sample_image)
+
+    sig = generate_signature("photo.jpg", 50, None, "webp", 80, settings.secret_key)
+    url = f"{settings.api_prefix}/assets/photo.jpg?width=50&format=WEBP&quality=80&signature={sig}"
+
+    before = {result: CACHE_REQUESTS.value(result=result) for result in ("hit", "miss")}
+    renders = STAGE_SECONDS.count(stage="render")
+    engine_runs = ENGINE_SECONDS.count(engine=type(core_processor).__name__)
+    stats = STORAGE_SECONDS.count(backend="LocalStorage", operation="stat")
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+
+    with TestClient(create_app()) as client:
+        client.get(url)
+        client.get(url)
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert CACHE_REQUESTS.value(result="miss") == before["miss"] + 1
+    assert CACHE_REQUESTS.value(result="hit") == before["hit"] + 1
+    assert STAGE_SECONDS.count(stage="render") == renders + 1
+    assert ENGINE_SECONDS.count(engine=type(core_processor).__name__) == engine_runs + 1
+    assert STORAGE_SECONDS.count(backend="LocalStorage", operation="stat") >= stats + 2
+
+    text = response.text
+    assert "morphosx_worker_queue_depth 0" in text
+    assert 'morphosx_stage_seconds_count{stage="fetch"}' in text
+    route = f"{settings.api_prefix}/assets/{{asset_id}}"
+    assert f'morphosx_http_request_seconds_count{{method="GET",route="{route}",status="200"}}' in text
+    assert f'morphosx_response_bytes_total{{route="{route}"}}' in text
+
+
+def test_metrics_endpoint_is_opt_in_and_token_protected(monkeypatch):
+    """/metrics is off by default; with OPS_TOKEN set it requires the bearer token."""
+    with TestClient(create_app()) as client:
+        assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    monkeypatch.setattr(settings, "ops_token", "scraper-secret")
+    with TestClient(create_app()) as client:
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer scraper-secret"}).status_code == 200
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch, core_processor, sample_image):
+    """Assets router on an isolated LocalStorage with the Pillow engine and no memory tier."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+    registry = ProcessorRegistry()
+    registry.set_default(core_processor)
+    monkeypatch.setattr(assets, "storage", storage)
+    monkeypatch.setattr(assets, "processor_registry", registry)
+    monkeypatch.setattr(assets, "hot_cache", HotCache(max_bytes=0))
+    return storage
+
+
+def test_format_server_timing():
+    assert format_server_timing({"fetch": 0.0012, "render": 0.25}) == "fetch;dur=1.2, render;dur=250.0"
+    assert format_server_timing({}) == ""
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_pipeline_stages(pipeline, sample_image):
+    """Misses report fetch/render/store, hits only the lookup; other routes are left alone."""
+    await pipeline.save_asset("originals/photo.jpg", sample_image)
+    sig = generate_signature("photo.jpg", 50, None, "webp", 80, settings.secret_key)
+    url = f"{settings.api_prefix}/assets/photo.jpg?width=50&format=WEBP&quality=80&signature={sig}"
+
+    with TestClient(create_app()) as client:
+        miss = client.get(url)
+        hit = client.get(url)
+        health = client.get("/health")
+
+    stages = [entry.split(";")[0] for entry in miss.headers["Server-Timing"].split(", ")]
+    assert stages[0] == "lookup"
+    assert {"fetch", "render", "store"} <= set(stages)
+    assert stages[-1] == "total"
+    assert [entry.split(";")[0] for entry in hit.headers["Server-Timing"].split(", ")] == ["lookup", "total"]
+    assert "Server-Timing" not in health.headers
+
+
+@pytest.mark.asyncio
+async def test_signed_profile_request_stores_cprofile_output(pipeline, sample_image, tmp_path):
+    """A valid profile token bypasses the caches and stores a pstats file plus a text summary."""
+    await pipeline.save_asset("originals/photo.jpg", sample_image)
+    sig = generate_signature("photo.jpg", 50, None, "webp", 80, settings.secret_key)
+    expires = int(time.time()) + 60
+    token = generate_profile_token("photo.jpg", "w50_hauto_q80_t0_p1.webp", expires, settings.secret_key)
+    url = f"{settings.api_prefix}/assets/photo.jpg?width=50&format=WEBP&quality=80&signature={sig}"
+
+    with TestClient(create_app()) as client:
+        assert client.get(url).headers["X-MorphosX-Cache"] == "MISS"
+        rejected = client.get(f"{url}&profile=deadbeef&profile_expires={expires}")
+        profiled = client.get(f"{url}&profile={token}&profile_expires={expires}")
+
+    assert rejected.status_code == 403
+    assert profiled.status_code == 200
+    assert profiled.headers["X-MorphosX-Cache"] == "BYPASS"
+    assert profiled.headers["Cache-Control"] == "no-store"
+
+    profile_id = profiled.headers["X-MorphosX-Profile"]
+    assert profile_id.startswith(f"{settings.diagnostics_prefix}/profiles/photo.jpg/")
+    stats = pstats.Stats(str(tmp_path / profile_id))
+    assert stats.total_calls > 0
+    summary = (tmp_path / profile_id.replace(".prof", ".txt")).read_text()
+    assert "cumulative" in summary
+
+
+@pytest.mark.asyncio
+async def test_profile_tokens_are_bound_to_derivative_and_expiry(pipeline, sample_image, monkeypatch):
+    """Tokens only profile the derivative they were signed for, until they expire, within the capture budget."""
+    await pipeline.save_asset("originals/photo.jpg", sample_image)
+    monkeypatch.setattr(assets, "profile_budget", CaptureBudget(max_captures=1))
+    monkeypatch.setattr(settings, "profile_retention", 1)
+
+    def url(width: int, token: str, expires: int) -> str:
+        sig = generate_signature("photo.jpg", width, None, "webp", 80, settings.secret_key)
+        return (
+            f"{settings.api_prefix}/assets/photo.jpg?width={width}&format=WEBP&quality=80&signature={sig}"
+            f"&profile={token}&profile_expires={expires}"
+        )
+
+    expires = int(time.time()) + 60
+    token = generate_profile_token("photo.jpg", "w50_hauto_q80_t0_p1.webp", expires, settings.secret_key)
+    expired = int(time.time()) - 1
+    expired_token = generate_profile_token("photo.jpg", "w50_hauto_q80_t0_p1.webp", expired, settings.secret_key)
+    distant = int(time.time()) + settings.profile_token_max_lifetime + 60
+    distant_token = generate_profile_token("photo.jpg", "w50_hauto_q80_t0_p1.webp", distant, settings.secret_key)
+
+    with TestClient(create_app()) as client:
+        assert client.get(url(60, token, expires)).status_code == 403
+        assert client.get(url(50, token, expires + 1)).status_code == 403
+        assert client.get(url(50, expired_token, expired)).status_code == 403
+        assert client.get(url(50, distant_token, distant)).status_code == 403
+        assert client.get(url(50, token, expires)).status_code == 200
+        limited = client.get(url(50, token, expires))
+        listing = client.get(f"{settings.api_prefix}/assets/list/{settings.diagnostics_prefix}/profiles/photo.jpg")
+        root = client.get(f"{settings.api_prefix}/assets/list/originals%2F..")
+
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "60"
+    assert listing.status_code == 404
+    # Traversal is normalized away instead of reaching the storage root
+    assert root.json()["path"] == "originals"
+    assert settings.diagnostics_prefix not in {item["name"] for item in root.json()["items"]}
+
+
+@pytest.mark.asyncio
+async def test_profile_captures_are_pruned(pipeline, sample_image, monkeypatch):
+    """Only the newest `profile_retention` captures of an asset are kept."""
+    await pipeline.save_asset("originals/photo.jpg", sample_image)
+    monkeypatch.setattr(settings, "profile_retention", 2)
+    expires = int(time.time()) + 60
+    token = generate_profile_token("photo.jpg", "w50_hauto_q80_t0_p1.webp", expires, settings.secret_key)
+    sig = generate_signature("photo.jpg", 50, None, "webp", 80, settings.secret_key)
+    url = (
+        f"{settings.api_prefix}/assets/photo.jpg?width=50&format=WEBP&quality=80&signature={sig}"
+        f"&profile={token}&profile_expires={expires}"
+    )
+
+    with TestClient(create_app()) as client:
+        captured = []
+        for _ in range(4):
+            captured.append(client.get(url).headers["X-MorphosX-Profile"])
+            time.sleep(0.002)
+
+    kept = await pipeline.list_assets(f"{settings.diagnostics_prefix}/profiles/photo.jpg")
+    assert sorted(item.path for item in kept if item.path.endswith(".prof")) == sorted(captured[-2:])
+    assert len(kept) == 4
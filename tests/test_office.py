@@ -20,3 +20,15 @@ def test_office_processor_docx_to_image(core_processor, real_docx, options):
     # Verify it's a valid image
     img = Image.open(io.BytesIO(processed_bytes))
     assert img.width == options.width
+
+
+def test_office_processor_hands_pixels_to_core(core_processor, real_docx, options):
+    """The summary card reaches the core engine as an image, not encoded bytes."""
+    from unittest.mock import patch
+
+    processor = OfficeProcessor(core_processor)
+
+    with patch.object(core_processor, "process", wraps=core_processor.process) as process:
+        processor.process(real_docx, options, filename="test.docx")
+
+    process.assert_not_called()
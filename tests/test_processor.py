@@ -76,8 +76,78 @@ def test_image_processor_aspect_ratio_height():
         assert result_img.height == 250
 
 
+def test_image_processor_jpeg_draft_decoding():
+    """
+    Test 4: Large JPEG thumbnailing.
+    Draft mode makes libjpeg decode at 1/8 scale (still twice the target size),
+    and the final pass keeps the exact output geometry. Timings live in
+    `morphosx bench --fixtures thumb`.
+    """
+    processor = ImageProcessor()
+    source_data = create_sample_image(6000, 4000)
+    options = ProcessingOptions(width=150, height=150, format=ImageFormat.WEBP, quality=70)
+
+    decoded_sizes = []
+    transform = processor._transform
+
+    def spy(img, options, target_size):
+        decoded_sizes.append(img.size)
+        return transform(img, options, target_size)
+
+    processor._transform = spy
+    processed_bytes, _ = processor.process(source_data, options)
+
+    assert decoded_sizes == [(750, 500)]
+    with Image.open(io.BytesIO(processed_bytes)) as result_img:
+        assert result_img.size == (150, 150)
+
+
+def test_image_processor_draft_respects_exif_orientation():
+    """
+    Test 5: Rotated JPEGs.
+    The target size is computed on the oriented image, so a portrait photo
+    stored as landscape + EXIF orientation 6 keeps its portrait geometry.
+    """
+    processor = ImageProcessor()
+
+    img = Image.new("RGB", (2000, 1000), color=(0, 0, 255))
+    exif = img.getexif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", exif=exif.tobytes())
+
+    options = ProcessingOptions(width=100, format=ImageFormat.PNG)
+    processed_bytes, _ = processor.process(buffer.getvalue(), options)
+
+    with Image.open(io.BytesIO(processed_bytes)) as result_img:
+        assert result_img.size == (100, 200)
+
+
+def test_image_processor_process_image_handoff():
+    """
+    Test 6: In-memory handoff.
+    PIL images and numpy arrays are accepted directly, without encoded bytes.
+    """
+    import numpy as np
+
+    processor = ImageProcessor()
+    options = ProcessingOptions(width=40, format=ImageFormat.PNG)
+
+    processed_bytes, mime_type = processor.process_image(Image.new("RGB", (80, 60)), options)
+    assert mime_type == "image/png"
+    with Image.open(io.BytesIO(processed_bytes)) as result_img:
+        assert result_img.size == (40, 30)
+
+    processed_bytes, _ = processor.process_image(np.zeros((60, 80, 3), dtype=np.uint8), options)
+    with Image.open(io.BytesIO(processed_bytes)) as result_img:
+        assert result_img.size == (40, 30)
+
+
 if __name__ == "__main__":
     test_image_processor_resize_and_convert()
     test_image_processor_no_dimensions()
     test_image_processor_aspect_ratio_height()
+    test_image_processor_jpeg_draft_decoding()
+    test_image_processor_draft_respects_exif_orientation()
+    test_image_processor_process_image_handoff()
     print("All tests passed!")
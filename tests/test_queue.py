@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from morphosx.app.core.queue import RenderQueue
+
+
+@pytest.mark.asyncio
+async def test_render_queue_runs_cheapest_jobs_first(tmp_path):
+    """Jobs are claimed by ascending priority, whatever the enqueue order."""
+    ran = []
+
+    async def handler(job):
+        ran.append((job.asset_id, job.preset))
+
+    queue = RenderQueue(str(tmp_path / "queue.db"), handler)
+    await queue.enqueue("a.jpg", [("hero", 3_000_000), ("thumb", 22_500)])
+    await queue.enqueue("b.jpg", [("preview", 160_000)])
+
+    while await queue.run_next():
+        pass
+
+    assert ran == [("a.jpg", "thumb"), ("b.jpg", "preview"), ("a.jpg", "hero")]
+    assert [job["status"] for job in await queue.status("a.jpg")] == ["done", "done"]
+    assert (await queue.stats())["done"] == 3
+    await queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_render_queue_retries_then_fails(tmp_path):
+    """Failing jobs are retried after a backoff, up to max_attempts, and keep their last error."""
+
+    async def handler(job):
+        raise RuntimeError("decoder crashed")
+
+    queue = RenderQueue(str(tmp_path / "queue.db"), handler, max_attempts=2, retry_backoff=0.1)
+    await queue.enqueue("a.jpg", [("thumb", 1)])
+
+    assert await queue.run_next() is True
+    assert (await queue.status("a.jpg"))[0]["status"] == "pending"
+    # Not retried before the backoff has passed
+    assert await queue.run_next() is False
+    await asyncio.sleep(0.15)
+    assert await queue.run_next() is True
+    assert await queue.run_next() is False
+
+    (job,) = await queue.status("a.jpg")
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", 2, "decoder crashed")
+    await queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_render_queue_survives_restart(tmp_path):
+    """Pending and interrupted jobs are resumed by the workers of the next process."""
+    path = str(tmp_path / "queue.db")
+    first = RenderQueue(path, handler=None, lease=0.1)
+    await first.enqueue("a.jpg", [("thumb", 1), ("hero", 2)])
+    # Simulate a crash mid-render: the job stays 'running' in the file until its lease runs out
+    await first._run(first._claim)
+    await first.shutdown()
+    await asyncio.sleep(0.15)
+
+    done = asyncio.Event()
+    ran = []
+
+    async def handler(job):
+        ran.append(job.preset)
+        if len(ran) == 2:
+            done.set()
+
+    second = RenderQueue(path, handler, poll_interval=0.05)
+    await second.startup()
+    await asyncio.wait_for(done.wait(), timeout=5)
+    await second.shutdown()
+
+    assert ran == ["thumb", "hero"]
+
+    forgotten = RenderQueue(path, handler)
+    await forgotten.forget("a.jpg")
+    assert await forgotten.status("a.jpg") == []
+    await forgotten.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_render_queue_leaves_live_leases_alone(tmp_path):
+    """Another worker starting up does not requeue a job whose lease is still held."""
+    path = str(tmp_path / "queue.db")
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_handler(job):
+        started.set()
+        await release.wait()
+
+    live = RenderQueue(path, slow_handler, lease=0.3)
+    await live.enqueue("a.jpg", [("thumb", 1)])
+    running = asyncio.create_task(live.run_next())
+    await started.wait()
+
+    ran = []
+
+    async def handler(job):
+        ran.append(job.preset)
+
+    other = RenderQueue(path, handler)
+    await other.startup()
+    # Longer than the lease: the live worker renews it while rendering
+    await asyncio.sleep(0.5)
+    assert await other.run_next() is False
+
+    release.set()
+    assert await running is True
+    assert (await other.status("a.jpg"))[0]["status"] == "done"
+    assert ran == []
+    await other.shutdown()
+    await live.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_render_queue_purges_finished_jobs(tmp_path):
+    """Done and failed jobs are removed once older than the retention; pending ones stay."""
+
+    async def handler(job):
+        if job.preset == "hero":
+            raise RuntimeError("decoder crashed")
+
+    queue = RenderQueue(str(tmp_path / "queue.db"), handler, max_attempts=1, retention=0.05)
+    await queue.enqueue("a.jpg", [("thumb", 1), ("hero", 2)])
+    while await queue.run_next():
+        pass
+    await queue.enqueue("b.jpg", [("thumb", 1)])
+
+    assert await queue.purge() == 0
+    await asyncio.sleep(0.1)
+    assert await queue.purge() == 2
+    assert await queue.status("a.jpg") == []
+    assert [job["status"] for job in await queue.status("b.jpg")] == ["pending"]
+    await queue.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_render_queue_logs_worker_failures(tmp_path, caplog):
+    """Database errors in the worker loop are logged, and the worker keeps polling."""
+    queue = RenderQueue(str(tmp_path / "queue.db"), handler=None, poll_interval=0.01)
+    claims = []
+
+    def broken_claim():
+        claims.append(1)
+        raise RuntimeError("database is locked")
+
+    queue._claim = broken_claim
+    await queue.startup()
+    await asyncio.sleep(0.1)
+    await queue.shutdown()
+
+    assert len(claims) > 1
+    assert "database is locked" in caplog.text
@@ -0,0 +1,54 @@
+import pytest
+
+from morphosx.app.core.ranges import MAX_RANGES, multipart_byteranges, parse_range
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", [(0, 99)]),
+        ("bytes=900-", [(900, 999)]),
+        ("bytes=-100", [(900, 999)]),
+        ("bytes=-5000", [(0, 999)]),
+        ("bytes=990-2000", [(990, 999)]),
+        ("bytes=0-9, 20-29", [(0, 9), (20, 29)]),
+        # Overlapping and adjacent ranges are coalesced
+        ("bytes=20-29,0-9,10-15,25-40", [(0, 15), (20, 40)]),
+        # Unsatisfiable parts are dropped; none left means 416
+        ("bytes=0-9,5000-6000", [(0, 9)]),
+        ("bytes=1000-", []),
+        ("bytes=-0", []),
+        # Absent, malformed or foreign units fall back to the full body
+        (None, None),
+        ("items=0-9", None),
+        ("bytes=", None),
+        ("bytes=abc", None),
+        ("bytes=9-0", None),
+        ("bytes=-", None),
+        ("bytes=+1-5", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+def test_parse_range_limits_part_count():
+    header = "bytes=" + ",".join(f"{i * 10}-{i * 10 + 1}" for i in range(MAX_RANGES + 1))
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.asyncio
+async def test_multipart_byteranges_length_matches_body():
+    """The announced Content-Length is exact, and each part carries its Content-Range."""
+    data = bytes(range(256)) * 4
+
+    async def read(offset, length):
+        yield data[offset : offset + length]
+
+    body, length = multipart_byteranges([(0, 9), (100, 199)], len(data), "video/mp4", "xyz", read)
+    payload = b"".join([chunk async for chunk in body])
+
+    assert len(payload) == length
+    assert b"Content-Range: bytes 0-9/1024\r\n\r\n" + data[:10] in payload
+    assert b"Content-Range: bytes 100-199/1024\r\n\r\n" + data[100:200] in payload
+    assert payload.endswith(b"\r\n--xyz--\r\n")
@@ -1,3 +1,4 @@
+import os
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -40,3 +41,127 @@ def test_raw_processor_import_error(core_processor, options):
         with pytest.raises(RuntimeError) as exc:
             processor.process(b"data", options, filename="test.cr2")
         assert "rawpy or imageio is not installed" in str(exc.value)
+
+
+def _mock_raw(width=6000, height=4000, flip=0, thumb=None):
+    import numpy as np
+    import rawpy
+
+    mock_raw = MagicMock()
+    mock_raw.sizes.width = width
+    mock_raw.sizes.height = height
+    mock_raw.sizes.flip = flip
+    mock_raw.postprocess.side_effect = lambda half_size, **kwargs: np.zeros(
+        (height // 2, width // 2, 3) if half_size else (height, width, 3), dtype=np.uint8
+    )
+    if thumb is None:
+        mock_raw.extract_thumb.side_effect = rawpy.LibRawNoThumbnailError()
+    else:
+        mock_raw.extract_thumb.return_value = thumb
+    return mock_raw
+
+
+def _jpeg_thumb(size):
+    import io
+
+    import rawpy
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buf, format="JPEG")
+    return rawpy.Thumbnail(format=rawpy.ThumbFormat.JPEG, data=buf.getvalue())
+
+
+def test_raw_processor_uses_embedded_preview(core_processor):
+    """A large enough embedded JPEG skips demosaicing entirely."""
+    from PIL import Image
+
+    processor = RawProcessor(core_processor)
+    mock_raw = _mock_raw(thumb=_jpeg_thumb((1620, 1080)))
+
+    with patch("rawpy.imread") as mock_imread:
+        mock_imread.return_value.__enter__.return_value = mock_raw
+        preview = processor.render_preview(b"fake-raw-data", width=800)
+
+    mock_raw.postprocess.assert_not_called()
+    assert isinstance(preview, Image.Image)
+    # Decoded with a DCT-domain draft, still covering the target
+    assert preview.width >= 800 and preview.width < 1620
+
+
+def test_raw_processor_rotates_embedded_preview(core_processor):
+    """Portrait shots get the same rotation the demosaic output would have."""
+    processor = RawProcessor(core_processor)
+    mock_raw = _mock_raw(flip=6, thumb=_jpeg_thumb((1620, 1080)))
+
+    with patch("rawpy.imread") as mock_imread:
+        mock_imread.return_value.__enter__.return_value = mock_raw
+        preview = processor.render_preview(b"fake-raw-data", height=1000)
+
+    assert preview.size == (1080, 1620)
+
+
+def test_raw_processor_half_size_fallback(core_processor):
+    """Small previews fall back to half-size, large targets to a full demosaic."""
+    processor = RawProcessor(core_processor)
+
+    with patch("rawpy.imread") as mock_imread:
+        mock_raw = _mock_raw(thumb=_jpeg_thumb((160, 120)))
+        mock_imread.return_value.__enter__.return_value = mock_raw
+
+        assert processor.render_preview(b"fake-raw-data", width=2000).shape == (2000, 3000, 3)
+        assert processor.render_preview(b"fake-raw-data", width=4000).shape == (4000, 6000, 3)
+        assert processor.render_preview(b"fake-raw-data").shape == (4000, 6000, 3)
+
+
+def test_raw_processor_full_mode(core_processor):
+    """'full' mode keeps the previous always-demosaic behaviour."""
+    processor = RawProcessor(core_processor, preview_mode="full")
+    mock_raw = _mock_raw(thumb=_jpeg_thumb((6000, 4000)))
+
+    with patch("rawpy.imread") as mock_imread:
+        mock_imread.return_value.__enter__.return_value = mock_raw
+        processor.render_preview(b"fake-raw-data", width=100)
+
+    mock_raw.extract_thumb.assert_not_called()
+    mock_raw.postprocess.assert_called_once_with(use_camera_wb=True, half_size=False)
+
+
+def test_raw_processor_rejects_unknown_preview_mode(core_processor):
+    """A typo in RAW_PREVIEW_MODE fails instead of silently behaving like 'auto'."""
+    with pytest.raises(ValueError):
+        RawProcessor(core_processor, preview_mode="ful")
+
+
+RAW_SAMPLES = os.environ.get("MORPHOSX_RAW_SAMPLES")
+
+
+@pytest.mark.skipif(not RAW_SAMPLES, reason="set MORPHOSX_RAW_SAMPLES to a folder of RAW files")
+def test_raw_processor_benchmark(core_processor):
+    """
+    Per-format timings of the preview strategies for a 400px thumbnail.
+
+    Run with MORPHOSX_RAW_SAMPLES pointing at sample CR2/NEF/DNG/ARW files.
+    """
+    import time
+    from pathlib import Path
+
+    from morphosx.app.engine.types import ImageFormat, ProcessingOptions
+
+    samples = [p for p in sorted(Path(RAW_SAMPLES).iterdir()) if p.suffix.lower() in {".cr2", ".nef", ".dng", ".arw"}]
+    if not samples:
+        pytest.skip("no RAW files found in MORPHOSX_RAW_SAMPLES")
+
+    options = ProcessingOptions(width=400, format=ImageFormat.JPEG)
+    print("\n[BENCH] RAW -> 400px JPEG")
+    for sample in samples:
+        raw_data = sample.read_bytes()
+        timings = {}
+        for mode in ("full", "auto"):
+            start = time.perf_counter()
+            RawProcessor(core_processor, preview_mode=mode).process(raw_data, options, filename=sample.name)
+            timings[mode] = time.perf_counter() - start
+
+        fmt = sample.suffix.upper().lstrip(".")
+        print(f"[BENCH] {fmt:4} {sample.name}: full demosaic {timings['full']:.3f}s, auto {timings['auto']:.3f}s")
+        assert timings["auto"] <= timings["full"]
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from morphosx.app.core.importtime import parse_importtime
+from morphosx.app.engine.base import ProcessorRegistry, initialize_registry
+from morphosx.app.engine.processor import ImageProcessor
+from morphosx.app.settings import settings
+
+
+def test_engines_are_built_on_first_use(monkeypatch):
+    """Specialized engines are registered by extension and only built when requested."""
+    monkeypatch.setattr(settings, "enabled_engines", ["document", "model3d"])
+    registry = initialize_registry(ProcessorRegistry(), engine_type="pil")
+
+    assert registry.engines()["model3d"]["loaded"] is False
+    assert registry.is_pending("scene.stl")
+
+    engine = registry.get_processor("scene.STL")
+    assert type(engine).__name__ == "Model3DProcessor"
+    assert registry.get_processor("mesh.obj") is engine
+    assert not registry.is_pending("scene.stl")
+    assert registry.engines()["model3d"]["loaded"] is True
+    assert registry.engines()["document"]["loaded"] is False
+
+    # Disabled engines are not registered: their files go to the core image engine
+    assert isinstance(registry.get_processor("clip.mp4"), ImageProcessor)
+    assert set(registry.load_all()) == {"document", "model3d"}
+
+
+def test_unknown_engine_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "enabled_engines", ["video", "hologram"])
+    with pytest.raises(ValueError, match="hologram"):
+        initialize_registry(ProcessorRegistry(), engine_type="pil")
+
+
+def test_app_import_skips_heavy_engine_dependencies():
+    """Importing the app does not import trimesh (3D) or aioboto3 (S3) for a local deployment."""
+    code = "import sys, morphosx.app.main; print(sorted({'trimesh', 'aioboto3'} & set(sys.modules)))"
+    env = {**os.environ, "MORPHOSX_STORAGE_TYPE": "local"}
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "[]"
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     yaml._yaml\n"
+        "import time:       300 |        420 |   yaml\n"
+        "import time:      1000 |       1420 | morphosx.app.main\n"
+    )
+    records = parse_importtime(output)
+    assert [(record.module, record.depth) for record in records] == [
+        ("yaml._yaml", 2),
+        ("yaml", 1),
+        ("morphosx.app.main", 0),
+    ]
+    assert records[-1].cumulative_us == 1420
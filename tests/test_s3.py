@@ -1,3 +1,4 @@
+import hashlib
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -60,3 +61,177 @@ async def test_s3_storage_not_found():
     with patch.object(storage.session, "client", return_value=mock_client):
         with pytest.raises(FileNotFoundError):
             await storage.get_asset("missing.jpg")
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_pooled_client_against_moto(moto_s3):
+    """One long-lived client serves every call against a local S3 stand-in."""
+    endpoint_url, bucket = moto_s3
+    storage = S3Storage(
+        bucket_name=bucket,
+        endpoint_url=endpoint_url,
+        access_key_id="testing",
+        secret_access_key="testing",
+        max_pool_connections=4,
+    )
+
+    await storage.startup()
+    try:
+        client = storage._client
+        assert client is not None
+
+        await storage.save_asset("originals/photo.jpg", b"jpeg-bytes")
+        assert await storage.get_asset("originals/photo.jpg") == b"jpeg-bytes"
+
+        items = await storage.list_assets("originals")
+        assert [item.name for item in items] == ["photo.jpg"]
+
+        with pytest.raises(FileNotFoundError):
+            await storage.get_asset("originals/missing.jpg")
+
+        # Every call reused the same client
+        assert storage._client is client
+    finally:
+        await storage.shutdown()
+
+    assert storage._client is None
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_conditional_lock_against_moto(moto_s3):
+    """The lock marker is created with a conditional put and is exclusive."""
+    endpoint_url, bucket = moto_s3
+    storage = S3Storage(
+        bucket_name=bucket,
+        endpoint_url=endpoint_url,
+        access_key_id="testing",
+        secret_access_key="testing",
+    )
+
+    try:
+        assert await storage.acquire_lock("cache/photo.jpg/w100.webp", ttl=60) is True
+        assert await storage.acquire_lock("cache/photo.jpg/w100.webp", ttl=60) is False
+
+        await storage.release_lock("cache/photo.jpg/w100.webp")
+        assert await storage.acquire_lock("cache/photo.jpg/w100.webp", ttl=60) is True
+    finally:
+        await storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_stat_and_stream_against_moto(moto_s3):
+    """HEAD-based stat and chunked Body streaming."""
+    endpoint_url, bucket = moto_s3
+    storage = S3Storage(
+        bucket_name=bucket,
+        endpoint_url=endpoint_url,
+        access_key_id="testing",
+        secret_access_key="testing",
+    )
+    data = b"x" * 200_000
+
+    try:
+        await storage.save_asset("cache/photo.jpg/w100.webp", data)
+
+        meta = await storage.stat("cache/photo.jpg/w100.webp")
+        assert meta.size == len(data)
+        # Single-part uploads carry the content MD5 as their ETag
+        assert meta.etag == hashlib.md5(data).hexdigest()
+
+        chunks = [chunk async for chunk in storage.open_stream("cache/photo.jpg/w100.webp", chunk_size=65536)]
+        assert len(chunks) > 1
+        assert b"".join(chunks) == data
+
+        # Ranged GETs transfer only the requested bytes
+        ranged = storage.open_stream("cache/photo.jpg/w100.webp", offset=150_000, length=100)
+        assert b"".join([chunk async for chunk in ranged]) == data[150_000:150_100]
+        tail = storage.open_stream("cache/photo.jpg/w100.webp", offset=199_990)
+        assert b"".join([chunk async for chunk in tail]) == data[199_990:]
+
+        with pytest.raises(FileNotFoundError):
+            await storage.stat("cache/missing.webp")
+    finally:
+        await storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_multipart_save_stream_against_moto(moto_s3):
+    """Large streams are sent as multipart uploads and hashed on the fly."""
+
+    endpoint_url, bucket = moto_s3
+    storage = S3Storage(
+        bucket_name=bucket,
+        endpoint_url=endpoint_url,
+        access_key_id="testing",
+        secret_access_key="testing",
+        multipart_part_size=5 * 1024 * 1024,
+    )
+    data = bytes(range(256)) * (11 * 1024 * 1024 // 256)
+
+    async def chunks():
+        for i in range(0, len(data), 1024 * 1024):
+            yield data[i : i + 1024 * 1024]
+
+    try:
+        meta = await storage.save_stream("originals/video.mp4", chunks())
+
+        assert meta.size == len(data)
+        assert meta.checksum == hashlib.sha256(data).hexdigest()
+        assert (await storage.stat("originals/video.mp4")).size == len(data)
+        assert await storage.get_asset("originals/video.mp4") == data
+    finally:
+        await storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_presigned_source_uri_against_moto(moto_s3):
+    """Originals are exposed to ffmpeg as presigned GET URLs."""
+    import urllib.request
+
+    endpoint_url, bucket = moto_s3
+    storage = S3Storage(
+        bucket_name=bucket,
+        endpoint_url=endpoint_url,
+        access_key_id="testing",
+        secret_access_key="testing",
+    )
+
+    try:
+        await storage.save_asset("originals/clip.mp4", b"video-bytes")
+
+        url = await storage.get_source_uri("originals/clip.mp4")
+        assert url.startswith(endpoint_url)
+        with urllib.request.urlopen(url) as response:
+            assert response.read() == b"video-bytes"
+
+        with pytest.raises(FileNotFoundError):
+            await storage.get_source_uri("originals/missing.mp4")
+    finally:
+        await storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_s3_storage_move_and_delete_against_moto(moto_s3):
+    """Moves are server-side copies; deleting a missing key is a no-op."""
+    endpoint_url, bucket = moto_s3
+    storage = S3Storage(
+        bucket_name=bucket,
+        endpoint_url=endpoint_url,
+        access_key_id="testing",
+        secret_access_key="testing",
+    )
+
+    try:
+        await storage.save_asset("tmp/upload", b"blob-bytes")
+        await storage.move_asset("tmp/upload", "blobs/ab/abcd")
+
+        assert await storage.get_asset("blobs/ab/abcd") == b"blob-bytes"
+        with pytest.raises(FileNotFoundError):
+            await storage.stat("tmp/upload")
+
+        await storage.delete_asset("blobs/ab/abcd")
+        await storage.delete_asset("blobs/ab/abcd")
+        with pytest.raises(FileNotFoundError):
+            await storage.stat("blobs/ab/abcd")
+    finally:
+        await storage.shutdown()
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from morphosx.app.core.singleflight import SingleFlight
+from morphosx.app.storage.local import LocalStorage
+
+
+@pytest.mark.asyncio
+async def test_singleflight_coalesces_concurrent_calls():
+    """Followers share the leader's result and the work runs only once."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def render():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return b"derivative"
+
+    results = await asyncio.gather(*[flight.do("cache/a.jpg/w100", render) for _ in range(10)])
+
+    assert calls == 1
+    assert [r[0] for r in results] == [b"derivative"] * 10
+    assert [r[1] for r in results].count(False) == 1
+    assert "cache/a.jpg/w100" not in flight
+
+
+@pytest.mark.asyncio
+async def test_singleflight_propagates_errors_and_retries():
+    """A failed leader fails its followers, and the next call starts fresh."""
+    flight = SingleFlight()
+
+    async def broken():
+        await asyncio.sleep(0.01)
+        raise FileNotFoundError("missing")
+
+    results = await asyncio.gather(*[flight.do("k", broken) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(r, FileNotFoundError) for r in results)
+
+    async def working():
+        return "ok"
+
+    assert await flight.do("k", working) == ("ok", False)
+
+
+@pytest.mark.asyncio
+async def test_local_storage_lock(tmp_path):
+    """The lock file is exclusive until released or stale."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+    key = "cache/photo.jpg/w100_hauto_q80_t0_p1.webp"
+
+    assert await storage.acquire_lock(key, ttl=60) is True
+    assert await storage.acquire_lock(key, ttl=60) is False
+
+    await storage.release_lock(key)
+    assert await storage.acquire_lock(key, ttl=60) is True
+
+    # Age the lock file past its TTL: it is taken over
+    lock_path = tmp_path / "locks" / f"{key}.lock"
+    old = time.time() - 120
+    os.utime(lock_path, (old, old))
+    assert await storage.acquire_lock(key, ttl=60) is True
@@ -0,0 +1,202 @@
+import pytest
+
+from morphosx.app.storage.local import LocalStorage
+
+
+@pytest.mark.asyncio
+async def test_local_storage_stat_and_stream(tmp_path):
+    """stat() reports the size and open_stream() yields bounded chunks."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+    data = bytes(range(256)) * 1000
+    await storage.save_asset("cache/photo.jpg/w100.webp", data)
+
+    meta = await storage.stat("cache/photo.jpg/w100.webp")
+    assert meta.size == len(data)
+    assert meta.name == "w100.webp"
+    assert meta.is_dir is False
+
+    chunks = [chunk async for chunk in storage.open_stream("cache/photo.jpg/w100.webp", chunk_size=4096)]
+    assert max(len(chunk) for chunk in chunks) == 4096
+    assert b"".join(chunks) == data
+
+
+@pytest.mark.asyncio
+async def test_local_storage_ranged_stream(tmp_path):
+    """open_stream() seeks to the offset and stops after `length` bytes."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+    data = bytes(range(256)) * 1000
+    await storage.save_asset("originals/video.mp4", data)
+
+    chunks = [chunk async for chunk in storage.open_stream("originals/video.mp4", 4096, offset=1000, length=10_000)]
+    assert max(len(chunk) for chunk in chunks) == 4096
+    assert b"".join(chunks) == data[1000:11_000]
+
+    tail = [chunk async for chunk in storage.open_stream("originals/video.mp4", offset=len(data) - 5)]
+    assert b"".join(tail) == data[-5:]
+
+
+@pytest.mark.asyncio
+async def test_local_storage_stream_opens_eagerly(tmp_path):
+    """open_stream() fails at once for a missing file and keeps reading one deleted after the call."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        storage.open_stream("cache/missing.jpg/w100.webp")
+
+    data = bytes(range(256)) * 100
+    await storage.save_asset("cache/photo.jpg/w100.webp", data)
+    stream = storage.open_stream("cache/photo.jpg/w100.webp", chunk_size=4096)
+    await storage.delete_asset("cache/photo.jpg/w100.webp")
+
+    assert b"".join([chunk async for chunk in stream]) == data
+
+
+@pytest.mark.asyncio
+async def test_local_storage_stat_missing(tmp_path):
+    """Missing assets and path traversal are rejected."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+
+    with pytest.raises(FileNotFoundError):
+        await storage.stat("cache/missing.webp")
+    with pytest.raises(PermissionError):
+        await storage.stat("../outside.txt")
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.mark.asyncio
+async def test_local_storage_save_stream(tmp_path):
+    """Streamed saves compute size and SHA-256 and leave no temp files behind."""
+    import hashlib
+
+    storage = LocalStorage(base_directory=str(tmp_path))
+    data = b"0123456789" * 100_000
+
+    meta = await storage.save_stream("originals/video.mp4", _chunks(data, 65536))
+
+    assert meta.size == len(data)
+    assert meta.checksum == hashlib.sha256(data).hexdigest()
+    assert await storage.get_asset("originals/video.mp4") == data
+    assert sorted(p.name for p in (tmp_path / "originals").iterdir()) == ["video.mp4"]
+
+
+@pytest.mark.asyncio
+async def test_local_storage_save_stream_failure_is_atomic(tmp_path):
+    """A failing stream never produces a partial destination file."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+
+    async def broken():
+        yield b"partial"
+        raise ConnectionResetError("client went away")
+
+    with pytest.raises(ConnectionResetError):
+        await storage.save_stream("originals/video.mp4", broken())
+
+    assert list((tmp_path / "originals").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_local_storage_save_asset_is_atomic_for_concurrent_readers(tmp_path, monkeypatch):
+    """A reader polling during a slow save sees the old derivative or the new one, never a partial file."""
+    import asyncio
+    import contextlib
+
+    import aiofiles
+
+    from morphosx.app.storage import local
+
+    real_open = aiofiles.open
+
+    class SlowFile:
+        def __init__(self, f):
+            self._f = f
+
+        async def write(self, data):
+            await self._f.write(data[: len(data) // 2])
+            await asyncio.sleep(0.05)
+            return await self._f.write(data[len(data) // 2 :])
+
+    @contextlib.asynccontextmanager
+    async def slow_open(path, mode="r", **kwargs):
+        async with real_open(path, mode=mode, **kwargs) as f:
+            yield SlowFile(f) if "w" in mode else f
+
+    storage = LocalStorage(base_directory=str(tmp_path))
+    old, new = b"a" * 200_000, b"b" * 300_000
+    await storage.save_asset("cache/photo.jpg/w100.webp", old)
+    monkeypatch.setattr(local.aiofiles, "open", slow_open)
+
+    seen = []
+    writer = asyncio.create_task(storage.save_asset("cache/photo.jpg/w100.webp", new))
+    while not writer.done():
+        meta = await storage.stat("cache/photo.jpg/w100.webp")
+        seen.append((meta.size, await storage.get_asset("cache/photo.jpg/w100.webp")))
+        await asyncio.sleep(0.005)
+    await writer
+
+    assert len(seen) > 1
+    assert all(size in (len(old), len(new)) and data in (old, new) for size, data in seen)
+    assert await storage.get_asset("cache/photo.jpg/w100.webp") == new
+    assert sorted(p.name for p in (tmp_path / "cache" / "photo.jpg").iterdir()) == ["w100.webp"]
+
+
+@pytest.mark.asyncio
+async def test_local_storage_source_uri(tmp_path):
+    """Local originals are exposed by absolute path for tools like ffmpeg."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+    await storage.save_asset("originals/clip.mp4", b"video")
+
+    assert await storage.get_source_uri("originals/clip.mp4") == str(tmp_path / "originals" / "clip.mp4")
+    with pytest.raises(FileNotFoundError):
+        await storage.get_source_uri("originals/missing.mp4")
+
+
+@pytest.mark.asyncio
+async def test_local_storage_delete_and_move(tmp_path):
+    """Moves are renames; deleting a missing asset is a no-op."""
+    storage = LocalStorage(base_directory=str(tmp_path))
+    await storage.save_asset("tmp/upload", b"data")
+
+    await storage.move_asset("tmp/upload", "blobs/ab/abcd")
+    assert await storage.get_asset("blobs/ab/abcd") == b"data"
+    with pytest.raises(FileNotFoundError):
+        await storage.stat("tmp/upload")
+
+    await storage.delete_asset("blobs/ab/abcd")
+    await storage.delete_asset("blobs/ab/abcd")
+    with pytest.raises(FileNotFoundError):
+        await storage.stat("blobs/ab/abcd")
+
+
+@pytest.mark.asyncio
+async def test_content_store_deduplicates_and_refcounts(tmp_path):
+    """Identical uploads share one blob, which survives until its last reference is deleted."""
+    import hashlib
+
+    from morphosx.app.storage.cas import ContentStore
+
+    storage = LocalStorage(base_directory=str(tmp_path))
+    store = ContentStore(storage, poll_interval=0.01)
+    data = b"same bytes" * 10_000
+    digest = hashlib.sha256(data).hexdigest()
+
+    first, first_dedup = await store.save_stream("originals/a.jpg", _chunks(data, 4096))
+    second, second_dedup = await store.save_stream("users/bob/b.jpg", _chunks(data, 4096))
+
+    assert (first_dedup, second_dedup) == (False, True)
+    assert first.checksum == second.checksum == digest
+    assert await store.resolve("users/bob/b.jpg") == digest
+    assert await store.reference_count(digest) == 2
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+    assert await store.delete("originals/a.jpg") == (digest, 1)
+    assert await storage.get_asset(store.blob_id(digest)) == data
+    assert await store.resolve("originals/a.jpg") is None
+
+    assert await store.delete("users/bob/b.jpg") == (digest, 0)
+    with pytest.raises(FileNotFoundError):
+        await storage.stat(store.blob_id(digest))
+    with pytest.raises(FileNotFoundError):
+        await store.delete("users/bob/b.jpg")
@@ -0,0 +1,211 @@
+import io
+import shutil
+import subprocess
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from morphosx.app.engine.types import ImageFormat, ProcessingOptions
+from morphosx.app.engine.video import SPRITE_MAX_TILE_SIZE, StoryboardTooLarge, VideoProcessor
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg binary not installed")
+
+
+@pytest.fixture
+def sample_video(tmp_path):
+    """Encodes a 3 second 320x240 test pattern to MP4."""
+    path = tmp_path / "clip.mp4"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=duration=3:size=320x240:rate=10",
+            "-pix_fmt",
+            "yuv420p",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def test_video_processor_frame_from_bytes(core_processor, sample_video):
+    """Raw bytes are still supported through a temporary file."""
+    processor = VideoProcessor(core_processor)
+
+    options = ProcessingOptions(width=160, format=ImageFormat.PNG, time=1.0)
+    processed_bytes, mime_type = processor.process(sample_video.read_bytes(), options, filename="clip.mp4")
+
+    assert mime_type == "image/png"
+    assert Image.open(io.BytesIO(processed_bytes)).size == (160, 120)
+
+
+def test_video_processor_reads_path_without_temp_copy(core_processor, sample_video):
+    """A storage-provided path is handed to ffmpeg as-is: nothing is copied to /tmp."""
+    processor = VideoProcessor(core_processor)
+    options = ProcessingOptions(width=160, format=ImageFormat.PNG, time=2.0)
+
+    with patch("tempfile.NamedTemporaryFile", side_effect=AssertionError("unexpected temp copy")):
+        processed_bytes, _ = processor.process_uri(str(sample_video), options, filename="clip.mp4")
+
+    assert Image.open(io.BytesIO(processed_bytes)).size == (160, 120)
+
+
+@pytest.fixture
+def long_video(tmp_path):
+    """Encodes a 10 second test pattern with a keyframe every second."""
+    path = tmp_path / "long.mp4"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=duration=10:size=320x240:rate=25",
+            "-g",
+            "25",
+            "-pix_fmt",
+            "yuv420p",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def test_video_processor_sprite_sheet(core_processor, long_video):
+    """One pass tiles keyframes into a sheet whose index matches the tile geometry."""
+    processor = VideoProcessor(core_processor)
+    options = ProcessingOptions(width=80, format=ImageFormat.PNG, sprite_interval=2.0, sprite_columns=3)
+
+    sheet, index = processor.render_sprite(str(long_video), options)
+
+    assert [frame["time"] for frame in index["frames"]] == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert (index["columns"], index["rows"]) == (3, 2)
+    assert (index["tile_width"], index["tile_height"]) == (80, 60)
+    assert sheet.size == (240, 120)
+    assert index["frames"][4] == {"time": 8.0, "x": 80, "y": 60, "width": 80, "height": 60}
+
+
+def test_video_processor_sprite_caps_tiles_and_sheet(core_processor, long_video):
+    """Oversized tiles are scaled down; sheets over the WEBP limit are refused before decoding."""
+    processor = VideoProcessor(core_processor)
+
+    sheet, index = processor.render_sprite(
+        str(long_video), ProcessingOptions(width=4096, format=ImageFormat.PNG, sprite_interval=5.0)
+    )
+    assert (index["tile_width"], index["tile_height"]) == (SPRITE_MAX_TILE_SIZE, 240)
+
+    decoded = []
+    oversized = ProcessingOptions(width=320, sprite_interval=0.01, sprite_columns=1)
+    processor._grab_keyframes = lambda *args: decoded.append(args)
+    with pytest.raises(StoryboardTooLarge):
+        processor.render_sprite(str(long_video), oversized)
+    assert decoded == []
+
+
+def test_video_processor_sprite_vtt(core_processor, long_video):
+    """The VTT index points each cue at its tile in the sheet."""
+    processor = VideoProcessor(core_processor)
+    options = ProcessingOptions(format=ImageFormat.VTT, sprite_interval=5.0)
+
+    vtt, mime_type = processor.process_uri(str(long_video), options)
+
+    assert mime_type == "text/vtt"
+    assert vtt.decode().splitlines()[:4] == [
+        "WEBVTT",
+        "",
+        "00:00:00.000 --> 00:00:05.000",
+        "wauto_hauto_q80_t0_p1_s5.0x10.webp#xywh=0,0,160,120",
+    ]
+
+
+def test_sprite_cache_key_is_opt_in():
+    """Plain frame requests keep their existing cache keys."""
+    assert ProcessingOptions(width=300, time=1.2).get_cache_key() == "w300_hauto_q80_t1.2_p1.webp"
+    assert ProcessingOptions(sprite_interval=2.0, format=ImageFormat.JSON).get_cache_key() == (
+        "wauto_hauto_q80_t0_p1_s2.0x10.json"
+    )
+
+
+def test_sprite_request_caches_every_output(tmp_path, monkeypatch, core_processor, long_video):
+    """A single storyboard miss stores the sheet and both indexes, so the scrubber never decodes twice."""
+    import json
+
+    from fastapi.testclient import TestClient
+
+    from morphosx.app.api import assets
+    from morphosx.app.core.security import generate_signature
+    from morphosx.app.engine.base import ProcessorRegistry
+    from morphosx.app.main import create_app
+    from morphosx.app.settings import settings
+    from morphosx.app.storage.hot import HotCache
+    from morphosx.app.storage.local import LocalStorage
+
+    monkeypatch.setattr(assets, "storage", LocalStorage(base_directory=str(tmp_path / "data")))
+    registry = ProcessorRegistry()
+    registry.register(["mp4"], VideoProcessor(core_processor))
+    monkeypatch.setattr(assets, "processor_registry", registry)
+    monkeypatch.setattr(assets, "hot_cache", HotCache())
+    (tmp_path / "data" / "originals").mkdir(parents=True)
+    (tmp_path / "data" / "originals" / "clip.mp4").write_bytes(long_video.read_bytes())
+
+    def url(fmt):
+        sig = generate_signature("clip.mp4", 80, None, fmt.lower(), 0, settings.secret_key)
+        return f"{settings.api_prefix}/assets/clip.mp4?width=80&format={fmt}&sprite=2&signature={sig}"
+
+    calls = []
+    render = VideoProcessor.render_sprite
+    monkeypatch.setattr(VideoProcessor, "render_sprite", lambda self, *a: calls.append(1) or render(self, *a))
+
+    with TestClient(create_app()) as client:
+        index = client.get(url("JSON"))
+        assert index.headers["X-MorphosX-Cache"] == "MISS"
+        assert index.json()["sheet"].startswith(f"{settings.api_prefix}/assets/clip.mp4?")
+
+        sheet = client.get(index.json()["sheet"])
+        assert sheet.headers["X-MorphosX-Cache"] == "HIT"
+        assert Image.open(io.BytesIO(sheet.content)).size == (400, 60)
+
+        vtt = client.get(url("VTT"))
+        assert vtt.headers["X-MorphosX-Cache"] == "HIT"
+        assert vtt.headers["content-type"].startswith("text/vtt")
+        assert json.loads(index.content)["sheet"] in vtt.text
+
+    assert len(calls) == 1
+
+
+def test_oversized_storyboard_request_is_rejected(tmp_path, monkeypatch, core_processor, long_video):
+    """A storyboard whose sheet cannot be encoded is a 400, not a render."""
+    from fastapi.testclient import TestClient
+
+    from morphosx.app.api import assets
+    from morphosx.app.core.security import generate_signature
+    from morphosx.app.engine.base import ProcessorRegistry
+    from morphosx.app.main import create_app
+    from morphosx.app.settings import settings
+    from morphosx.app.storage.hot import HotCache
+    from morphosx.app.storage.local import LocalStorage
+
+    monkeypatch.setattr(assets, "storage", LocalStorage(base_directory=str(tmp_path / "data")))
+    registry = ProcessorRegistry()
+    registry.register(["mp4"], VideoProcessor(core_processor))
+    monkeypatch.setattr(assets, "processor_registry", registry)
+    monkeypatch.setattr(assets, "hot_cache", HotCache())
+    (tmp_path / "data" / "originals").mkdir(parents=True)
+    (tmp_path / "data" / "originals" / "clip.mp4").write_bytes(long_video.read_bytes())
+
+    sig = generate_signature("clip.mp4", 320, None, "webp", 0, settings.secret_key)
+    url = f"{settings.api_prefix}/assets/clip.mp4?width=320&format=WEBP&sprite=0.01&columns=1&signature={sig}"
+    with TestClient(create_app()) as client:
+        response = client.get(url)
+
+    assert response.status_code == 400
+    assert "sheet limit" in response.json()["detail"]
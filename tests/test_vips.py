@@ -49,3 +49,69 @@ def test_vips_processor_format_conversion(sample_image):
     assert mime_type == "image/png"
     img = Image.open(io.BytesIO(processed_bytes))
     assert img.format == "PNG"
+
+
+@pytest.mark.skipif(not is_vips_installed(), reason="libvips or pyvips not installed")
+def test_vips_processor_downscale_uses_shrink_on_load():
+    """
+    Downscales go through thumbnail_buffer (shrink-on-load), never a full decode + resize().
+
+    Timings live in `morphosx bench --fixtures thumb`.
+    """
+    source = Image.new("RGB", (6000, 4000), color=(40, 120, 200))
+    buf = io.BytesIO()
+    source.save(buf, format="JPEG", quality=90)
+
+    processor = VipsProcessor()
+    calls = []
+    thumbnail, resize = processor._thumbnail, processor._resize
+    processor._thumbnail = lambda *args: calls.append("thumbnail") or thumbnail(*args)
+    processor._resize = lambda *args: calls.append("resize") or resize(*args)
+
+    options = ProcessingOptions(width=150, height=150, format=ImageFormat.WEBP, quality=70)
+    processed_bytes, _ = processor.process(buf.getvalue(), options)
+
+    assert calls == ["thumbnail"]
+    assert Image.open(io.BytesIO(processed_bytes)).size == (150, 100)
+
+
+@pytest.mark.skipif(not is_vips_installed(), reason="libvips or pyvips not installed")
+def test_vips_processor_thumbnail_ignores_exif_orientation():
+    """Shrink-on-load keeps the stored orientation, like the resize() path it replaced."""
+    img = Image.new("RGB", (2000, 1000), color=(0, 0, 255))
+    exif = img.getexif()
+    exif[0x0112] = 6
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", exif=exif.tobytes())
+
+    processor = VipsProcessor()
+    for width, expected in ((100, (100, 50)), (1500, (1500, 750))):
+        options = ProcessingOptions(width=width, format=ImageFormat.PNG)
+        processed_bytes, _ = processor.process(buf.getvalue(), options)
+        assert Image.open(io.BytesIO(processed_bytes)).size == expected
+
+
+@pytest.mark.skipif(not is_vips_installed(), reason="libvips or pyvips not installed")
+def test_vips_processor_upscale_keeps_resize_path(sample_image):
+    """Requests larger than the source still go through resize()."""
+    processor = VipsProcessor()
+
+    options = ProcessingOptions(width=300, format=ImageFormat.PNG)
+    processed_bytes, _ = processor.process(sample_image, options)
+
+    assert Image.open(io.BytesIO(processed_bytes)).width == 300
+
+
+@pytest.mark.skipif(not is_vips_installed(), reason="libvips or pyvips not installed")
+def test_vips_processor_process_image_handoff():
+    """PIL images and numpy arrays are wrapped as vips images without re-encoding."""
+    import numpy as np
+
+    processor = VipsProcessor()
+    options = ProcessingOptions(width=40, format=ImageFormat.PNG)
+
+    processed_bytes, _ = processor.process_image(Image.new("RGBA", (80, 60)), options)
+    assert Image.open(io.BytesIO(processed_bytes)).size == (40, 30)
+
+    processed_bytes, _ = processor.process_image(np.zeros((60, 80, 3), dtype=np.uint8), options)
+    assert Image.open(io.BytesIO(processed_bytes)).size == (40, 30)
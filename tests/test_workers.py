@@ -0,0 +1,126 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from morphosx.app.core.exceptions import CapacityError, handle_morphosx_error
+from morphosx.app.core.workers import WorkerPool
+from morphosx.app.engine.processor import ImageProcessor
+from morphosx.app.engine.types import ImageFormat, ProcessingOptions
+
+
+class SlowProcessor:
+    """Minimal engine stand-in that blocks until released."""
+
+    def __init__(self, gate):
+        self.gate = gate
+
+    def process(self, source_data, options, filename=None):
+        self.gate.wait(timeout=5)
+        return source_data, "application/octet-stream"
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_in_process_pool(sample_image):
+    """GIL-bound engines are dispatched to the process pool and results come back intact."""
+    pool = WorkerPool(thread_workers=2, process_workers=1)
+    try:
+        options = ProcessingOptions(width=50, format=ImageFormat.PNG)
+        processed_bytes, mime_type = await pool.run(ImageProcessor(), "process", sample_image, options)
+
+        assert mime_type == "image/png"
+        assert Image.open(io.BytesIO(processed_bytes)).width == 50
+        assert pool.queue_depth == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_sends_builtin_engines_by_name(sample_image):
+    """Children are not forked and rebuild built-in engines themselves, so processors are never pickled."""
+    import threading
+
+    from morphosx.app.core.workers import PROCESS_START_METHOD
+
+    pool = WorkerPool(thread_workers=1, process_workers=1, preload=(("core", "pil"),))
+    processor = ImageProcessor()
+    # Would fail to pickle if the instance itself were shipped to the child
+    processor.lock = threading.Lock()
+    try:
+        options = ProcessingOptions(width=50, format=ImageFormat.PNG)
+        processed_bytes, _ = await pool.run(processor, "process", sample_image, options)
+
+        assert Image.open(io.BytesIO(processed_bytes)).width == 50
+        assert PROCESS_START_METHOD != "fork"
+        assert pool._process_pool._mp_context.get_start_method() == PROCESS_START_METHOD
+    finally:
+        pool.shutdown()
+
+
+def test_engine_spec_round_trip():
+    """Built-in engines map to names and back; unknown processors are not rebuilt."""
+    from morphosx.app.engine.base import build_engine_from_spec, engine_spec
+    from morphosx.app.engine.text import TextProcessor
+
+    assert engine_spec(ImageProcessor()) == ("core", "pil")
+    assert engine_spec(TextProcessor(ImageProcessor())) == ("text", "pil")
+    assert engine_spec(SlowProcessor(None)) is None
+
+    cores = {}
+    text = build_engine_from_spec(("text", "pil"), cores)
+    assert isinstance(text, TextProcessor)
+    assert build_engine_from_spec(("core", "pil"), cores) is text.image_processor
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_rejects_when_saturated():
+    """Once the queue-depth limit is hit, new jobs fail fast with a CapacityError."""
+    import threading
+
+    gate = threading.Event()
+    pool = WorkerPool(thread_workers=1, queue_limit=2, retry_after=7)
+    engine = SlowProcessor(gate)
+    try:
+        running = [asyncio.create_task(pool.run(engine, "process", b"x", None)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.queue_depth == 2
+
+        with pytest.raises(CapacityError) as exc:
+            await pool.run(engine, "process", b"y", None)
+        assert exc.value.retry_after == 7
+
+        gate.set()
+        results = await asyncio.gather(*running)
+        assert [r[0] for r in results] == [b"x", b"x"]
+    finally:
+        gate.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_engine_concurrency_cap():
+    """A per-engine cap keeps extra jobs waiting even when workers are free."""
+    import threading
+
+    gate = threading.Event()
+    pool = WorkerPool(thread_workers=4, engine_limits={"SlowProcessor": 1})
+    engine = SlowProcessor(gate)
+    try:
+        tasks = [asyncio.create_task(pool.run(engine, "process", b"x", None)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        assert pool._semaphores["SlowProcessor"].locked()
+
+        gate.set()
+        await asyncio.gather(*tasks)
+    finally:
+        gate.set()
+        pool.shutdown()
+
+
+def test_capacity_error_maps_to_503():
+    """Saturation surfaces as 503 with a Retry-After header."""
+    http_exc = handle_morphosx_error(CapacityError("busy", retry_after=3))
+
+    assert http_exc.status_code == 503
+    assert http_exc.headers["Retry-After"] == "3"